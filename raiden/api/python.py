@@ -38,6 +38,7 @@
     EventPaymentSentFailed,
     EventPaymentSentSuccess,
 )
+from raiden.transfer.mediated_transfer import mediator
 from raiden.transfer.mediated_transfer.tasks import InitiatorTask, MediatorTask, TargetTask
 from raiden.transfer.state import (
     BalanceProofSignedState,
@@ -1177,6 +1178,20 @@ def get_raiden_internal_events_with_timestamps(
         assert self.raiden.wal, "Raiden service has to be started for the API to be usable."
         return self.raiden.wal.storage.get_events_with_timestamps(limit=limit, offset=offset)
 
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """ Counters of the caches and of the signing service, for debugging. """
+        fee_calculator_cache = mediator.FEE_CALCULATOR_CACHE
+        routing_engine = self.raiden.routing_engine
+        return {
+            "fee_calculator_cache": {
+                "hits": fee_calculator_cache.hits,
+                "misses": fee_calculator_cache.misses,
+                "hit_rate": fee_calculator_cache.hit_rate,
+            },
+            "routing_engine": {"hits": routing_engine.hits, "misses": routing_engine.misses},
+            "signing_service": self.raiden.signing_service.metrics(),
+        }
+
     transfer = transfer_and_wait
 
     def get_blockchain_events_network(
@@ -1185,6 +1200,7 @@ def get_blockchain_events_network(
         from_block: BlockSpecification = GENESIS_BLOCK_NUMBER,
         to_block: BlockSpecification = "latest",
     ) -> List[Dict]:
+        assert self.raiden.wal, "Raiden service has to be started for the API to be usable."
         events = blockchain_events.get_token_network_registry_events(
             proxy_manager=self.raiden.proxy_manager,
             token_network_registry_address=registry_address,
@@ -1192,6 +1208,7 @@ def get_blockchain_events_network(
             events=blockchain_events.ALL_EVENTS,
             from_block=from_block,
             to_block=to_block,
+            log_storage=self.raiden.wal.storage,
         )
 
         return sorted(events, key=lambda evt: evt.get("block_number"), reverse=True)
@@ -1203,6 +1220,7 @@ def get_blockchain_events_token_network(
         to_block: BlockSpecification = "latest",
     ) -> List[Dict]:
         """Returns a list of blockchain events corresponding to the token_address."""
+        assert self.raiden.wal, "Raiden service has to be started for the API to be usable."
 
         if not is_binary_address(token_address):
             raise InvalidBinaryAddress(
@@ -1224,6 +1242,7 @@ def get_blockchain_events_token_network(
             events=blockchain_events.ALL_EVENTS,
             from_block=from_block,
             to_block=to_block,
+            log_storage=self.raiden.wal.storage,
         )
 
         for event in returned_events:
@@ -1240,6 +1259,7 @@ def get_blockchain_events_channel(
         from_block: BlockSpecification = GENESIS_BLOCK_NUMBER,
         to_block: BlockSpecification = "latest",
     ) -> List[Dict]:
+        assert self.raiden.wal, "Raiden service has to be started for the API to be usable."
         if not is_binary_address(token_address):
             raise InvalidBinaryAddress(
                 "Expected binary address format for token in get_blockchain_events_channel"
@@ -1266,6 +1286,7 @@ def get_blockchain_events_channel(
                     contract_manager=self.raiden.contract_manager,
                     from_block=from_block,
                     to_block=to_block,
+                    log_storage=self.raiden.wal.storage,
                 )
             )
         returned_events.sort(key=lambda evt: evt.get("block_number"), reverse=True)
@@ -1292,7 +1313,7 @@ def create_monitoring_request(
             monitoring_service_contract_address=self.raiden.default_msc_address,
         )
         # sign RequestMonitoring and return
-        monitor_request.sign(self.raiden.signer)
+        self.raiden.signing_service.sign(monitor_request)
         return monitor_request
 
     def get_pending_transfers(
@@ -45,6 +45,7 @@
     ChannelsResourceByTokenAndPartnerAddress,
     ConnectionsInfoResource,
     ConnectionsResource,
+    MetricsResource,
     MintTokenResource,
     PartnersResourceByTokenAddress,
     PaymentResource,
@@ -183,6 +184,7 @@
         ChannelBlockchainEventsResource,
     ),
     ("/_debug/raiden_events", RaidenInternalEventsResource),
+    ("/_debug/metrics", MetricsResource),
     ("/_testing/tokens/<hexaddress:token_address>/mint", MintTokenResource, "tokensmintresource"),
 ]
 
@@ -962,6 +964,9 @@ def get_raiden_internal_events_with_timestamps(
         ]
         return api_response(result=events)
 
+    def get_metrics(self) -> Response:
+        return api_response(result=self.raiden_api.get_metrics())
+
     def get_blockchain_events_channel(
         self,
         token_address: TokenAddress,
@@ -184,6 +184,11 @@ def get(self, limit: int = None, offset: int = None) -> Response:
         return self.rest_api.get_raiden_internal_events_with_timestamps(limit=limit, offset=offset)
 
 
+class MetricsResource(BaseResource):
+    def get(self) -> Response:
+        return self.rest_api.get_metrics()
+
+
 class RegisterTokenResource(BaseResource):
     def get(self, token_address: TokenAddress) -> Response:
         return self.rest_api.get_token_network_for_token(
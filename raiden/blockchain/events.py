@@ -1,16 +1,25 @@
+import time
 from dataclasses import dataclass
 
 import structlog
 from eth_typing import ChecksumAddress
 from eth_utils import to_canonical_address
 from gevent.lock import Semaphore
+from requests.exceptions import ReadTimeout
 from web3 import Web3
 
 from raiden.blockchain.exceptions import UnknownRaidenEventType
-from raiden.blockchain.filters import decode_event, get_filter_args_for_all_events_from_channel
+from raiden.blockchain.filters import (
+    ChannelEventsPrefilter,
+    decode_event,
+    get_filter_args_for_all_events_from_channel,
+    log_matches_topics,
+)
 from raiden.constants import EMPTY_HASH, GENESIS_BLOCK_NUMBER, UINT64_MAX
 from raiden.exceptions import InvalidBlockNumberInput
 from raiden.network.proxies.proxy_manager import ProxyManager
+from raiden.settings import DEFAULT_BLOCKCHAIN_LOGS_RETENTION_BLOCKS, BlockBatchSizeConfig
+from raiden.storage.sqlite import BlockchainLogsRange, SerializedSQLiteStorage
 from raiden.utils.formatting import to_checksum_address
 from raiden.utils.typing import (
     ABI,
@@ -20,6 +29,7 @@
     BlockHash,
     BlockNumber,
     BlockSpecification,
+    BlockTimeout,
     ChainID,
     ChannelID,
     Dict,
@@ -30,6 +40,7 @@
     TokenNetworkAddress,
     TokenNetworkRegistryAddress,
     TransactionHash,
+    Tuple,
 )
 from raiden_contracts.constants import (
     CONTRACT_SECRET_REGISTRY,
@@ -107,6 +118,33 @@ def verify_block_number(number: BlockSpecification, argname: str) -> None:
         )
 
 
+def _stored_blocks_of_query(
+    log_storage: SerializedSQLiteStorage,
+    contract_address: Address,
+    from_block: BlockSpecification,
+    to_block: BlockSpecification,
+) -> Optional[Tuple[BlockNumber, BlockNumber]]:
+    """ The part of the inclusive range `[from_block, to_block]` for which the
+    logs of the smart contract at `contract_address` are stored, if any.
+    """
+    if not isinstance(from_block, int) or not (isinstance(to_block, int) or to_block == "latest"):
+        return None
+
+    stored_range = log_storage.get_blockchain_logs_range(to_checksum_address(contract_address))
+    if stored_range is None:
+        return None
+
+    stored_from_block = BlockNumber(max(from_block, stored_range.from_block))
+    stored_to_block = stored_range.to_block
+    if isinstance(to_block, int):
+        stored_to_block = BlockNumber(min(to_block, stored_to_block))
+
+    if stored_from_block > stored_to_block:
+        return None
+
+    return stored_from_block, stored_to_block
+
+
 def get_contract_events(
     proxy_manager: ProxyManager,
     abi: ABI,
@@ -114,16 +152,58 @@ def get_contract_events(
     topics: Optional[List[str]],
     from_block: BlockSpecification,
     to_block: BlockSpecification,
+    log_storage: Optional[SerializedSQLiteStorage] = None,
 ) -> List[Dict]:
     """ Query the blockchain for all events of the smart contract at
     `contract_address` that match the filters `topics`, `from_block`, and
     `to_block`.
+
+    If `log_storage` is given, the part of the range for which the logs of the
+    smart contract are stored is served from it. Only logs of confirmed
+    blocks are stored, the blocks before and after the stored range, e.g. the
+    unconfirmed blocks up to `latest`, are queried from the Ethereum node.
     """
     verify_block_number(from_block, "from_block")
     verify_block_number(to_block, "to_block")
-    events = proxy_manager.client.get_filter_events(
-        contract_address, topics=topics, from_block=from_block, to_block=to_block
-    )
+
+    stored_blocks = None
+    if log_storage is not None:
+        stored_blocks = _stored_blocks_of_query(
+            log_storage, contract_address, from_block, to_block
+        )
+
+    if log_storage is None or stored_blocks is None:
+        events = proxy_manager.client.get_filter_events(
+            contract_address, topics=topics, from_block=from_block, to_block=to_block
+        )
+    else:
+        stored_from_block, stored_to_block = stored_blocks
+        events = list()
+
+        if stored_from_block != from_block:
+            events.extend(
+                proxy_manager.client.get_filter_events(
+                    contract_address,
+                    topics=topics,
+                    from_block=from_block,
+                    to_block=BlockNumber(stored_from_block - 1),
+                )
+            )
+
+        stored_events = log_storage.get_blockchain_logs(
+            to_checksum_address(contract_address), stored_from_block, stored_to_block
+        )
+        events.extend(event for event in stored_events if log_matches_topics(event, topics))
+
+        if stored_to_block != to_block:
+            events.extend(
+                proxy_manager.client.get_filter_events(
+                    contract_address,
+                    topics=topics,
+                    from_block=BlockNumber(stored_to_block + 1),
+                    to_block=to_block,
+                )
+            )
 
     result = []
     for event in events:
@@ -142,6 +222,7 @@ def get_token_network_registry_events(
     events: Optional[List[str]] = ALL_EVENTS,
     from_block: BlockSpecification = GENESIS_BLOCK_NUMBER,
     to_block: BlockSpecification = "latest",
+    log_storage: Optional[SerializedSQLiteStorage] = None,
 ) -> List[Dict]:  # pragma: no unittest
     """ Helper to get all events of the Registry contract at `registry_address`. """
     return get_contract_events(
@@ -151,6 +232,7 @@ def get_token_network_registry_events(
         topics=events,
         from_block=from_block,
         to_block=to_block,
+        log_storage=log_storage,
     )
 
 
@@ -161,6 +243,7 @@ def get_token_network_events(
     events: Optional[List[str]] = ALL_EVENTS,
     from_block: BlockSpecification = GENESIS_BLOCK_NUMBER,
     to_block: BlockSpecification = "latest",
+    log_storage: Optional[SerializedSQLiteStorage] = None,
 ) -> List[Dict]:  # pragma: no unittest
     """ Helper to get all events of the ChannelManagerContract at `token_address`. """
 
@@ -171,6 +254,7 @@ def get_token_network_events(
         events,
         from_block,
         to_block,
+        log_storage,
     )
 
 
@@ -181,6 +265,7 @@ def get_all_netting_channel_events(
     contract_manager: ContractManager,
     from_block: BlockSpecification = GENESIS_BLOCK_NUMBER,
     to_block: BlockSpecification = "latest",
+    log_storage: Optional[SerializedSQLiteStorage] = None,
 ) -> List[Dict]:  # pragma: no unittest
     """ Helper to get all events of a NettingChannelContract. """
 
@@ -199,6 +284,7 @@ def get_all_netting_channel_events(
         filter_args["topics"],
         from_block,
         to_block,
+        log_storage,
     )
 
 
@@ -346,6 +432,97 @@ def filters_to_rpc(
     }
 
 
+class BlockBatchSizeAdjuster:
+    """ Adapts the block range of the `eth_getLogs` requests to the Ethereum
+    node.
+
+    The range doubles while the requests are fast and return few events, this
+    makes the synchronization of sparse historical ranges fast. It is halved
+    after slow requests, requests with too many events and read timeouts, these
+    happen for dense ranges (issue #3558). The range is kept for requests in
+    between the thresholds, to avoid oscillating.
+
+    A timeout is expensive, web3 retries the request a few times before it
+    gives up, while a small request is cheap. Therefore the range is divided by
+    `TIMEOUT_DECREASE_FACTOR` after a timeout, and it is not increased again
+    until the blocks of the request which timed out have been fetched,
+    otherwise the next fast response would grow the range back into the dense
+    blocks.
+
+    `batch_size` and `last_request_duration` are the current state of the
+    controller, they are logged while synchronizing.
+    """
+
+    TIMEOUT_DECREASE_FACTOR = 8
+
+    def __init__(self, config: BlockBatchSizeConfig) -> None:
+        self.config = config
+        self.batch_size = config.initial
+        self.last_request_duration = 0.0
+        self.timed_out_block = BlockNumber(0)
+
+    def increase(self) -> None:
+        self._set_batch_size(BlockNumber(min(self.batch_size * 2, self.config.max)))
+
+    def decrease(self, factor: int = 2) -> None:
+        self._set_batch_size(BlockNumber(max(self.batch_size // factor, self.config.min)))
+
+    def update(
+        self,
+        to_block: BlockNumber,
+        request_duration: float,
+        number_of_events: int,
+        range_limited: bool,
+    ) -> None:
+        """ Adjusts the batch size after a successful request.
+
+        Args:
+            to_block: The last block of the request.
+            request_duration: The duration of the slowest `eth_getLogs` request.
+            number_of_events: The number of events fetched for the range.
+            range_limited: Whether the range was limited by the batch size. A
+                range limited by the target block says nothing about the
+                performance of bigger ranges, so the batch size is not
+                increased for it.
+        """
+        self.last_request_duration = request_duration
+
+        too_slow = request_duration > self.config.slow_threshold
+        if too_slow or number_of_events > self.config.max_events:
+            self.decrease()
+        elif (
+            range_limited
+            and to_block > self.timed_out_block
+            and request_duration < self.config.fast_threshold
+            and number_of_events <= self.config.max_events // 2
+        ):
+            self.increase()
+
+    def timed_out(self, to_block: BlockNumber, request_duration: float) -> bool:
+        """ Decreases the batch size after a read timeout of the request up
+        to `to_block`. Returns False if the batch size is at the minimum
+        already, and the request must not be retried.
+        """
+        self.last_request_duration = request_duration
+        self.timed_out_block = max(self.timed_out_block, to_block)
+
+        if self.batch_size <= self.config.min:
+            return False
+
+        self.decrease(self.TIMEOUT_DECREASE_FACTOR)
+        return True
+
+    def _set_batch_size(self, batch_size: BlockNumber) -> None:
+        if batch_size != self.batch_size:
+            log.debug(
+                "Adjusting block batch size",
+                old_batch_size=self.batch_size,
+                new_batch_size=batch_size,
+                last_request_duration=self.last_request_duration,
+            )
+            self.batch_size = batch_size
+
+
 class BlockchainEvents:
     def __init__(
         self,
@@ -354,12 +531,18 @@ def __init__(
         contract_manager: ContractManager,
         last_fetched_block: BlockNumber,
         event_filters: List[SmartContractEvents],
-        max_number_of_blocks_to_poll: BlockNumber,
+        block_batch_size_config: BlockBatchSizeConfig,
+        event_prefilter: Optional[ChannelEventsPrefilter],
+        log_storage: Optional[SerializedSQLiteStorage],
+        log_retention_blocks: BlockTimeout = DEFAULT_BLOCKCHAIN_LOGS_RETENTION_BLOCKS,
     ) -> None:
         self.web3 = web3
         self.chain_id = chain_id
         self.last_fetched_block = last_fetched_block
-        self.max_number_of_blocks_to_poll = max_number_of_blocks_to_poll
+        self.block_batch_size_adjuster = BlockBatchSizeAdjuster(block_batch_size_config)
+        self.event_prefilter = event_prefilter
+        self.log_storage = log_storage
+        self.log_retention_blocks = log_retention_blocks
         self.contract_manager = contract_manager
 
         # This lock is used to add a new smart contract to the list of polled
@@ -388,19 +571,21 @@ def __init__(
             event.contract_address: event for event in event_filters
         }
 
-    def fetch_logs_in_batch(self, target_block_number: BlockNumber) -> PollResult:
+    def fetch_logs_in_batch(self, target_block_number: BlockNumber) -> Optional[PollResult]:
         """Poll the smart contract events for a limited number of blocks to
         avoid read timeouts (issue #3558).
 
         The block `target_block_number` will not be reached if it is more than
-        `self.max_number_of_blocks_to_poll` blocks away. To ensure the target
-        is reached keep calling `fetch_logs_in_batch` until
+        `self.block_batch_size_adjuster.batch_size` blocks away. To ensure the
+        target is reached keep calling `fetch_logs_in_batch` until
         `PollResult.polled_block_number` is the same as `target_block_number`.
 
         This function will make sure that the block range for the queries is
         not too big, this is necessary because it may take a long time for an
         Ethereum node to process the request, which will result in read
-        timeouts (issue #3558).
+        timeouts (issue #3558). The range is adapted to the duration of the
+        requests by the `BlockBatchSizeAdjuster`. If a request times out the
+        range is decreased and `None` is returned, the caller must retry.
 
         This will also group the queries as an optimization for a healthy node
         (issue #4872). This is enforced by the design of the datastructures,
@@ -470,9 +655,8 @@ def fetch_logs_in_batch(self, target_block_number: BlockNumber) -> PollResult:
             # Limit the range of blocks fetched, this limits the size of
             # the scan done by the target node and ensures the response
             # will not time out.
-            to_block = BlockNumber(
-                min(from_block + self.max_number_of_blocks_to_poll, target_block_number)
-            )
+            batch_size = self.block_batch_size_adjuster.batch_size
+            to_block = BlockNumber(min(from_block + batch_size, target_block_number))
 
             # Sending a single request for all the smart contract addresses
             # is the core optimization here. Because both Geth and Parity
@@ -491,7 +675,37 @@ def fetch_logs_in_batch(self, target_block_number: BlockNumber) -> PollResult:
             # clients, the rationale is to reduce the number of loops that
             # go through lots of elements).
 
-            decoded_result = self._query_and_track(from_block, to_block)
+            start = time.monotonic()
+            try:
+                decoded_result, number_of_logs, request_duration = self._query_and_track(
+                    from_block, to_block
+                )
+            except ReadTimeout:
+                request_duration = time.monotonic() - start
+                if not self.block_batch_size_adjuster.timed_out(to_block, request_duration):
+                    log.error(
+                        "Fetching the logs timed out with the minimum block batch size",
+                        from_block=from_block,
+                        to_block=to_block,
+                        request_duration=request_duration,
+                    )
+                    raise
+
+                log.warning(
+                    "Fetching the logs timed out, decreasing the block batch size",
+                    from_block=from_block,
+                    to_block=to_block,
+                    request_duration=request_duration,
+                    block_batch_size=self.block_batch_size_adjuster.batch_size,
+                )
+                return None
+
+            self.block_batch_size_adjuster.update(
+                to_block=to_block,
+                request_duration=request_duration,
+                number_of_events=number_of_logs,
+                range_limited=to_block < target_block_number,
+            )
 
             latest_confirmed_block = self.web3.eth.getBlock(to_block)
 
@@ -506,9 +720,17 @@ def fetch_logs_in_batch(self, target_block_number: BlockNumber) -> PollResult:
 
     def _query_and_track(
         self, from_block: BlockNumber, to_block: BlockNumber
-    ) -> List[DecodedEvent]:
+    ) -> Tuple[List[DecodedEvent], int, float]:
         """Query the blockchain up to `to_block` and create the filters for the
-        smart contracts deployed during the current batch.
+        smart contracts deployed during the current batch. Returns the events,
+        the number of fetched logs, which includes the logs dropped by the
+        `event_prefilter`, and the duration of the slowest request.
+
+        All the fetched logs are saved in the `log_storage`, together with the
+        range of blocks fetched for each smart contract. Only the fetched
+        blocks are recorded, the blocks before them are unknown to the storage
+        and are queried from the Ethereum node. The logs older than
+        `log_retention_blocks` are pruned afterwards.
 
         Because of how polling is optimized, filters for smart contracts
         deployed in the current batch must be created, queried, and be merged
@@ -540,6 +762,8 @@ def _query_and_track(
         filters_to_query: Iterable[SmartContractEvents]
 
         result: List[DecodedEvent] = []
+        number_of_logs = 0
+        max_request_duration = 0.0
         filters_to_query = self._address_to_filters.values()
 
         # While there are new smart contracts to follow, this will query them
@@ -558,9 +782,27 @@ def _query_and_track(
             # Using web3 because:
             # - It sets an unique request identifier, not strictly necessary.
             # - To avoid another abstraction to query the Ethereum client.
+            request_start = time.monotonic()
             blockchain_events: List[BlockchainEvent] = self.web3.manager.request_blocking(
                 "eth_getLogs", [filter_params]
             )
+            max_request_duration = max(max_request_duration, time.monotonic() - request_start)
+            number_of_logs += len(blockchain_events)
+
+            # The logs are saved before they are filtered and decoded, the
+            # decoding modifies them.
+            if self.log_storage is not None:
+                self.log_storage.write_blockchain_logs(
+                    logs=blockchain_events,
+                    ranges=[
+                        BlockchainLogsRange(
+                            contract_address=event_filter.checksummed_contract_address,
+                            from_block=from_block,
+                            to_block=to_block,
+                        )
+                        for event_filter in filters_to_query
+                    ],
+                )
 
             log.debug(
                 "StatelessFilter: fetched new entries",
@@ -568,6 +810,11 @@ def _query_and_track(
                 blockchain_events=blockchain_events,
             )
 
+            # Drop the logs of other nodes' channels before the expensive
+            # decoding. This never drops the events which create new filters.
+            if self.event_prefilter is not None:
+                blockchain_events = self.event_prefilter.filter_logs(blockchain_events)
+
             if blockchain_events:
                 decoded_events = [
                     decode_raiden_event_to_internal(self.event_to_abi(event), self.chain_id, event)
@@ -579,10 +826,19 @@ def _query_and_track(
                 # necessary.
                 #
                 # The generator result is converted to a list because we need
-                # to iterate over it twice
-                filters_to_query = list(
-                    new_filters_from_events(self.contract_manager, decoded_events)
-                )
+                # to iterate over it twice.
+                #
+                # Smart contracts which are tracked already are skipped, this
+                # happens when a batch is retried after a read timeout, the
+                # filters of the first attempt have been registered already
+                # and were queried with the tracked smart contracts.
+                filters_to_query = [
+                    new_filter
+                    for new_filter in new_filters_from_events(
+                        self.contract_manager, decoded_events
+                    )
+                    if new_filter.contract_address not in self._address_to_filters
+                ]
 
                 # Register the new filters, so that they will be fetched on the next iteration
                 self._address_to_filters.update(
@@ -591,7 +847,12 @@ def _query_and_track(
             else:
                 filters_to_query = []
 
-        return result
+        if self.log_storage is not None and to_block > self.log_retention_blocks:
+            self.log_storage.prune_blockchain_logs(
+                BlockNumber(to_block - self.log_retention_blocks)
+            )
+
+        return result, number_of_logs, max_request_duration
 
     def event_to_abi(self, event: BlockchainEvent) -> ABI:
         address = to_canonical_address(event["address"])
@@ -1,5 +1,7 @@
+from collections import Counter
+
 import structlog
-from eth_utils import decode_hex, event_abi_to_log_topic
+from eth_utils import decode_hex, event_abi_to_log_topic, to_canonical_address
 from web3.utils.abi import filter_by_type
 from web3.utils.events import get_event_data
 from web3.utils.filters import construct_event_filter_params
@@ -8,14 +10,25 @@
 from raiden.utils.formatting import to_checksum_address
 from raiden.utils.typing import (
     ABI,
+    Address,
     Any,
     BlockchainEvent,
     BlockSpecification,
     ChannelID,
     Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
     TokenNetworkAddress,
+    Tuple,
+    Union,
+)
+from raiden_contracts.constants import (
+    CONTRACT_TOKEN_NETWORK,
+    EVENT_DEPRECATION_SWITCH,
+    ChannelEvent,
 )
-from raiden_contracts.constants import CONTRACT_TOKEN_NETWORK, ChannelEvent
 from raiden_contracts.contract_manager import ContractManager
 
 log = structlog.get_logger(__name__)
@@ -91,3 +104,112 @@ def decode_event(abi: ABI, log: BlockchainEvent) -> Dict[str, Any]:
     topic_to_event_abi = {event_abi_to_log_topic(event_abi): event_abi for event_abi in events}
     event_abi = topic_to_event_abi[event_id]
     return get_event_data(event_abi, log)
+
+
+def _topic_to_bytes(topic: Union[bytes, str, int]) -> bytes:
+    """ The topics are `HexBytes` once formatted by web3, but `decode_event`
+    accepts the raw formats as well.
+    """
+    if isinstance(topic, str):
+        return decode_hex(topic)
+    if isinstance(topic, int):
+        return topic.to_bytes(32, "big")
+    return bytes(topic)
+
+
+def log_matches_topics(log: BlockchainEvent, topics: Optional[List[Any]]) -> bool:
+    """ Whether `log` matches the `topics` filter of `eth_getLogs`. A `None`
+    entry matches any topic, a list entry matches any of its topics.
+    """
+    if topics is None:
+        return True
+
+    log_topics = log["topics"]
+    if len(topics) > len(log_topics):
+        return False
+
+    for topic_filter, topic in zip(topics, log_topics):
+        if topic_filter is None:
+            continue
+
+        alternatives = topic_filter if isinstance(topic_filter, list) else [topic_filter]
+        topic_bytes = _topic_to_bytes(topic)
+        if all(_topic_to_bytes(alternative) != topic_bytes for alternative in alternatives):
+            return False
+
+    return True
+
+
+class ChannelEventsPrefilter:
+    """ Drops the raw logs of token network events for channels of other
+    nodes, before they are decoded.
+
+    Most of the events of a busy token network are for channels of other
+    nodes. The state changes for these are discarded after decoding, either
+    by `blockchainevent_to_statechange` or by the state machine which does
+    not know the channel. This filter uses the indexed channel identifier of
+    the raw log instead, which is the first topic of every channel event.
+
+    `ChannelOpened` and `ChannelClosed` are kept for all channels, these
+    update the network graph. The participants of `ChannelOpened` are read
+    from its topics, to learn the identifiers of our new channels. The set of
+    channel identifiers therefore contains all channels of the node's state,
+    and possibly some that have been removed from it, which only means that
+    some events are not dropped.
+
+    The filter is applied in the order the logs are fetched, the channels
+    opened in a batch are known by the time the logs of the next batch are
+    filtered.
+    """
+
+    def __init__(
+        self,
+        our_address: Address,
+        channel_identifiers: Iterable[Tuple[TokenNetworkAddress, ChannelID]],
+        contract_manager: ContractManager,
+    ) -> None:
+        self.our_address = our_address
+        self.channel_identifiers: Set[Tuple[Address, ChannelID]] = {
+            (Address(token_network_address), channel_identifier)
+            for token_network_address, channel_identifier in channel_identifiers
+        }
+
+        self.topic_to_event_name: Dict[bytes, str] = dict()
+        for event_abi in filter_by_type(
+            "event", contract_manager.get_contract_abi(CONTRACT_TOKEN_NETWORK)
+        ):
+            self.topic_to_event_name[event_abi_to_log_topic(event_abi)] = event_abi["name"]
+
+        # Counters of the filtered logs by event name
+        self.received_logs: Counter = Counter()
+        self.dropped_logs: Counter = Counter()
+
+    def filter_logs(self, logs: List[BlockchainEvent]) -> List[BlockchainEvent]:
+        """ The logs which must be decoded, in order. """
+        result = list()
+        for log_entry in logs:
+            topics = log_entry["topics"]
+            event_name = self.topic_to_event_name.get(_topic_to_bytes(topics[0]))
+
+            # Events of other contracts, and events without a channel
+            if event_name is None or event_name == EVENT_DEPRECATION_SWITCH:
+                result.append(log_entry)
+                continue
+
+            self.received_logs[event_name] += 1
+            key = (
+                to_canonical_address(log_entry["address"]),
+                ChannelID(int.from_bytes(_topic_to_bytes(topics[1]), "big")),
+            )
+
+            if event_name == ChannelEvent.OPENED:
+                participants = {_topic_to_bytes(topic)[-20:] for topic in topics[2:4]}
+                if self.our_address in participants:
+                    self.channel_identifiers.add(key)
+                result.append(log_entry)
+            elif event_name == ChannelEvent.CLOSED or key in self.channel_identifiers:
+                result.append(log_entry)
+            else:
+                self.dropped_logs[event_name] += 1
+
+        return result
@@ -25,7 +25,7 @@
 RELEASE_PAGE = "https://github.com/raiden-network/raiden/releases"
 SECURITY_EXPRESSION = r"\[CRITICAL UPDATE.*?\]"
 
-RAIDEN_DB_VERSION = RaidenDBVersion(25)
+RAIDEN_DB_VERSION = RaidenDBVersion(26)
 SQLITE_MIN_REQUIRED_VERSION = (3, 9, 0)
 PROTOCOL_VERSION = RaidenProtocolVersion(1)
 
@@ -145,6 +145,7 @@ class RoutingMode(Enum):
 
 GAS_REQUIRED_PER_SECRET_IN_BATCH = math.ceil(UNLOCK_TX_GAS_LIMIT / MAXIMUM_PENDING_TRANSFERS)
 GAS_LIMIT_FOR_TOKEN_CONTRACT_CALL = 100_000
+TRANSACTION_INTRINSIC_GAS = 21_000
 
 CHECK_RDN_MIN_DEPOSIT_INTERVAL = 5 * 60
 CHECK_GAS_RESERVE_INTERVAL = 5 * 60
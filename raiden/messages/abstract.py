@@ -1,9 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from raiden.exceptions import InvalidSignature
 from raiden.messages.cmdid import CmdId
 from raiden.utils.signer import Signer, recover
-from raiden.utils.typing import Address, Any, ClassVar, MessageID, Optional, Signature
+from raiden.utils.typing import Address, Any, ClassVar, MessageID, Optional, Signature, Tuple
 
 
 @dataclass(repr=False, eq=False)
@@ -26,6 +26,12 @@ class SignedMessage(AuthenticatedMessage):
     # current API assumes that signing is called before, this can be improved
     # by changing the order to packing then signing
     signature: Signature
+    # The signed data, the signature and the address recovered from them.
+    # Recovering the signer is expensive and `sender` is read several times
+    # while a message is processed.
+    _sender_cache: Optional[Tuple[bytes, Signature, Optional[Address]]] = field(
+        init=False, repr=False, compare=False, default=None
+    )
 
     def __hash__(self) -> int:
         return hash((self._data_to_sign(), self.signature))
@@ -58,12 +64,25 @@ def sender(self) -> Optional[Address]:
         data_that_was_signed = self._data_to_sign()
         message_signature = self.signature
 
+        # The cache is only valid for the same data and signature, this
+        # invalidates it on any change of the signed fields, including the
+        # nested ones.
+        cache = self._sender_cache
+        if (
+            cache is not None
+            and cache[0] == data_that_was_signed
+            and cache[1] == message_signature
+        ):
+            return cache[2]
+
         try:
             address: Optional[Address] = recover(
                 data=data_that_was_signed, signature=message_signature
             )
         except InvalidSignature:
             address = None
+
+        self._sender_cache = (data_that_was_signed, message_signature, address)
         return address
 
 
@@ -10,6 +10,7 @@
     to_hex,
 )
 from gevent.lock import RLock
+from web3.contract import ContractFunction
 from web3.exceptions import BadFunctionCallOutput
 
 from raiden.constants import (
@@ -59,6 +60,7 @@
     ChainID,
     ChannelID,
     Dict,
+    List,
     Locksroot,
     NamedTuple,
     Nonce,
@@ -128,6 +130,31 @@ class ChannelDetails(NamedTuple):
     participants_data: ParticipantsDetails
 
 
+def channel_data_from_info(channel_identifier: ChannelID, data: List[Any]) -> ChannelData:
+    """ Returns a ChannelData instance from the result of `getChannelInfo`. """
+    return ChannelData(
+        channel_identifier=channel_identifier,
+        settle_block_number=data[ChannelInfoIndex.SETTLE_BLOCK],
+        state=data[ChannelInfoIndex.STATE],
+    )
+
+
+def participant_details_from_info(address: Address, data: List[Any]) -> ParticipantDetails:
+    """ Returns a ParticipantDetails instance from the result of
+    `getChannelParticipantInfo`.
+    """
+    return ParticipantDetails(
+        address=address,
+        deposit=data[ParticipantInfoIndex.DEPOSIT],
+        withdrawn=data[ParticipantInfoIndex.WITHDRAWN],
+        is_closer=data[ParticipantInfoIndex.IS_CLOSER],
+        balance_hash=data[ParticipantInfoIndex.BALANCE_HASH],
+        nonce=data[ParticipantInfoIndex.NONCE],
+        locksroot=data[ParticipantInfoIndex.LOCKSROOT],
+        locked_amount=data[ParticipantInfoIndex.LOCKED_AMOUNT],
+    )
+
+
 @dataclass
 class TokenNetworkMetadata(SmartContractMetadata):
     token_network_registry_address: Optional[TokenNetworkRegistryAddress]
@@ -432,6 +459,54 @@ def get_channel_identifier_or_none(
         except RaidenRecoverableError:
             return None
 
+    def _get_channel_participant_info(
+        self, channel_identifier: ChannelID, detail_for: Address, partner: Address
+    ) -> ContractFunction:
+        raise_if_invalid_address_pair(detail_for, partner)
+
+        return self.proxy.contract.functions.getChannelParticipantInfo(
+            channel_identifier=channel_identifier,
+            participant=to_checksum_address(detail_for),
+            partner=to_checksum_address(partner),
+        )
+
+    def _get_channel_info(
+        self, channel_identifier: ChannelID, participant1: Address, participant2: Address
+    ) -> ContractFunction:
+        raise_if_invalid_address_pair(participant1, participant2)
+
+        return self.proxy.contract.functions.getChannelInfo(
+            channel_identifier=channel_identifier,
+            participant1=to_checksum_address(participant1),
+            participant2=to_checksum_address(participant2),
+        )
+
+    def _check_channel_identifier(
+        self,
+        participant1: Address,
+        participant2: Address,
+        block_identifier: BlockSpecification,
+        channel_identifier: Optional[ChannelID],
+    ) -> ChannelID:
+        """ Returns `channel_identifier` if it is valid, or the identifier of
+        the currently open channel if it is not given.
+        """
+        if channel_identifier is None:
+            return self.get_channel_identifier(
+                participant1=participant1,
+                participant2=participant2,
+                block_identifier=block_identifier,
+            )
+
+        if not isinstance(channel_identifier, T_ChannelID):  # pragma: no unittest
+            raise InvalidChannelID("channel_identifier must be of type T_ChannelID")
+        if channel_identifier <= 0 or channel_identifier > UINT256_MAX:
+            raise InvalidChannelID(
+                "channel_identifier must be larger then 0 and smaller then uint256"
+            )
+
+        return channel_identifier
+
     def _detail_participant(
         self,
         channel_identifier: ChannelID,
@@ -440,24 +515,11 @@ def _detail_participant(
         block_identifier: BlockSpecification,
     ) -> ParticipantDetails:
         """ Returns a dictionary with the channel participant information. """
-        raise_if_invalid_address_pair(detail_for, partner)
-
-        data = self.proxy.contract.functions.getChannelParticipantInfo(
-            channel_identifier=channel_identifier,
-            participant=to_checksum_address(detail_for),
-            partner=to_checksum_address(partner),
+        data = self._get_channel_participant_info(
+            channel_identifier=channel_identifier, detail_for=detail_for, partner=partner
         ).call(block_identifier=block_identifier)
 
-        return ParticipantDetails(
-            address=detail_for,
-            deposit=data[ParticipantInfoIndex.DEPOSIT],
-            withdrawn=data[ParticipantInfoIndex.WITHDRAWN],
-            is_closer=data[ParticipantInfoIndex.IS_CLOSER],
-            balance_hash=data[ParticipantInfoIndex.BALANCE_HASH],
-            nonce=data[ParticipantInfoIndex.NONCE],
-            locksroot=data[ParticipantInfoIndex.LOCKSROOT],
-            locked_amount=data[ParticipantInfoIndex.LOCKED_AMOUNT],
-        )
+        return participant_details_from_info(detail_for, data)
 
     def _detail_channel(
         self,
@@ -474,30 +536,20 @@ def _detail_channel(
         """
         raise_if_invalid_address_pair(participant1, participant2)
 
-        if channel_identifier is None:
-            channel_identifier = self.get_channel_identifier(
-                participant1=participant1,
-                participant2=participant2,
-                block_identifier=block_identifier,
-            )
-        elif not isinstance(channel_identifier, T_ChannelID):  # pragma: no unittest
-            raise InvalidChannelID("channel_identifier must be of type T_ChannelID")
-        elif channel_identifier <= 0 or channel_identifier > UINT256_MAX:
-            raise InvalidChannelID(
-                "channel_identifier must be larger then 0 and smaller then uint256"
-            )
+        channel_identifier = self._check_channel_identifier(
+            participant1=participant1,
+            participant2=participant2,
+            block_identifier=block_identifier,
+            channel_identifier=channel_identifier,
+        )
 
-        channel_data = self.proxy.contract.functions.getChannelInfo(
+        channel_data = self._get_channel_info(
             channel_identifier=channel_identifier,
-            participant1=to_checksum_address(participant1),
-            participant2=to_checksum_address(participant2),
+            participant1=participant1,
+            participant2=participant2,
         ).call(block_identifier=block_identifier)
 
-        return ChannelData(
-            channel_identifier=channel_identifier,
-            settle_block_number=channel_data[ChannelInfoIndex.SETTLE_BLOCK],
-            state=channel_data[ChannelInfoIndex.STATE],
-        )
+        return channel_data_from_info(channel_identifier, channel_data)
 
     def detail_participants(
         self,
@@ -509,6 +561,9 @@ def detail_participants(
         """ Returns a ParticipantsDetails instance with the participants'
             channel information.
 
+        The information of both participants is queried with a single batch
+        request.
+
         Note:
             For now one of the participants has to be the node_address
         """
@@ -518,32 +573,32 @@ def detail_participants(
         if self.node_address == participant2:
             participant1, participant2 = participant2, participant1
 
-        if channel_identifier is None:
-            channel_identifier = self.get_channel_identifier(
-                participant1=participant1,
-                participant2=participant2,
-                block_identifier=block_identifier,
-            )
-        elif not isinstance(channel_identifier, T_ChannelID):  # pragma: no unittest
-            raise InvalidChannelID("channel_identifier must be of type T_ChannelID")
-        elif channel_identifier <= 0 or channel_identifier > UINT256_MAX:
-            raise InvalidChannelID(
-                "channel_identifier must be larger then 0 and smaller then uint256"
-            )
-
-        our_data = self._detail_participant(
-            channel_identifier=channel_identifier,
-            detail_for=participant1,
-            partner=participant2,
+        channel_identifier = self._check_channel_identifier(
+            participant1=participant1,
+            participant2=participant2,
             block_identifier=block_identifier,
-        )
-        partner_data = self._detail_participant(
             channel_identifier=channel_identifier,
-            detail_for=participant2,
-            partner=participant1,
+        )
+
+        our_data, partner_data = self.client.batch_call(
+            [
+                self._get_channel_participant_info(
+                    channel_identifier=channel_identifier,
+                    detail_for=participant1,
+                    partner=participant2,
+                ),
+                self._get_channel_participant_info(
+                    channel_identifier=channel_identifier,
+                    detail_for=participant2,
+                    partner=participant1,
+                ),
+            ],
             block_identifier=block_identifier,
         )
-        return ParticipantsDetails(our_details=our_data, partner_details=partner_data)
+        return ParticipantsDetails(
+            our_details=participant_details_from_info(participant1, our_data),
+            partner_details=participant_details_from_info(participant2, partner_data),
+        )
 
     def detail(
         self,
@@ -555,6 +610,9 @@ def detail(
         """ Returns a ChannelDetails instance with all the details of the
             channel and the channel participants.
 
+        The channel and the participants' information is queried with a
+        single batch request.
+
         Note:
             For now one of the participants has to be the node_address
         """
@@ -564,24 +622,43 @@ def detail(
         if self.node_address == participant2:
             participant1, participant2 = participant2, participant1
 
-        channel_data = self._detail_channel(
+        channel_identifier = self._check_channel_identifier(
             participant1=participant1,
             participant2=participant2,
             block_identifier=block_identifier,
             channel_identifier=channel_identifier,
         )
-        participants_data = self.detail_participants(
-            participant1=participant1,
-            participant2=participant2,
+
+        channel_data, our_data, partner_data = self.client.batch_call(
+            [
+                self._get_channel_info(
+                    channel_identifier=channel_identifier,
+                    participant1=participant1,
+                    participant2=participant2,
+                ),
+                self._get_channel_participant_info(
+                    channel_identifier=channel_identifier,
+                    detail_for=participant1,
+                    partner=participant2,
+                ),
+                self._get_channel_participant_info(
+                    channel_identifier=channel_identifier,
+                    detail_for=participant2,
+                    partner=participant1,
+                ),
+            ],
             block_identifier=block_identifier,
-            channel_identifier=channel_data.channel_identifier,
+        )
+        participants_data = ParticipantsDetails(
+            our_details=participant_details_from_info(participant1, our_data),
+            partner_details=participant_details_from_info(participant2, partner_data),
         )
         chain_id = self.chain_id()
 
         return ChannelDetails(
             chain_id=chain_id,
             token_address=self.token_address(),
-            channel_data=channel_data,
+            channel_data=channel_data_from_info(channel_identifier, channel_data),
             participants_data=participants_data,
         )
 
@@ -16,12 +16,15 @@
     Address,
     Any,
     Balance,
+    BlockNumber,
     BlockSpecification,
     Dict,
     MonitoringServiceAddress,
     OneToNAddress,
+    Optional,
     TokenAddress,
     TokenAmount,
+    Tuple,
     UserDepositAddress,
 )
 from raiden_contracts.constants import (
@@ -73,6 +76,11 @@ def __init__(
 
         self.deposit_lock = RLock()
 
+        # The effective balances with the block number they were read at. The
+        # cache is refreshed for every confirmed block and after our deposits,
+        # so the balance checks of the services don't wait on the RPC.
+        self._effective_balance_cache: Dict[Address, Tuple[BlockNumber, Balance]] = dict()
+
     def token_address(self, block_identifier: BlockSpecification) -> TokenAddress:
         return TokenAddress(
             to_canonical_address(
@@ -362,6 +370,31 @@ def effective_balance(self, address: Address, block_identifier: BlockSpecificati
 
         return balance
 
+    def cached_effective_balance(self, address: Address) -> Optional[Balance]:
+        """ The effective balance of `address` at the latest refreshed block,
+        `None` if it was never refreshed.
+        """
+        cached = self._effective_balance_cache.get(address)
+        if cached is None:
+            return None
+        return cached[1]
+
+    def refresh_effective_balance(self, address: Address, block_number: BlockNumber) -> Balance:
+        """ Reads the effective balance of `address` at `block_number` into
+        the cache. The cache is kept if it is from the same or a later block.
+        """
+        cached = self._effective_balance_cache.get(address)
+        if cached is None or cached[0] < block_number:
+            balance = self.effective_balance(address, block_number)
+
+            # Another refresh may have finished during the call
+            cached = self._effective_balance_cache.get(address)
+            if cached is None or cached[0] < block_number:
+                cached = (block_number, balance)
+                self._effective_balance_cache[address] = cached
+
+        return cached[1]
+
     def _deposit(
         self,
         beneficiary: Address,
@@ -504,3 +537,5 @@ def _deposit(
                     raise RaidenRecoverableError(msg)
 
                 raise RaidenRecoverableError("Deposit failed of unknown reason")
+
+            self.refresh_effective_balance(beneficiary, BlockNumber(receipt["blockNumber"]))
@@ -1,24 +1,40 @@
 import json
 import warnings
+from collections import Counter
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import gevent
 import structlog
-from eth_utils import encode_hex, is_checksum_address, to_canonical_address
+from eth_abi import decode_abi
+from eth_abi.exceptions import DecodingError
+from eth_utils import encode_hex, is_checksum_address, to_canonical_address, to_hex
+from gevent.event import AsyncResult, Event
 from gevent.lock import Semaphore
 from hexbytes import HexBytes
 from requests.exceptions import ReadTimeout
 from web3 import Web3
-from web3.contract import Contract, ContractFunction
+from web3.contract import Contract, ContractFunction, parse_block_identifier
+from web3.datastructures import AttributeDict
 from web3.eth import Eth
+from web3.exceptions import BadFunctionCallOutput
 from web3.gas_strategies.rpc import rpc_gas_price_strategy
 from web3.middleware import geth_poa_middleware
+from web3.middleware.pythonic import receipt_formatter
+from web3.providers.rpc import HTTPProvider
+from web3.utils.abi import get_abi_output_types, map_abi_data
 from web3.utils.contracts import prepare_transaction
 from web3.utils.empty import empty
+from web3.utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3.utils.request import make_post_request
 from web3.utils.toolz import assoc
 
-from raiden.constants import NO_STATE_QUERY_AFTER_BLOCKS, NULL_ADDRESS_HEX, EthClient
+from raiden.constants import (
+    NO_STATE_QUERY_AFTER_BLOCKS,
+    NULL_ADDRESS_HEX,
+    TRANSACTION_INTRINSIC_GAS,
+    EthClient,
+)
 from raiden.exceptions import (
     AddressWithoutCode,
     ContractCodeMismatch,
@@ -26,7 +42,12 @@
     InsufficientEth,
     RaidenUnrecoverableError,
 )
-from raiden.network.rpc.middleware import block_hash_cache_middleware
+from raiden.network.rpc.middleware import (
+    BLOCK_HEADER_CACHE,
+    ETH_CALL_CACHE,
+    BlockHeaderCache,
+    EthCallCache,
+)
 from raiden.network.rpc.smartcontract_proxy import ContractProxy
 from raiden.utils.ethereum_clients import is_supported_client
 from raiden.utils.formatting import to_checksum_address
@@ -231,6 +252,63 @@ def patched_web3_eth_call(
     return HexBytes(result)
 
 
+def batch_request(web3: Web3, requests: List[Tuple[str, List[Any]]]) -> List[Dict[str, Any]]:
+    """ Sends the JSON-RPC `requests` in a single batch request and returns
+    their responses in order, each with either a `result` or an `error`.
+
+    The batch bypasses the web3 middlewares, the params must be in the
+    format of the node and the results are not formatted. Providers other than
+    the `HTTPProvider`, e.g. eth-tester, do not support batches, with these the
+    requests are sent one by one through web3 and the results are formatted.
+    """
+    provider = web3.providers[0]
+
+    if not isinstance(provider, HTTPProvider):
+        responses = list()
+        for method, params in requests:
+            try:
+                responses.append({"result": web3.manager.request_blocking(method, params)})
+            except ValueError as e:
+                responses.append({"error": e.args[0]})
+        return responses
+
+    batch = [
+        {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+        for request_id, (method, params) in enumerate(requests)
+    ]
+    raw_response = make_post_request(
+        provider.endpoint_uri, json.dumps(batch).encode(), **provider.get_request_kwargs()
+    )
+    response = json.loads(raw_response)
+
+    # A node without batch support answers with a single error
+    if not isinstance(response, list):
+        raise ValueError(response.get("error", response))
+
+    responses_by_id = {item["id"]: item for item in response}
+    return [responses_by_id[request_id] for request_id in range(len(requests))]
+
+
+def decode_call_result(function: ContractFunction, return_data: HexBytes) -> Any:
+    """ Decodes the `return_data` of an `eth_call` to `function`, like
+    `ContractFunction.call`.
+    """
+    output_types = get_abi_output_types(function.abi)
+
+    try:
+        output_data = decode_abi(output_types, return_data)
+    except DecodingError as e:
+        raise BadFunctionCallOutput(
+            f"Could not decode contract function call {function.function_identifier} "
+            f"return data {return_data} for output_types {output_types}"
+        ) from e
+
+    normalized_data = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, output_data)
+    if len(normalized_data) == 1:
+        return normalized_data[0]
+    return normalized_data
+
+
 def estimate_gas_for_function(
     address: Address,
     web3: Web3,
@@ -307,10 +385,12 @@ def patched_contractfunction_estimateGas(
     )
 
 
-def monkey_patch_web3(web3: Web3, gas_price_strategy: Callable) -> None:
+def monkey_patch_web3(web3: Web3, gas_price_strategy: Callable, reorg_depth: int) -> None:
     try:
         # install caching middleware
-        web3.middleware_stack.add(block_hash_cache_middleware)
+        block_header_cache = BlockHeaderCache(reorg_depth)
+        web3.middleware_stack.add(block_header_cache, name=BLOCK_HEADER_CACHE)
+        web3.middleware_stack.add(EthCallCache(block_header_cache), name=ETH_CALL_CACHE)
 
         # set gas price strategy
         web3.eth.setGasPriceStrategy(gas_price_strategy)
@@ -360,55 +440,84 @@ def send_transaction(
         """ Locally sign the transaction and send it to the network. """
 
         with self._sent_lock:
-            if self._sent:
-                raise RaidenUnrecoverableError(
-                    f"A transaction for this slot has been sent already! "
-                    f"Reusing the nonce is a synchronization problem."
-                )
+            return self._send_transaction(to=to, startgas=startgas, value=value, data=data)
 
-            if to == to_canonical_address(NULL_ADDRESS_HEX):
-                warnings.warn("For contract creation the empty string must be used.")
+    def _send_transaction(
+        self, to: Address, startgas: int, value: int = 0, data: bytes = b""
+    ) -> TransactionHash:
+        """ Send the transaction, the caller must hold `_sent_lock`. """
+        if self._sent:
+            raise RaidenUnrecoverableError(
+                f"A transaction for this slot has been sent already! "
+                f"Reusing the nonce is a synchronization problem."
+            )
 
-            gas_price = self._client.gas_price()
+        if to == to_canonical_address(NULL_ADDRESS_HEX):
+            warnings.warn("For contract creation the empty string must be used.")
 
-            transaction = {
-                "data": data,
-                "gas": startgas,
-                "nonce": self.nonce,
-                "value": value,
-                "gasPrice": gas_price,
-            }
-            node_gas_price = self._client.web3.eth.gasPrice
-            log.debug(
-                "Calculated gas price for transaction",
-                node=to_checksum_address(self._client.address),
-                calculated_gas_price=gas_price,
-                node_gas_price=node_gas_price,
-            )
+        gas_price = self._client.gas_price()
 
-            # add the to address if not deploying a contract
-            if to != b"":
-                transaction["to"] = to_checksum_address(to)
+        transaction = {
+            "data": data,
+            "gas": startgas,
+            "nonce": self.nonce,
+            "value": value,
+            "gasPrice": gas_price,
+        }
+        node_gas_price = self._client.web3.eth.gasPrice
+        log.debug(
+            "Calculated gas price for transaction",
+            node=to_checksum_address(self._client.address),
+            calculated_gas_price=gas_price,
+            node_gas_price=node_gas_price,
+        )
 
-            signed_txn = self._client.web3.eth.account.signTransaction(
-                transaction, self._client.privkey
-            )
+        # add the to address if not deploying a contract
+        if to != b"":
+            transaction["to"] = to_checksum_address(to)
 
-            log_details = {
-                "node": to_checksum_address(self._client.address),
-                "nonce": transaction["nonce"],
-                "gasLimit": transaction["gas"],
-                "gasPrice": transaction["gasPrice"],
-            }
-            log.debug("send_raw_transaction called", **log_details)
+        signed_txn = self._client.web3.eth.account.signTransaction(
+            transaction, self._client.privkey
+        )
+
+        log_details = {
+            "node": to_checksum_address(self._client.address),
+            "nonce": transaction["nonce"],
+            "gasLimit": transaction["gas"],
+            "gasPrice": transaction["gasPrice"],
+        }
+        log.debug("send_raw_transaction called", **log_details)
+
+        tx_hash = self._client.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
+
+        log.debug("send_raw_transaction returned", tx_hash=encode_hex(tx_hash), **log_details)
+
+        self._sent = True
 
-            tx_hash = self._client.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
+        return TransactionHash(tx_hash)
 
-            log.debug("send_raw_transaction returned", tx_hash=encode_hex(tx_hash), **log_details)
+    def release(self) -> None:
+        """ Give up the nonce of this slot, if no transaction was sent with it.
 
-            self._sent = True
+        The nonce is given back to the client if it is the last one handed
+        out. Otherwise the transactions with the later nonces can not be mined
+        until the nonce is used, so the gap is filled with an empty transaction
+        to our own address.
+        """
+        with self._sent_lock:
+            if self._sent:
+                return
 
-            return TransactionHash(tx_hash)
+            if self._client.release_nonce(self.nonce):
+                self._sent = True
+                return
+
+            log.debug(
+                "Filling the nonce gap of a released slot",
+                node=to_checksum_address(self._client.address),
+                nonce=self.nonce,
+            )
+            self._send_transaction(to=self._client.address, startgas=TRANSACTION_INTRINSIC_GAS)
 
     def __del__(self) -> None:
         if not self._sent:
@@ -418,6 +527,224 @@ def __del__(self) -> None:
             )
 
 
+class ReceiptTracker:
+    """ Waits for the confirmed receipts of the pending transactions.
+
+    A single greenlet runs while there are pending transactions. It checks
+    the block number every `poll_interval` seconds, or when it is notified
+    of a new block with `on_new_block`, and on every new block it fetches the
+    receipts of all the pending transactions with a single batch request.
+
+    A transaction is confirmed once its receipt is `confirmations` blocks
+    deep. The receipts are fetched again on every block until then, so a
+    transaction which is dropped by a reorg is waited for until it is mined
+    in the canonical chain.
+    """
+
+    def __init__(self, web3: Web3, confirmations: int, poll_interval: float = 1.0) -> None:
+        self.web3 = web3
+        self.confirmations = confirmations
+        self.poll_interval = poll_interval
+
+        self._pending: Dict[TransactionHash, AsyncResult] = dict()
+        self._waiters: Counter = Counter()
+        self._unchecked = False
+        self._notified_block_number: Optional[BlockNumber] = None
+        self._wakeup = Event()
+        self._greenlet: Optional[gevent.Greenlet] = None
+
+    def wait_for_receipt(self, transaction_hash: TransactionHash) -> Dict[str, Any]:
+        """ Wait until `transaction_hash` is mined and confirmed, and return its
+        receipt.
+        """
+        async_result = self._pending.get(transaction_hash)
+        if async_result is None:
+            async_result = AsyncResult()
+            self._pending[transaction_hash] = async_result
+            self._unchecked = True
+            self._wakeup.set()
+
+        if not self._greenlet:
+            self._greenlet = gevent.spawn(self._run)
+            self._greenlet.name = "ReceiptTracker._run"
+
+        self._waiters[transaction_hash] += 1
+        try:
+            return async_result.get()
+        finally:
+            self._waiters[transaction_hash] -= 1
+            # Stop tracking the transaction if all its waiters were killed
+            if self._waiters[transaction_hash] == 0:
+                del self._waiters[transaction_hash]
+                if not async_result.ready():
+                    self._pending.pop(transaction_hash, None)
+
+    def on_new_block(self, latest_block: Dict[str, Any]) -> None:
+        """ `AlarmTask` callback, checks the receipts without waiting for the
+        poll interval.
+        """
+        self._notified_block_number = latest_block["number"]
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        known_block_number = None
+        try:
+            while self._pending:
+                self._wakeup.clear()
+
+                notified_block_number = self._notified_block_number
+                self._notified_block_number = None
+                if notified_block_number is not None and (
+                    known_block_number is None or notified_block_number > known_block_number
+                ):
+                    # The AlarmTask fetched the latest block already
+                    block_number = notified_block_number
+                else:
+                    block_number = self.web3.eth.blockNumber
+
+                if block_number != known_block_number or self._unchecked:
+                    known_block_number = block_number
+                    self._unchecked = False
+                    self._check_receipts(block_number)
+
+                if self._pending:
+                    self._wakeup.wait(self.poll_interval)
+        except Exception as e:  # pylint: disable=broad-except
+            # The RPC errors are raised in the waiting greenlets
+            for async_result in self._pending.values():
+                async_result.set_exception(e)
+            self._pending.clear()
+
+    def _check_receipts(self, block_number: BlockNumber) -> None:
+        transaction_hashes = list(self._pending)
+        requests = [
+            ("eth_getTransactionReceipt", [encode_hex(transaction_hash)])
+            for transaction_hash in transaction_hashes
+        ]
+        responses = batch_request(self.web3, requests)
+
+        for transaction_hash, response in zip(transaction_hashes, responses):
+            # The waiters of the transaction may have been killed meanwhile
+            async_result = self._pending.get(transaction_hash)
+            if async_result is None:
+                continue
+
+            if "error" in response:
+                del self._pending[transaction_hash]
+                async_result.set_exception(ValueError(response["error"]))
+                continue
+
+            # Parity (as of 2.5.7) always returns a receipt. When the
+            # transaction is not mined in the canonical chain, the receipt will
+            # not have meaningful values. Example of receipt for a transaction
+            # that is not mined:
+            #
+            #   blockHash: None
+            #   blockNumber: None
+            #   contractAddress: None
+            #   cumulativeGasUsed: The transaction's gas
+            #   from: None
+            #   gasUsed: The transaction's gas
+            #   logs: []
+            #   logsBloom: Zero is hex
+            #   root: None
+            #   status: 1
+            #   to: None
+            #   transactionHash: The transaction's hash
+            #   transactionIndex: 0
+            #
+            # Geth only returns a receipt if the transaction was mined on the
+            # canonical chain. https://github.com/raiden-network/raiden/issues/4529
+            tx_receipt = response["result"]
+            is_transaction_mined = tx_receipt and tx_receipt.get("blockNumber") is not None
+            if not is_transaction_mined:
+                continue
+
+            # The results of the batch requests are not formatted by web3,
+            # formatting an already formatted receipt does not change it
+            tx_receipt = AttributeDict.recursive(receipt_formatter(tx_receipt))
+            confirmation_block = tx_receipt["blockNumber"] + self.confirmations
+
+            is_transaction_confirmed = block_number >= confirmation_block
+            if is_transaction_confirmed:
+                del self._pending[transaction_hash]
+                async_result.set(tx_receipt)
+
+
+class TransactionPipeline:
+    """ Sends independent transactions back to back with consecutive nonces,
+    and waits for their receipts together.
+
+    The nonces are reserved when the pipeline is created, so the transactions
+    of other greenlets do not interleave with the pipeline's. The
+    transactions are sent without waiting for the previous ones to be mined,
+    and `wait` waits for all of them with the `ReceiptTracker`, which fetches
+    their receipts in a single batch per block.
+
+    A transaction which is rejected by the node does not use its nonce, the
+    next transaction of the pipeline is sent with it instead, so that no gap
+    is left for the later nonces. The nonces which are not used when the
+    pipeline is closed are released with `TransactionSlot.release`.
+    """
+
+    def __init__(self, client: "JSONRPCClient", size: int) -> None:
+        self.client = client
+        self.transaction_hashes: List[TransactionHash] = list()
+        self._slots = client.get_next_transactions(size)
+
+    def __enter__(self) -> "TransactionPipeline":
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        if exc_type is None:
+            self.close()
+            return
+
+        # An error while the nonces are released must not hide the error
+        # which is propagated
+        try:
+            self.close()
+        except Exception:  # pylint: disable=broad-except
+            log.exception(
+                "Releasing the nonces of the pipeline failed",
+                node=to_checksum_address(self.client.address),
+            )
+
+    def send_transaction(
+        self, to: Address, startgas: int, value: int = 0, data: bytes = b""
+    ) -> TransactionHash:
+        """ Send a transaction with the next unused nonce of the pipeline. """
+        if not self._slots:
+            raise ValueError("All the nonces of the pipeline have been used")
+
+        transaction_hash = self._slots[0].send_transaction(
+            to=to, startgas=startgas, value=value, data=data
+        )
+        self._slots.pop(0)
+        self.transaction_hashes.append(transaction_hash)
+
+        return transaction_hash
+
+    def wait(self) -> List[Dict[str, Any]]:
+        """ Wait until all the transactions sent are confirmed, and return
+        their receipts in the order the transactions were sent.
+        """
+        greenlets = [
+            gevent.spawn(self.client.poll, transaction_hash)
+            for transaction_hash in self.transaction_hashes
+        ]
+        gevent.joinall(set(greenlets), raise_error=True)
+        return [greenlet.get() for greenlet in greenlets]
+
+    def close(self) -> None:
+        """ Release the unused nonces, from the highest one, so that the
+        trailing nonces are given back to the client.
+        """
+        slots, self._slots = self._slots, list()
+        for slot in reversed(slots):
+            slot.release()
+
+
 class JSONRPCClient:
     """ Ethereum JSON RPC client.
 
@@ -441,7 +768,7 @@ def __init__(
         if block_num_confirmations < 0:
             raise ValueError("Number of confirmations has to be positive")
 
-        monkey_patch_web3(web3, gas_price_strategy)
+        monkey_patch_web3(web3, gas_price_strategy, block_num_confirmations)
 
         version = web3.version.node
         supported, eth_node, _ = is_supported_client(version)
@@ -466,6 +793,13 @@ def __init__(
         self.web3 = web3
         self.default_block_num_confirmations = block_num_confirmations
 
+        # The caches are installed once per web3 instance and are shared by
+        # its users
+        self.block_header_cache: BlockHeaderCache = web3.middleware_stack[BLOCK_HEADER_CACHE]
+        self.eth_call_cache: EthCallCache = web3.middleware_stack[ETH_CALL_CACHE]
+
+        self.receipt_tracker = ReceiptTracker(web3, block_num_confirmations)
+
         # Ask for the chain id only once and store it here
         self.chain_id = ChainID(int(self.web3.version.network))
 
@@ -509,6 +843,31 @@ def get_next_transaction(self) -> TransactionSlot:
             self._available_nonce = Nonce(self._available_nonce + 1)
             return slot
 
+    def get_next_transactions(self, count: int) -> List[TransactionSlot]:
+        """ Reserve `count` consecutive nonces. """
+        with self._nonce_lock:
+            slots = [
+                TransactionSlot(self, Nonce(self._available_nonce + offset))
+                for offset in range(count)
+            ]
+            self._available_nonce = Nonce(self._available_nonce + count)
+            return slots
+
+    def release_nonce(self, nonce: Nonce) -> bool:
+        """ Give back `nonce` if it is the last nonce handed out, returns
+        whether it was released.
+        """
+        with self._nonce_lock:
+            if self._available_nonce != nonce + 1:
+                return False
+
+            self._available_nonce = nonce
+            return True
+
+    def transaction_pipeline(self, size: int) -> TransactionPipeline:
+        """ A pipeline of `size` consecutive nonces, see `TransactionPipeline`. """
+        return TransactionPipeline(self, size)
+
     def blockhash_from_blocknumber(self, block_number: BlockSpecification) -> BlockHash:
         """Given a block number, query the chain to get its corresponding block hash"""
         block = self.get_block(block_number)
@@ -527,6 +886,60 @@ def can_query_state_for_block(self, block_identifier: BlockSpecification) -> boo
         difference = latest_block_number - preconditions_block_number
         return difference < NO_STATE_QUERY_AFTER_BLOCKS
 
+    def batch_call(
+        self, functions: List[ContractFunction], block_identifier: BlockSpecification
+    ) -> List[Any]:
+        """ Calls the contract `functions` at `block_identifier` with a single
+        JSON-RPC batch request, and returns their decoded results in order.
+
+        All the calls are pinned to the same block. As with
+        `ContractFunction.call`, a block hash is resolved to its number. The
+        results cached by the `EthCallCache` are not requested again.
+        """
+        block_id = parse_block_identifier(self.web3, block_identifier)
+        block_param = to_hex(block_id) if isinstance(block_id, int) else block_id
+
+        transactions = [
+            prepare_transaction(
+                function.address,
+                self.web3,
+                fn_identifier=function.function_identifier,
+                contract_abi=function.contract_abi,
+                fn_abi=function.abi,
+                transaction={"to": function.address},
+                fn_args=function.args,
+                fn_kwargs=function.kwargs,
+            )
+            for function in functions
+        ]
+        responses = [
+            self.eth_call_cache.get(transaction, block_id) for transaction in transactions
+        ]
+
+        missing = [index for index, response in enumerate(responses) if response is None]
+        if missing:
+            requests = [("eth_call", [transactions[index], block_param]) for index in missing]
+            for index, fetched in zip(missing, batch_request(self.web3, requests)):
+                self.eth_call_cache.set(transactions[index], block_id, fetched)
+                responses[index] = fetched
+
+        results = list()
+        for function, response in zip(functions, responses):
+            assert response is not None, "all missing responses must be fetched"
+            if "error" in response:
+                error = ValueError(response["error"])
+                # Same as `patched_web3_eth_call`, a revert in parity is
+                # returned as an empty result
+                if not check_value_error_for_parity(error, ParityCallType.CALL):
+                    raise error
+                return_data = HexBytes("")
+            else:
+                return_data = HexBytes(response["result"])
+
+            results.append(decode_call_result(function, return_data))
+
+        return results
+
     def balance(self, account: Address) -> TokenAmount:
         """ Return the balance of the account of the given address. """
         return self.web3.eth.getBalance(to_checksum_address(account), "pending")
@@ -649,45 +1062,7 @@ def poll(self, transaction_hash: TransactionHash) -> Dict[str, Any]:
         if len(transaction_hash) != 32:
             raise ValueError("transaction_hash must be a 32 byte hash")
 
-        transaction_hash_hex = encode_hex(transaction_hash)
-
-        while True:
-            tx_receipt = self.web3.eth.getTransactionReceipt(transaction_hash_hex)
-
-            # Parity (as of 2.5.7) always returns a receipt. When the
-            # transaction is not mined in the canonical chain, the receipt will
-            # not have meaningful values. Example of receipt for a transaction
-            # that is not mined:
-            #
-            #   blockHash: None
-            #   blockNumber: None
-            #   contractAddress: None
-            #   cumulativeGasUsed: The transaction's gas
-            #   from: None
-            #   gasUsed: The transaction's gas
-            #   logs: []
-            #   logsBloom: Zero is hex
-            #   root: None
-            #   status: 1
-            #   to: None
-            #   transactionHash: The transaction's hash
-            #   transactionIndex: 0
-            #
-            # Geth only returns a receipt if the transaction was mined on the
-            # canonical chain. https://github.com/raiden-network/raiden/issues/4529
-            is_transaction_mined = tx_receipt and tx_receipt.get("blockNumber") is not None
-
-            if is_transaction_mined:
-                confirmation_block = (
-                    tx_receipt["blockNumber"] + self.default_block_num_confirmations
-                )
-                block_number = self.block_number()
-
-                is_transaction_confirmed = block_number >= confirmation_block
-                if is_transaction_confirmed:
-                    return tx_receipt
-
-            gevent.sleep(1.0)
+        return self.receipt_tracker.wait_for_receipt(transaction_hash)
 
     def get_filter_events(
         self,
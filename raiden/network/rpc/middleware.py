@@ -1,13 +1,248 @@
-import functools
+from collections import Counter
 
+import structlog
 from cachetools import LRUCache
-from web3.middleware.cache import construct_simple_cache_middleware
+from hexbytes import HexBytes
+from web3 import Web3
 
-BLOCK_HASH_CACHE_RPC_WHITELIST = {"eth_getBlockByHash"}
+from raiden.utils.typing import Any, BlockNumber, Callable, Dict, List, Optional, Tuple
 
+log = structlog.get_logger(__name__)
 
-block_hash_cache_middleware = construct_simple_cache_middleware(
-    # default sample size of gas price strategies is 120
-    cache_class=functools.partial(LRUCache, 150),
-    rpc_whitelist=BLOCK_HASH_CACHE_RPC_WHITELIST,
-)
+BLOCK_HEADER_CACHE = "block_header_cache"
+ETH_CALL_CACHE = "eth_call_cache"
+
+RPCResponse = Dict[str, Any]
+
+
+class BlockHeaderCache:
+    """ Web3 middleware which caches the blocks fetched with
+    `eth_getBlockByNumber` and `eth_getBlockByHash`, keyed by number and by
+    hash.
+
+    The middleware is installed once per web3 instance, therefore the cache is
+    shared by all its users, e.g. the `AlarmTask`, the `BlockchainEvents` and
+    the `JSONRPCClient`. The blocks of the `latest` requests are not served
+    from the cache, but they are added to it, so that a block which was
+    polled by the `AlarmTask` is served from the cache once it is confirmed.
+
+    A block is identified by its hash, so the blocks are always served by hash.
+    The block at a given height may change with a reorg, so the blocks are
+    served by number only if they are more than `reorg_depth` blocks deep.
+    The blocks at the unconfirmed heights are dropped when a reorg is
+    detected, i.e. when a block does not match the cached block at its height
+    or its parent, or when the `latest` block jumped.
+
+    `hits` counts the RPC calls saved and `misses` the RPC calls sent, by
+    method, `invalidations` counts the detected reorgs.
+    """
+
+    def __init__(self, reorg_depth: int, size: int = 150) -> None:
+        self.reorg_depth = reorg_depth
+        self.latest_block_number: Optional[BlockNumber] = None
+        self._by_number: LRUCache = LRUCache(size)
+        self._by_hash: LRUCache = LRUCache(size)
+
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.invalidations = 0
+
+    @property
+    def rpc_calls_saved(self) -> int:
+        return sum(self.hits.values())
+
+    def __call__(self, make_request: Callable, web3: Web3) -> Callable:
+        # pylint: disable=unused-argument
+        def middleware(method: str, params: List[Any]) -> RPCResponse:
+            full_transactions = len(params) > 1 and params[1]
+            if full_transactions or method not in ("eth_getBlockByNumber", "eth_getBlockByHash"):
+                return make_request(method, params)
+
+            block_identifier = params[0]
+            latest = block_identifier == "latest"
+
+            response = None
+            if method == "eth_getBlockByHash":
+                response = self._by_hash.get(bytes(HexBytes(block_identifier)))
+            elif isinstance(block_identifier, int):
+                response = self.get_by_number(BlockNumber(block_identifier))
+            elif not latest:
+                return make_request(method, params)
+
+            if response is not None:
+                self.hits[method] += 1
+                return response
+
+            self.misses[method] += 1
+            response = make_request(method, params)
+            if response.get("result"):
+                self.add(response, latest)
+
+            return response
+
+        return middleware
+
+    def is_confirmed(self, block_number: BlockNumber) -> bool:
+        """ Whether the block at `block_number` is at least `reorg_depth`
+        blocks deep, as of the last `latest` block seen.
+        """
+        if self.latest_block_number is None:
+            return False
+
+        return block_number <= self.latest_block_number - self.reorg_depth
+
+    def get_by_number(self, block_number: BlockNumber) -> Optional[RPCResponse]:
+        """ The cached block at `block_number`, if the height is confirmed. """
+        if not self.is_confirmed(block_number):
+            return None
+
+        return self._by_number.get(block_number)
+
+    def add(self, response: RPCResponse, latest: bool) -> None:
+        block = response["result"]
+        block_number = block["number"]
+        block_hash = bytes(block["hash"])
+
+        if self._is_reorg(block_number, block_hash, block["parentHash"], latest):
+            self._drop_unconfirmed()
+
+        self._by_number[block_number] = response
+        self._by_hash[block_hash] = response
+
+        if latest or self.latest_block_number is None or block_number > self.latest_block_number:
+            self.latest_block_number = block_number
+
+    def observe_latest(
+        self, block_number: BlockNumber, block_hash: bytes, parent_hash: bytes
+    ) -> None:
+        """ Records a `latest` block which was not fetched through the cache,
+        e.g. a head pushed by the `NewHeadsSubscription`.
+
+        Only the height is recorded, a pushed head is not a complete
+        `eth_getBlock` response and is not cached.
+        """
+        if self._is_reorg(block_number, bytes(block_hash), parent_hash, latest=True):
+            self._drop_unconfirmed()
+
+        self.latest_block_number = block_number
+
+    def _is_reorg(
+        self, block_number: BlockNumber, block_hash: bytes, parent_hash: Any, latest: bool
+    ) -> bool:
+        cached = self._by_number.get(block_number)
+        parent = self._by_number.get(block_number - 1)
+
+        reorg = (cached is not None and bytes(cached["result"]["hash"]) != block_hash) or (
+            parent is not None and bytes(parent["result"]["hash"]) != bytes(parent_hash)
+        )
+        if latest and self.latest_block_number is not None:
+            # The orphaned blocks of a reorg may not be detected if the latest
+            # block decreased or if blocks were skipped
+            reorg = reorg or not (
+                self.latest_block_number <= block_number <= self.latest_block_number + 1
+            )
+
+        return reorg
+
+    def _drop_unconfirmed(self) -> None:
+        if self.latest_block_number is None:
+            return
+
+        unconfirmed = [
+            block_number
+            for block_number in self._by_number
+            if block_number > self.latest_block_number - self.reorg_depth
+        ]
+        for block_number in unconfirmed:
+            del self._by_number[block_number]
+
+        self.invalidations += 1
+        log.debug(
+            "Dropped the cached blocks of unconfirmed heights",
+            latest_block_number=self.latest_block_number,
+            dropped_blocks=len(unconfirmed),
+        )
+
+
+class EthCallCache:
+    """ Web3 middleware which caches the results of `eth_call`s pinned to a
+    confirmed block.
+
+    The state of a block never changes, so the result of a call to a given
+    contract function with given arguments at a given block is immutable.
+    With web3 4 `ContractFunction.call` resolves a block hash to its number
+    before sending the `eth_call`, therefore the results are keyed by the
+    block number, and are only cached if the block is confirmed according to
+    `block_header_cache`: a confirmed number identifies a single block hash.
+    The calls to `latest`, `pending` and unconfirmed blocks are always sent.
+
+    `hits` counts the calls served from the cache and `misses` the calls sent
+    for a confirmed block, by function selector.
+    """
+
+    def __init__(self, block_header_cache: BlockHeaderCache, size: int = 1000) -> None:
+        self.block_header_cache = block_header_cache
+        self._results: LRUCache = LRUCache(size)
+
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    @property
+    def rpc_calls_saved(self) -> int:
+        return sum(self.hits.values())
+
+    def __call__(self, make_request: Callable, web3: Web3) -> Callable:
+        # pylint: disable=unused-argument
+        def middleware(method: str, params: List[Any]) -> RPCResponse:
+            if method != "eth_call" or len(params) < 2:
+                return make_request(method, params)
+
+            transaction, block_identifier = params[:2]
+            response = self.get(transaction, block_identifier)
+            if response is not None:
+                return response
+
+            response = make_request(method, params)
+            self.set(transaction, block_identifier, response)
+            return response
+
+        return middleware
+
+    def _key(self, transaction: Dict[str, Any], block_identifier: Any) -> Optional[Tuple]:
+        if not isinstance(block_identifier, int):
+            return None
+
+        if not self.block_header_cache.is_confirmed(BlockNumber(block_identifier)):
+            return None
+
+        return (
+            transaction.get("to"),
+            transaction.get("from"),
+            transaction.get("data"),
+            block_identifier,
+        )
+
+    def get(self, transaction: Dict[str, Any], block_identifier: Any) -> Optional[RPCResponse]:
+        """ The cached response of the `eth_call` of `transaction` at
+        `block_identifier`, if the block is confirmed.
+        """
+        key = self._key(transaction, block_identifier)
+        if key is None:
+            return None
+
+        selector = str(transaction.get("data", ""))[:10]
+        response = self._results.get(key)
+        if response is None:
+            self.misses[selector] += 1
+        else:
+            self.hits[selector] += 1
+
+        return response
+
+    def set(
+        self, transaction: Dict[str, Any], block_identifier: Any, response: RPCResponse
+    ) -> None:
+        """ Caches `response` if the call succeeded at a confirmed block. """
+        key = self._key(transaction, block_identifier)
+        if key is not None and "result" in response:
+            self._results[key] = response
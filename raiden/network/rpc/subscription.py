@@ -0,0 +1,245 @@
+import base64
+import hashlib
+import json
+import os
+import struct
+from urllib.parse import urlparse
+
+import structlog
+from gevent import socket, ssl
+from gevent.event import Event
+from web3.middleware.pythonic import block_formatter
+
+from raiden.utils.runnable import Runnable
+from raiden.utils.typing import Any, Dict, Optional
+
+log = structlog.get_logger(__name__)
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OPCODE_CONTINUATION = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+
+class WebSocketConnection:
+    """ Minimal blocking WebSocket client (RFC 6455) on top of gevent's
+    sockets, for the JSON-RPC subscriptions of the Ethereum node.
+
+    Only text messages are supported, pings are answered. The connection
+    raises `ConnectionError` once it is closed by the server, and
+    `socket.timeout` if no frame is received in `timeout` seconds.
+    """
+
+    def __init__(self, endpoint: str, timeout: float) -> None:
+        url = urlparse(endpoint)
+        if url.scheme not in ("ws", "wss"):
+            raise ValueError(f"Expected a ws:// or wss:// endpoint, got {endpoint}")
+
+        host = url.hostname or "127.0.0.1"
+        port = url.port or (443 if url.scheme == "wss" else 80)
+        path = url.path or "/"
+        if url.query:
+            path = f"{path}?{url.query}"
+
+        sock = socket.create_connection((host, port), timeout=timeout)
+        if url.scheme == "wss":
+            context = ssl.create_default_context()  # pylint: disable=no-member
+            sock = context.wrap_socket(sock, server_hostname=host)
+
+        self.sock = sock
+        self.reader = sock.makefile("rb")
+        self._handshake(host, port, path)
+
+    def _handshake(self, host: str, port: int, path: str) -> None:
+        key = base64.b64encode(os.urandom(16)).decode()
+        request = (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            f"Upgrade: websocket\r\n"
+            f"Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            f"Sec-WebSocket-Version: 13\r\n"
+            f"\r\n"
+        )
+        self.sock.sendall(request.encode())
+
+        status_line = self.reader.readline().decode()
+        headers = dict()
+        while True:
+            line = self.reader.readline().decode()
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if " 101 " not in status_line:
+            raise ConnectionError(f"WebSocket upgrade failed: {status_line.strip()}")
+
+        digest = hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()
+        if headers.get("sec-websocket-accept") != base64.b64encode(digest).decode():
+            raise ConnectionError("WebSocket upgrade failed: invalid Sec-WebSocket-Accept")
+
+    def _read_exactly(self, size: int) -> bytes:
+        data = self.reader.read(size)
+        if len(data) != size:
+            raise ConnectionError("WebSocket connection closed")
+        return data
+
+    def _send_frame(self, opcode: int, payload: bytes) -> None:
+        # Client frames are always masked
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header += bytes([0x80 | length])
+        elif length < 2 ** 16:
+            header += bytes([0x80 | 126]) + struct.pack("!H", length)
+        else:
+            header += bytes([0x80 | 127]) + struct.pack("!Q", length)
+
+        mask = os.urandom(4)
+        masked = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+        self.sock.sendall(header + mask + masked)
+
+    def send_text(self, text: str) -> None:
+        self._send_frame(OPCODE_TEXT, text.encode())
+
+    def receive_text(self) -> str:
+        message = b""
+        while True:
+            first, second = self._read_exactly(2)
+            fin = first & 0x80
+            opcode = first & 0x0F
+
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", self._read_exactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", self._read_exactly(8))[0]
+
+            mask = self._read_exactly(4) if second & 0x80 else None
+            payload = self._read_exactly(length)
+            if mask is not None:
+                payload = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+
+            if opcode == OPCODE_CLOSE:
+                raise ConnectionError("WebSocket connection closed by the server")
+            if opcode == OPCODE_PING:
+                self._send_frame(OPCODE_PONG, payload)
+                continue
+            if opcode == OPCODE_PONG:
+                continue
+            if opcode not in (OPCODE_TEXT, OPCODE_BINARY, OPCODE_CONTINUATION):
+                raise ConnectionError(f"Unexpected WebSocket opcode {opcode}")
+
+            message += payload
+            if fin:
+                return message.decode()
+
+    def close(self) -> None:
+        try:
+            self._send_frame(OPCODE_CLOSE, b"")
+        except OSError:
+            pass
+        self.reader.close()
+        self.sock.close()
+
+
+class NewHeadsSubscription(Runnable):
+    """ Subscribes to the new blocks of the Ethereum node with
+    `eth_subscribe("newHeads")` over a WebSocket.
+
+    `new_head` is set for every new block, `latest_head` is the last block
+    received, formatted like the result of `web3.eth.getBlock`. Heads which
+    arrive faster than they are consumed are skipped, only the latest head is
+    kept.
+
+    `subscribed` is False and `disconnected` is set while the connection is
+    down, the `AlarmTask` polls for new blocks until the connection is
+    re-established. The connection is re-established after
+    `reconnect_interval` seconds, and it is considered stale if no block is
+    received in `timeout` seconds.
+    """
+
+    def __init__(self, endpoint: str, timeout: float, reconnect_interval: float) -> None:
+        super().__init__()
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.reconnect_interval = reconnect_interval
+
+        self.subscribed = False
+        self.disconnected = Event()
+        self.disconnected.set()
+        self.new_head = Event()
+        self.latest_head: Optional[Dict[str, Any]] = None
+        self.heads_received = 0
+
+        self._connection: Optional[WebSocketConnection] = None
+        self._stop_event = Event()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} endpoint:{self.endpoint}>"
+
+    def start(self) -> None:
+        log.debug("New heads subscription started", endpoint=self.endpoint)
+        self._stop_event.clear()
+        super().start()
+
+    def _run(self, *args: Any, **kwargs: Any) -> None:  # pylint: disable=method-hidden
+        self.greenlet.name = f"NewHeadsSubscription._run endpoint:{self.endpoint}"
+        while not self._stop_event.is_set():
+            try:
+                self._subscribe_and_receive()
+            except (OSError, ValueError) as e:
+                # `ConnectionError` and `socket.timeout` are `OSError`s, and
+                # invalid JSON is a `ValueError`
+                if not self._stop_event.is_set():
+                    log.warning(
+                        "New heads subscription failed, polling for new blocks",
+                        endpoint=self.endpoint,
+                        error=str(e),
+                    )
+            finally:
+                self.subscribed = False
+                self.disconnected.set()
+                if self._connection is not None:
+                    self._connection.close()
+                    self._connection = None
+
+            self._stop_event.wait(self.reconnect_interval)
+
+    def _subscribe_and_receive(self) -> None:
+        self._connection = WebSocketConnection(self.endpoint, timeout=self.timeout)
+
+        request = {"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe", "params": ["newHeads"]}
+        self._connection.send_text(json.dumps(request))
+        response = json.loads(self._connection.receive_text())
+        if "result" not in response:
+            raise ConnectionError(f"eth_subscribe failed: {response.get('error')}")
+
+        subscription_id = response["result"]
+        self.subscribed = True
+        self.disconnected.clear()
+        log.debug("Subscribed to new heads", endpoint=self.endpoint)
+
+        while True:
+            message = json.loads(self._connection.receive_text())
+            params = message.get("params") or dict()
+
+            if (
+                message.get("method") == "eth_subscription"
+                and params.get("subscription") == subscription_id
+            ):
+                self.latest_head = block_formatter(params["result"])
+                self.heads_received += 1
+                self.new_head.set()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        # The greenlet is blocked on the socket, the connection is closed
+        # while it exits
+        self.greenlet.kill()
+        log.debug("New heads subscription stopped", endpoint=self.endpoint)
@@ -12,6 +12,7 @@
 from gevent.lock import RLock, Semaphore
 from gevent.pool import Pool
 from gevent.queue import JoinableQueue
+from gevent.threadpool import ThreadPool
 from matrix_client.errors import MatrixHttpLibError, MatrixRequestError
 
 from raiden.constants import EMPTY_SIGNATURE, Environment
@@ -28,6 +29,7 @@
 )
 from raiden.network.transport.matrix.utils import (
     JOIN_RETRIES,
+    MATRIX_RECOVERY_THREADS,
     USER_PRESENCE_REACHABLE_STATES,
     AddressReachability,
     DisplayNameCache,
@@ -361,6 +363,10 @@ def _http_retry_delay() -> Iterable[float]:
 
         self._health_lock = Semaphore()
 
+        # Recovers the signers of incoming message batches off the hub, the
+        # threads only run while the transport is started
+        self._recovery_pool: Optional[ThreadPool] = None
+
         # Forbids concurrent room creation.
         self.room_creation_lock: Dict[Address, RLock] = defaultdict(RLock)
 
@@ -384,6 +390,7 @@ def start(  # type: ignore
         self._stop_event.clear()
         self._starting = True
         self._raiden_service = raiden_service
+        self._recovery_pool = ThreadPool(MATRIX_RECOVERY_THREADS)
 
         self._address_mgr.start()
 
@@ -501,6 +508,10 @@ def stop(self) -> None:
         # wait on own greenlets, no need to get on them, exceptions should be raised in _run()
         gevent.wait(self.greenlets)
 
+        if self._recovery_pool is not None:
+            self._recovery_pool.kill()
+            self._recovery_pool = None
+
         self._client.set_presence_state(UserPresence.OFFLINE.value)
 
         # Ensure keep-alive http connections are closed
@@ -944,7 +955,9 @@ def _handle_text(self, room: Room, message: MatrixMessage) -> List[Message]:
             )
             return []
 
-        return validate_and_parse_message(message["content"]["body"], peer_address)
+        return validate_and_parse_message(
+            message["content"]["body"], peer_address, recovery_pool=self._recovery_pool
+        )
 
     def _handle_sync_messages(self, sync_messages: MatrixSyncMessages) -> bool:
         """ Handle text messages sent to listening rooms """
@@ -961,20 +974,29 @@ def _handle_sync_messages(self, sync_messages: MatrixSyncMessages) -> bool:
                     all_messages.extend(self._handle_text(room, text))
 
         # Remove this #3254
+        acknowledgements: List[Tuple[Address, Delivered]] = list()
         for message in all_messages:
             if isinstance(message, (Processed, SignedRetrieableMessage)) and message.sender:
                 delivered_message = Delivered(
                     delivered_message_identifier=message.message_identifier,
                     signature=EMPTY_SIGNATURE,
                 )
-                self._raiden_service.sign(delivered_message)
-                retrier = self._get_retrier(message.sender)
-                retrier.enqueue_unordered(delivered_message)
+                acknowledgements.append((message.sender, delivered_message))
+
+        signing_service = self._raiden_service.signing_service
+        signatures = [
+            (receiver, signing_service.submit(delivered_message))
+            for receiver, delivered_message in acknowledgements
+        ]
 
         self.log.debug("Incoming messages", messages=all_messages)
 
         self._raiden_service.on_messages(all_messages)
 
+        # The acknowledgements are signed while the messages are dispatched
+        for receiver, signature in signatures:
+            self._get_retrier(receiver).enqueue_unordered(signature.get())
+
         return len(all_messages) > 0
 
     def _get_retrier(self, receiver: Address) -> _RetryQueue:
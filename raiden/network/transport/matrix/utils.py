@@ -5,6 +5,7 @@
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from itertools import chain
 from operator import attrgetter, itemgetter
 from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Sequence, Set
 from urllib.parse import urlparse
@@ -22,6 +23,7 @@
 )
 from gevent.event import Event
 from gevent.lock import Semaphore
+from gevent.threadpool import ThreadPool
 from matrix_client.errors import MatrixError, MatrixRequestError
 from structlog._config import BoundLoggerLazyProxy
 
@@ -55,6 +57,10 @@
 # The maximum matrix event size is 65 kB. Since events are larger than just the message
 # content we chose a conservative value
 MATRIX_MAX_BATCH_SIZE = 50_000
+# Signers of incoming batches with at least this many messages are recovered
+# in a thread pool, smaller batches are not worth the hand-off
+MATRIX_PARALLEL_RECOVERY_MIN_BATCH = 4
+MATRIX_RECOVERY_THREADS = 4
 
 
 class UserPresence(Enum):
@@ -788,9 +794,21 @@ def make_room_alias(chain_id: ChainID, *suffixes: str) -> str:
     return ROOM_NAME_SEPARATOR.join([ROOM_NAME_PREFIX, network_name, *suffixes])
 
 
-def validate_and_parse_message(data: Any, peer_address: Address) -> List[Message]:
-    messages: List[Message] = list()
+def _recover_senders(messages: List[SignedMessage]) -> List[Optional[Address]]:
+    return [message.sender for message in messages]
+
 
+def validate_and_parse_message(
+    data: Any, peer_address: Address, recovery_pool: Optional[ThreadPool] = None
+) -> List[Message]:
+    """ Deserializes the NDJSON `data` and returns the messages signed by
+    `peer_address`, in the order they were received.
+
+    If `recovery_pool` is given, the signers of large batches are recovered in
+    its native threads. The ECDSA recovery releases the GIL, so this keeps the
+    hub responsive and uses multiple cores. The recovered sender is memoized
+    by the messages and reused by the checks below.
+    """
     if not isinstance(data, str):
         log.warning(
             "Received Message body not a string",
@@ -799,6 +817,8 @@ def validate_and_parse_message(data: Any, peer_address: Address) -> List[Message
         )
         return []
 
+    signed_messages: List[SignedMessage] = list()
+
     for line in data.splitlines():
         line = line.strip()
         if not line:
@@ -820,11 +840,27 @@ def validate_and_parse_message(data: Any, peer_address: Address) -> List[Message
                 peer_address=to_checksum_address(peer_address),
             )
             continue
-        if message.sender != peer_address:
+        signed_messages.append(message)
+
+    if recovery_pool is not None and len(signed_messages) >= MATRIX_PARALLEL_RECOVERY_MIN_BATCH:
+        # One task per thread, handing off every message costs more than
+        # recovering its signer
+        chunk_size = -(-len(signed_messages) // recovery_pool.maxsize)
+        chunks = [
+            signed_messages[start : start + chunk_size]
+            for start in range(0, len(signed_messages), chunk_size)
+        ]
+        senders = list(chain.from_iterable(recovery_pool.map(_recover_senders, chunks)))
+    else:
+        senders = _recover_senders(signed_messages)
+
+    messages: List[Message] = list()
+    for message, sender in zip(signed_messages, senders):
+        if sender != peer_address:
             log.warning(
                 "Message not signed by sender!",
                 message=message,
-                signer=message.sender,
+                signer=sender,
                 peer_address=to_checksum_address(peer_address),
             )
             continue
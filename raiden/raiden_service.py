@@ -1,7 +1,7 @@
 # pylint: disable=too-many-lines
 import os
 import random
-from collections import defaultdict
+from collections import Counter, defaultdict
 from datetime import datetime
 from typing import Any, Dict, List, NamedTuple, Tuple
 from uuid import UUID
@@ -12,17 +12,20 @@
 from eth_utils import is_binary_address, to_hex
 from gevent import Greenlet
 from gevent.event import AsyncResult, Event
+from requests.exceptions import RequestException
+from web3.exceptions import BadFunctionCallOutput
 
 from raiden import routing
 from raiden.blockchain.decode import blockchainevent_to_statechange
 from raiden.blockchain.events import (
-    ZERO_POLL_RESULT,
     BlockchainEvents,
+    PollResult,
     SmartContractEvents,
     secret_registry_events,
     token_network_events,
     token_network_registry_events,
 )
+from raiden.blockchain.filters import ChannelEventsPrefilter
 from raiden.blockchain_events_handler import after_blockchain_statechange
 from raiden.connection_manager import ConnectionManager
 from raiden.constants import (
@@ -54,9 +57,10 @@
 from raiden.network.proxies.token_network_registry import TokenNetworkRegistry
 from raiden.network.proxies.user_deposit import UserDeposit
 from raiden.network.rpc.client import JSONRPCClient
+from raiden.network.rpc.subscription import NewHeadsSubscription
 from raiden.network.transport.matrix.transport import MatrixTransport
 from raiden.raiden_event_handler import EventHandler
-from raiden.services import send_pfs_update, update_monitoring_service_from_balance_proof
+from raiden.services import PFSUpdateDebouncer, update_monitoring_service_from_balance_proof
 from raiden.settings import RaidenConfig
 from raiden.storage import sqlite, wal
 from raiden.storage.serialization import DictSerializer, JSONSerializer
@@ -99,6 +103,7 @@
 from raiden.utils.runnable import Runnable
 from raiden.utils.secrethash import sha256_secrethash
 from raiden.utils.signer import LocalSigner, Signer
+from raiden.utils.signing_service import SigningService
 from raiden.utils.transfers import random_secret
 from raiden.utils.typing import (
     Address,
@@ -177,6 +182,7 @@ def initiator_init(
         previous_address=None,
         pfs_config=raiden.config.pfs_config,
         privkey=raiden.privkey,
+        routing_engine=raiden.routing_engine,
     )
 
     # Only prepare feedback when token is available
@@ -265,12 +271,25 @@ def __init__(
 
         self.signer: Signer = LocalSigner(self.rpc_client.privkey)
         self.address = self.signer.address
+        self.signing_service = SigningService(self.signer)
+        self.pfs_update_debouncer = PFSUpdateDebouncer(
+            self, flush_interval=self.config.services.pfs_update_flush_interval
+        )
         self.transport = transport
 
         self.user_deposit = user_deposit
 
+        new_heads_subscription = None
+        if self.config.blockchain.new_heads_endpoint is not None:
+            new_heads_subscription = NewHeadsSubscription(
+                endpoint=self.config.blockchain.new_heads_endpoint,
+                timeout=self.config.blockchain.new_heads_timeout,
+                reconnect_interval=self.config.blockchain.new_heads_reconnect_interval,
+            )
         self.alarm = AlarmTask(
-            proxy_manager=proxy_manager, sleep_time=self.config.blockchain.query_interval
+            proxy_manager=proxy_manager,
+            sleep_time=self.config.blockchain.query_interval,
+            new_heads_subscription=new_heads_subscription,
         )
         self.raiden_event_handler = raiden_event_handler
         self.message_handler = message_handler
@@ -282,6 +301,9 @@ def __init__(
 
         self.last_log_time = datetime.now()
         self.last_log_block = BlockNumber(0)
+        # Number of decoded blockchain events which did not result in a state
+        # change, by event name
+        self.discarded_blockchain_events: Counter = Counter()
 
         self.contract_manager = ContractManager(config.contracts_path)
         self.wal: Optional[WriteAheadLog] = None
@@ -315,6 +337,7 @@ def __init__(
 
         # A list is not hashable, so use tuple as key here
         self.route_to_feedback_token: Dict[Tuple[Address, ...], UUID] = dict()
+        self.routing_engine = routing.LocalRoutingEngine()
 
         # Flag used to skip the processing of all Raiden events during the
         # startup.
@@ -338,6 +361,7 @@ def start(self) -> None:
         assert self.stop_event.ready(), f"Node already started. node:{self!r}"
         self.stop_event.clear()
         self.greenlets = list()
+        self.signing_service.start()
 
         self.ready_to_process_events = False  # set to False because of restarts
 
@@ -350,6 +374,7 @@ def start(self) -> None:
         self._initialize_transactions_queues(chain_state)
         self._initialize_messages_queues(chain_state)
         self._initialize_channel_fees()
+        self._refresh_user_deposit_balance(views.block_number(chain_state))
         self._initialize_monitoring_services_queue(chain_state)
         self._initialize_ready_to_process_events()
 
@@ -387,6 +412,8 @@ def stop(self) -> None:
         # Needs to come before any greenlets joining
         self.stop_event.set()
 
+        self.pfs_update_debouncer.stop()
+
         # Filters must be uninstalled after the alarm task has stopped. Since
         # the events are polled by an alarm task callback, if the filters are
         # uninstalled before the alarm task is fully stopped the callback will
@@ -400,6 +427,10 @@ def stop(self) -> None:
         self.transport.greenlet.join()
         self.alarm.greenlet.join()
 
+        # Messages are signed by the transport and by the state machine, which
+        # is dispatched by the alarm task
+        self.signing_service.stop()
+
         assert (
             self.blockchain_events
         ), f"The blockchain_events has to be set by the start. node:{self!r}"
@@ -577,11 +608,15 @@ def _log_sync_progress(self, to_block: BlockNumber) -> None:
         elapsed = (now - self.last_log_time).total_seconds()
 
         if blocks_to_sync > 100 or elapsed > 15.0:
+            assert self.blockchain_events, "blockchain_events must be set to synchronize"
+            block_batch_size_adjuster = self.blockchain_events.block_batch_size_adjuster
             log.info(
                 "Synchronizing blockchain events",
                 blocks_to_sync=blocks_to_sync,
                 blocks_per_second=blocks_to_sync / elapsed,
                 elapsed=elapsed,
+                block_batch_size=block_batch_size_adjuster.batch_size,
+                last_request_duration=block_batch_size_adjuster.last_request_duration,
             )
             self.last_log_time = now
 
@@ -624,7 +659,20 @@ def _synchronize_with_blockchain(self) -> None:
             contract_manager=self.contract_manager,
             last_fetched_block=last_block_number,
             event_filters=filters,
-            max_number_of_blocks_to_poll=BlockNumber(100_000),
+            block_batch_size_config=self.config.blockchain.block_batch_size,
+            event_prefilter=ChannelEventsPrefilter(
+                our_address=self.address,
+                channel_identifiers=(
+                    (
+                        channel_state.canonical_identifier.token_network_address,
+                        channel_state.canonical_identifier.channel_identifier,
+                    )
+                    for channel_state in views.list_all_channelstate(chain_state)
+                ),
+                contract_manager=self.contract_manager,
+            ),
+            log_storage=self.wal.storage,
+            log_retention_blocks=self.config.blockchain.logs_retention_blocks,
         )
 
         latest_block_num = self.rpc_client.get_block(block_identifier="latest")["number"]
@@ -637,6 +685,9 @@ def _synchronize_with_blockchain(self) -> None:
         self.blockchain_events = blockchain_events
         self._poll_until_target(latest_confirmed_block_number)
 
+        # The receipts of the pending transactions are checked as soon as a
+        # new block is seen
+        self.alarm.register_callback(self.rpc_client.receipt_tracker.on_new_block)
         self.alarm.register_callback(self._callback_new_block)
 
     def _start_alarm_task(self) -> None:
@@ -743,16 +794,15 @@ def handle_state_changes(self, state_changes: List[StateChange]) -> List[Greenle
                 else:
                     canonical_identifier = state_change.canonical_identifier
 
-                send_pfs_update(
-                    raiden=self,
+                self.pfs_update_debouncer.schedule(
                     canonical_identifier=canonical_identifier,
                     update_fee_schedule=update_fee_schedule,
                 )
 
         for event in raiden_event_list:
             if isinstance(event, PFS_UPDATE_EVENTS):
-                send_pfs_update(
-                    raiden=self, canonical_identifier=event.balance_proof.canonical_identifier
+                self.pfs_update_debouncer.schedule(
+                    canonical_identifier=event.balance_proof.canonical_identifier
                 )
 
         for state_change in state_changes:
@@ -864,6 +914,28 @@ def _callback_new_block(self, latest_block: Dict) -> None:
         )
 
         self._poll_until_target(latest_confirmed_block_number)
+        self._refresh_user_deposit_balance(latest_confirmed_block_number)
+
+    def _refresh_user_deposit_balance(self, confirmed_block_number: BlockNumber) -> None:
+        """ Reads our effective balance in the user deposit contract into the
+        cache used by the monitoring service updates.
+
+        The cache is only used to decide whether the monitoring service is
+        updated, so a failed refresh keeps the previous value instead of
+        stopping the node. The next confirmed block refreshes it again.
+        """
+        if self.user_deposit is None or not self.config.services.monitoring_enabled:
+            return
+
+        try:
+            self.user_deposit.refresh_effective_balance(self.address, confirmed_block_number)
+        except (RequestException, ValueError, RuntimeError, BadFunctionCallOutput) as e:
+            log.warning(
+                "Could not refresh the user deposit balance, keeping the cached value",
+                node=to_checksum_address(self.address),
+                block_number=confirmed_block_number,
+                error=str(e),
+            )
 
     def _poll_until_target(self, target_block_number: BlockNumber) -> None:
         """Poll blockchain events up to `target_block_number`.
@@ -899,79 +971,143 @@ def _poll_until_target(self, target_block_number: BlockNumber) -> None:
         )
         assert self.blockchain_events, msg
 
-        poll_result = ZERO_POLL_RESULT
+        blockchain_events = self.blockchain_events
+        pipelined_sync = self.config.blockchain.pipelined_sync
 
-        sync_start = datetime.now()
+        # With `pipelined_sync` the logs of the next batch are fetched while
+        # the current batch is converted and dispatched, so that the round
+        # trip to the Ethereum node overlaps with the state machine work.
+        #
+        # This keeps the guarantees of the sequential synchronization:
+        #
+        # - The next batch is fetched only after `fetch_logs_in_batch`
+        # returned the current one, at which point the filters for the smart
+        # contracts deployed in the current batch have been registered and
+        # queried for it.
+        # - The batches are dispatched in order, each one together with its
+        # Block state change, so a block is confirmed only after all of its
+        # events have been applied.
+        prefetched_poll: Optional[Greenlet] = None
+        dispatched_block_number = blockchain_events.last_fetched_block
 
-        while self.blockchain_events.last_fetched_block < target_block_number:
-            self._log_sync_progress(target_block_number)
+        sync_start = datetime.now()
 
-            poll_result = self.blockchain_events.fetch_logs_in_batch(target_block_number)
-            pendingtokenregistration: Dict[
-                TokenNetworkAddress, Tuple[TokenNetworkRegistryAddress, TokenAddress]
-            ] = dict()
+        try:
+            while (
+                prefetched_poll is not None
+                or blockchain_events.last_fetched_block < target_block_number
+            ):
+                self._log_sync_progress(target_block_number)
 
-            state_changes: List[StateChange] = list()
-            for event in poll_result.events:
-                state_changes.extend(
-                    blockchainevent_to_statechange(
-                        self, event, poll_result.polled_block_number, pendingtokenregistration
-                    )
-                )
+                if prefetched_poll is not None:
+                    maybe_poll_result = prefetched_poll.get()
+                    prefetched_poll = None
+                else:
+                    maybe_poll_result = blockchain_events.fetch_logs_in_batch(target_block_number)
 
-            # On restarts the node has to pick up all events generated since the
-            # last run. To do this the node will set the filters' from_block to
-            # the value of the latest block number known to have *all* events
-            # processed.
-            #
-            # To guarantee the above the node must either:
-            #
-            # - Dispatch the state changes individually, leaving the Block
-            # state change last, so that it knows all the events for the
-            # given block have been processed. On restarts this can result in
-            # the same event being processed twice.
-            # - Dispatch all the smart contract events together with the Block
-            # state change in a single transaction, either all or nothing will
-            # be applied, and on a restart the node picks up from where it
-            # left.
-            #
-            # The approach used bellow is to dispatch the Block and the
-            # blockchain events in a single transaction. This is the preferred
-            # approach because it guarantees that no events will be missed and
-            # it fixes race conditions on the value of the block number value,
-            # that can lead to crashes.
-            #
-            # Example: The user creates a new channel with an initial deposit
-            # of X tokens. This is done with two operations, the first is to
-            # open the new channel, the second is to deposit the requested
-            # tokens in it. Once the node fetches the event for the new channel,
-            # it will immediately request the deposit, which leaves a window for
-            # a race condition. If the Block state change was not yet
-            # processed, the block hash used as the triggering block for the
-            # deposit will be off-by-one, and it will point to the block
-            # immediately before the channel existed. This breaks a proxy
-            # precondition which crashes the client.
-            block_state_change = Block(
-                block_number=poll_result.polled_block_number,
-                gas_limit=poll_result.polled_block_gas_limit,
-                block_hash=poll_result.polled_block_hash,
-            )
-            state_changes.append(block_state_change)
+                if maybe_poll_result is None:
+                    # The request timed out, retry with the decreased block batch size
+                    continue
 
-            # It's important to /not/ block here, because this function can
-            # be called from the alarm task greenlet, which should not
-            # starve. This was a problem when the node decided to send a new
-            # transaction, since the proxies block until the transaction is
-            # mined and confirmed (e.g. the settle window is over and the
-            # node sends the settle transaction).
-            self.handle_and_track_state_changes(state_changes)
+                if pipelined_sync and blockchain_events.last_fetched_block < target_block_number:
+                    prefetched_poll = gevent.spawn(
+                        blockchain_events.fetch_logs_in_batch, target_block_number
+                    )
+                    prefetched_poll.name = f"RaidenService._poll_until_target node:{self!r}"
+                    # Let the greenlet send the request before the batch is
+                    # dispatched
+                    gevent.sleep(0)
+
+                dispatched_block_number = maybe_poll_result.polled_block_number
+                self._dispatch_poll_result(maybe_poll_result)
+        finally:
+            # The dispatch failed, discard the prefetched batch. If it was
+            # fetched already rewind `last_fetched_block`, so that the batch is
+            # fetched again by the next poll, like it is done without the
+            # prefetch.
+            if prefetched_poll is not None:
+                prefetched_poll.kill()
+                if isinstance(prefetched_poll.value, PollResult):
+                    blockchain_events.last_fetched_block = dispatched_block_number
 
         sync_end = datetime.now()
         log.debug(
             "Synchronized to a new confirmed block",
-            event_filters_qty=len(self.blockchain_events._address_to_filters),
+            event_filters_qty=len(blockchain_events._address_to_filters),
             sync_elapsed=sync_end - sync_start,
+            block_batch_size=blockchain_events.block_batch_size_adjuster.batch_size,
+        )
+        if blockchain_events.event_prefilter is not None:
+            log.debug(
+                "Filtered blockchain events",
+                received_channel_logs=dict(blockchain_events.event_prefilter.received_logs),
+                dropped_before_decoding=dict(blockchain_events.event_prefilter.dropped_logs),
+                discarded_after_decoding=dict(self.discarded_blockchain_events),
+            )
+
+    def _dispatch_poll_result(self, poll_result: PollResult) -> None:
+        """ Converts the events of `poll_result` to state changes and dispatches
+        them together with the Block state change of the polled block.
+        """
+        pendingtokenregistration: Dict[
+            TokenNetworkAddress, Tuple[TokenNetworkRegistryAddress, TokenAddress]
+        ] = dict()
+
+        state_changes: List[StateChange] = list()
+        for event in poll_result.events:
+            event_state_changes = blockchainevent_to_statechange(
+                self, event, poll_result.polled_block_number, pendingtokenregistration
+            )
+            if not event_state_changes:
+                self.discarded_blockchain_events[event.event_data["event"]] += 1
+            state_changes.extend(event_state_changes)
+
+        # On restarts the node has to pick up all events generated since the
+        # last run. To do this the node will set the filters' from_block to
+        # the value of the latest block number known to have *all* events
+        # processed.
+        #
+        # To guarantee the above the node must either:
+        #
+        # - Dispatch the state changes individually, leaving the Block
+        # state change last, so that it knows all the events for the
+        # given block have been processed. On restarts this can result in
+        # the same event being processed twice.
+        # - Dispatch all the smart contract events together with the Block
+        # state change in a single transaction, either all or nothing will
+        # be applied, and on a restart the node picks up from where it
+        # left.
+        #
+        # The approach used bellow is to dispatch the Block and the
+        # blockchain events in a single transaction. This is the preferred
+        # approach because it guarantees that no events will be missed and
+        # it fixes race conditions on the value of the block number value,
+        # that can lead to crashes.
+        #
+        # Example: The user creates a new channel with an initial deposit
+        # of X tokens. This is done with two operations, the first is to
+        # open the new channel, the second is to deposit the requested
+        # tokens in it. Once the node fetches the event for the new channel,
+        # it will immediately request the deposit, which leaves a window for
+        # a race condition. If the Block state change was not yet
+        # processed, the block hash used as the triggering block for the
+        # deposit will be off-by-one, and it will point to the block
+        # immediately before the channel existed. This breaks a proxy
+        # precondition which crashes the client.
+        block_state_change = Block(
+            block_number=poll_result.polled_block_number,
+            gas_limit=poll_result.polled_block_gas_limit,
+            block_hash=poll_result.polled_block_hash,
         )
+        state_changes.append(block_state_change)
+
+        # It's important to /not/ block here, because this function can
+        # be called from the alarm task greenlet, which should not
+        # starve. This was a problem when the node decided to send a new
+        # transaction, since the proxies block until the transaction is
+        # mined and confirmed (e.g. the settle window is over and the
+        # node sends the settle transaction).
+        self.handle_and_track_state_changes(state_changes)
 
     def _initialize_transactions_queues(self, chain_state: ChainState) -> None:
         """Initialize the pending transaction queue from the previous run.
@@ -1180,10 +1316,8 @@ def _initialize_channel_fees(self) -> None:
                     proportional=proportional_fee,
                     imbalance_penalty=imbalance_penalty,
                 )
-                send_pfs_update(
-                    raiden=self,
-                    canonical_identifier=channel.canonical_identifier,
-                    update_fee_schedule=True,
+                self.pfs_update_debouncer.schedule(
+                    canonical_identifier=channel.canonical_identifier, update_fee_schedule=True
                 )
 
     def _get_initial_whitelist(self, chain_state: ChainState) -> List[Address]:
@@ -1213,7 +1347,7 @@ def sign(self, message: Message) -> None:
         if not isinstance(message, SignedMessage):
             raise ValueError("{} is not signable.".format(repr(message)))
 
-        message.sign(self.signer)
+        self.signing_service.sign(message)
 
     def connection_manager_for_token_network(
         self, token_network_address: TokenNetworkAddress
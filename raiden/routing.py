@@ -1,21 +1,24 @@
 from heapq import heappop, heappush
 from uuid import UUID
 
-import networkx
 import structlog
+from cachetools import LRUCache
 from eth_utils import to_canonical_address
 
 from raiden.exceptions import ServiceRequestFailed
 from raiden.messages.metadata import RouteMetadata
 from raiden.network.pathfinding import PFSConfig, query_paths
-from raiden.settings import INTERNAL_ROUTING_DEFAULT_FEE_PERC
+from raiden.settings import INTERNAL_ROUTING_CACHE_SIZE, INTERNAL_ROUTING_DEFAULT_FEE_PERC
 from raiden.transfer import channel, views
-from raiden.transfer.state import ChainState, ChannelState, RouteState
+from raiden.transfer.graph import ChannelGraph
+from raiden.transfer.state import ChainState, ChannelState, RouteState, TokenNetworkState
 from raiden.utils.formatting import to_checksum_address
 from raiden.utils.typing import (
     Address,
     ChannelID,
+    Dict,
     FeeAmount,
+    FrozenSet,
     InitiatorAddress,
     List,
     NamedTuple,
@@ -31,6 +34,72 @@
 log = structlog.get_logger(__name__)
 
 
+class LocalRoutingEngine:
+    """ Caches the routes from the partners of the local node to the targets
+    of recent payments, used when routing without a PFS.
+
+    The routes never go back through the local node, so that the only channel
+    of the local node in a route is its first hop. The capacities of these
+    channels are checked by `get_best_routes` on every query, they change
+    with every payment. The capacities of the other channels are unknown
+    without a PFS.
+
+    A topology change only invalidates the cached routes of a target which
+    it affects: a closed channel in one of them, a new or removed partner of
+    the local node, or any new channel when a partner had no route. Otherwise
+    the cached routes all still exist and are reused, even though a new
+    channel may have made a shorter one.
+    """
+
+    def __init__(self, cache_size: int = INTERNAL_ROUTING_CACHE_SIZE) -> None:
+        self.cache: LRUCache = LRUCache(cache_size)
+        self.hits = 0
+        self.misses = 0
+
+    def partner_routes(
+        self, token_network: TokenNetworkState, from_address: Address, to_address: Address
+    ) -> Dict[Address, List[Address]]:
+        """ One of the shortest routes from each partner of `from_address` to
+        `to_address`, partners without a route are not in the result.
+
+        The result is shared with the cache and must not be modified.
+        """
+        graph = token_network.network_graph.network
+        key = (token_network.address, from_address, to_address)
+        partners = graph.neighbors(from_address)
+
+        cached = self.cache.get(key)
+        if cached is not None and self._is_valid(graph, partners, *cached):
+            self.hits += 1
+            self.cache[key] = (graph.version, cached[1], cached[2])
+            return cached[1]
+
+        self.misses += 1
+        routes = graph.shortest_paths_to(to_address, partners, excluded=[from_address])
+        self.cache[key] = (graph.version, routes, frozenset(partners))
+        return routes
+
+    @staticmethod
+    def _is_valid(
+        graph: ChannelGraph,
+        partners: List[Address],
+        version: int,
+        routes: Dict[Address, List[Address]],
+        cached_partners: FrozenSet[Address],
+    ) -> bool:
+        if version == graph.version:
+            return True
+
+        if cached_partners != frozenset(partners):
+            return False
+
+        # A new channel may connect a partner which had no route
+        if len(routes) != len(cached_partners):
+            return False
+
+        return all(graph.has_path(route) for route in routes.values())
+
+
 def get_best_routes(
     chain_state: ChainState,
     token_network_address: TokenNetworkAddress,
@@ -41,18 +110,15 @@ def get_best_routes(
     previous_address: Optional[Address],
     pfs_config: Optional[PFSConfig],
     privkey: bytes,
+    routing_engine: Optional[LocalRoutingEngine] = None,
 ) -> Tuple[Optional[str], List[RouteState], Optional[UUID]]:
 
     token_network = views.get_token_network_by_address(chain_state, token_network_address)
     assert token_network, "The token network must be validated and exist."
 
     try:
-        # networkx returns a generator, consume the result since it will be
-        # iterated over multiple times.
-        all_neighbors = list(
-            networkx.all_neighbors(token_network.network_graph.network, from_address)
-        )
-    except networkx.NetworkXError:
+        all_neighbors = token_network.network_graph.network.neighbors(Address(from_address))
+    except KeyError:
         # If `our_address` is not in the graph, no channels opened with the
         # address.
         log.debug(
@@ -96,6 +162,45 @@ def get_best_routes(
 
             error_direct = is_usable
 
+    if pfs_config is not None and one_to_n_address is not None:
+        # The local view of the network is not used when a PFS is configured,
+        # so don't spend time computing routes which would be discarded.
+        pfs_error_msg, pfs_routes, pfs_feedback_token = get_best_routes_pfs(
+            chain_state=chain_state,
+            token_network_address=token_network_address,
+            one_to_n_address=one_to_n_address,
+            from_address=from_address,
+            to_address=to_address,
+            amount=amount,
+            previous_address=previous_address,
+            pfs_config=pfs_config,
+            privkey=privkey,
+        )
+
+        if not pfs_error_msg:
+            # As of version 0.5 it is possible for the PFS to return an empty
+            # list of routes without an error message.
+            if not pfs_routes:
+                return ("PFS could not find any routes", list(), None)
+
+            log.info(
+                "Received route(s) from PFS", routes=pfs_routes, feedback_token=pfs_feedback_token
+            )
+            return (pfs_error_msg, pfs_routes, pfs_feedback_token)
+
+        log.warning(
+            "Request to Pathfinding Service was not successful. "
+            "No routes to the target are found."
+        )
+        return (pfs_error_msg, list(), None)
+
+    if routing_engine is None:
+        routing_engine = LocalRoutingEngine()
+
+    partner_routes = routing_engine.partner_routes(
+        token_network, Address(from_address), Address(to_address)
+    )
+
     for partner_address in all_neighbors:
         for channel_id in token_network.partneraddresses_to_channelidentifiers[partner_address]:
             channel_state = token_network.channelidentifiers_to_channels[channel_id]
@@ -104,11 +209,8 @@ def get_best_routes(
                 error_closed += 1
                 continue
 
-            try:
-                route = networkx.shortest_path(
-                    token_network.network_graph.network, partner_address, to_address
-                )
-            except (networkx.NetworkXNoPath, networkx.NodeNotFound):
+            route = partner_routes.get(partner_address)
+            if route is None:
                 error_no_route += 1
             else:
                 distributable = channel.get_distributable(
@@ -159,59 +261,28 @@ def get_best_routes(
         )
         return (error_msg, list(), None)
 
-    if pfs_config is not None and one_to_n_address is not None:
-        pfs_error_msg, pfs_routes, pfs_feedback_token = get_best_routes_pfs(
-            chain_state=chain_state,
-            token_network_address=token_network_address,
-            one_to_n_address=one_to_n_address,
-            from_address=from_address,
-            to_address=to_address,
-            amount=amount,
-            previous_address=previous_address,
-            pfs_config=pfs_config,
-            privkey=privkey,
-        )
+    available_routes = list()
 
-        if not pfs_error_msg:
-            # As of version 0.5 it is possible for the PFS to return an empty
-            # list of routes without an error message.
-            if not pfs_routes:
-                return ("PFS could not find any routes", list(), None)
+    while shortest_routes:
+        neighbour = heappop(shortest_routes)
 
-            log.info(
-                "Received route(s) from PFS", routes=pfs_routes, feedback_token=pfs_feedback_token
-            )
-            return (pfs_error_msg, pfs_routes, pfs_feedback_token)
-
-        log.warning(
-            "Request to Pathfinding Service was not successful. "
-            "No routes to the target are found."
-        )
-        return (pfs_error_msg, list(), None)
+        # https://github.com/raiden-network/raiden/issues/4751
+        # Internal routing doesn't know how much fees the initiator will be charged,
+        # so it should set a percentage on top of the original amount
+        # for the whole route.
+        estimated_fee = FeeAmount(round(INTERNAL_ROUTING_DEFAULT_FEE_PERC * amount))
+        if neighbour.length == 1:  # Target is our direct neighbour, pay no fees.
+            estimated_fee = FeeAmount(0)
 
-    else:
-        available_routes = list()
-
-        while shortest_routes:
-            neighbour = heappop(shortest_routes)
-
-            # https://github.com/raiden-network/raiden/issues/4751
-            # Internal routing doesn't know how much fees the initiator will be charged,
-            # so it should set a percentage on top of the original amount
-            # for the whole route.
-            estimated_fee = FeeAmount(round(INTERNAL_ROUTING_DEFAULT_FEE_PERC * amount))
-            if neighbour.length == 1:  # Target is our direct neighbour, pay no fees.
-                estimated_fee = FeeAmount(0)
-
-            available_routes.append(
-                RouteState(
-                    route=neighbour.route,
-                    forward_channel_id=neighbour.channelid,
-                    estimated_fee=estimated_fee,
-                )
+        available_routes.append(
+            RouteState(
+                route=neighbour.route,
+                forward_channel_id=neighbour.channelid,
+                estimated_fee=estimated_fee,
             )
+        )
 
-        return (None, available_routes, None)
+    return (None, available_routes, None)
 
 
 class Neighbour(NamedTuple):
@@ -1,17 +1,21 @@
+import gevent
 import structlog
+from gevent import Greenlet
+from gevent.event import AsyncResult
 
 from raiden import constants
 from raiden.constants import RoutingMode
+from raiden.messages.abstract import SignedMessage
 from raiden.messages.monitoring_service import RequestMonitoring
 from raiden.messages.path_finding_service import PFSCapacityUpdate, PFSFeeUpdate
 from raiden.settings import MONITORING_REWARD
-from raiden.transfer import views
+from raiden.transfer import channel, views
 from raiden.transfer.architecture import BalanceProofSignedState
 from raiden.transfer.identifiers import CanonicalIdentifier
-from raiden.transfer.state import ChainState
+from raiden.transfer.state import ChainState, NettingChannelState
 from raiden.utils.formatting import to_checksum_address
 from raiden.utils.transfers import to_rdn
-from raiden.utils.typing import TYPE_CHECKING, Address
+from raiden.utils.typing import TYPE_CHECKING, Address, Dict, List, Optional, TokenAmount, Tuple
 
 if TYPE_CHECKING:
     from raiden.raiden_service import RaidenService
@@ -24,28 +28,147 @@ def send_pfs_update(
     raiden: "RaidenService",
     canonical_identifier: CanonicalIdentifier,
     update_fee_schedule: bool = False,
-) -> None:
+) -> Optional[PFSCapacityUpdate]:
+    """ Sends the current capacity, and optionally the fee schedule, of the
+    channel to the PFS. Returns the capacity update if it is sent, the
+    messages are broadcast by a greenlet once they are signed.
+    """
     if raiden.routing_mode == RoutingMode.PRIVATE:
-        return
+        return None
 
     channel_state = views.get_channelstate_by_canonical_identifier(
         chain_state=views.state_from_raiden(raiden), canonical_identifier=canonical_identifier
     )
 
     if channel_state is None:
-        return
+        return None
 
     capacity_msg = PFSCapacityUpdate.from_channel_state(channel_state)
-    capacity_msg.sign(raiden.signer)
-    raiden.transport.broadcast(constants.PATH_FINDING_BROADCASTING_ROOM, capacity_msg)
-    log.debug("Sent a PFS Capacity Update", message=capacity_msg, channel_state=channel_state)
+    messages: List[SignedMessage] = [capacity_msg]
 
     if update_fee_schedule:
-        fee_msg = PFSFeeUpdate.from_channel_state(channel_state)
-        fee_msg.sign(raiden.signer)
+        messages.append(PFSFeeUpdate.from_channel_state(channel_state))
+
+    # This is called while the state changes are dispatched, the messages are
+    # broadcast once the signing service signed them
+    signatures = [raiden.signing_service.submit(message) for message in messages]
+    greenlet = gevent.spawn(broadcast_pfs_updates, raiden, signatures, channel_state)
+    greenlet.name = f"broadcast_pfs_updates channel:{canonical_identifier}"
+    raiden.add_pending_greenlet(greenlet)
+
+    return capacity_msg
+
+
+def broadcast_pfs_updates(
+    raiden: "RaidenService", signatures: List[AsyncResult], channel_state: NettingChannelState
+) -> None:
+    """ Waits for the PFS updates to be signed and broadcasts them in order. """
+    for signature in signatures:
+        message = signature.get()
+        raiden.transport.broadcast(constants.PATH_FINDING_BROADCASTING_ROOM, message)
+        log.debug(
+            f"Sent a {message.__class__.__name__}", message=message, channel_state=channel_state
+        )
+
+
+def get_pfs_capacities(channel_state: NettingChannelState) -> Tuple[TokenAmount, TokenAmount]:
+    """ The capacities sent to the PFS, ours first. """
+    return (
+        channel.get_distributable(
+            sender=channel_state.our_state, receiver=channel_state.partner_state
+        ),
+        channel.get_distributable(
+            sender=channel_state.partner_state, receiver=channel_state.our_state
+        ),
+    )
+
 
-        raiden.transport.broadcast(constants.PATH_FINDING_BROADCASTING_ROOM, fee_msg)
-        log.debug("Sent a PFS Fee Update", message=fee_msg, channel_state=channel_state)
+class PFSUpdateDebouncer:
+    """ Coalesces the PFS updates of each channel.
+
+    The first update of a channel is sent immediately. Later updates are
+    delayed by `flush_interval` seconds and merged with the updates scheduled
+    in the meantime. The messages are created from the channel state at the
+    time they are sent, so the PFS only receives the latest capacity and fee
+    schedule.
+
+    An update which decreases either capacity is sent immediately, otherwise
+    the PFS would keep routing payments through the channel that it cannot
+    forward anymore. A `flush_interval` of zero disables the debouncing.
+    """
+
+    def __init__(self, raiden: "RaidenService", flush_interval: float) -> None:
+        self.raiden = raiden
+        self.flush_interval = flush_interval
+
+        # Whether the fee schedule must be sent with the pending update
+        self.pending_updates: Dict[CanonicalIdentifier, bool] = dict()
+        self.flush_timers: Dict[CanonicalIdentifier, Greenlet] = dict()
+        self.sent_capacities: Dict[CanonicalIdentifier, Tuple[TokenAmount, TokenAmount]] = dict()
+
+    def _must_send_now(self, canonical_identifier: CanonicalIdentifier) -> bool:
+        sent_capacities = self.sent_capacities.get(canonical_identifier)
+        if self.flush_interval <= 0 or sent_capacities is None:
+            return True
+
+        channel_state = views.get_channelstate_by_canonical_identifier(
+            chain_state=views.state_from_raiden(self.raiden),
+            canonical_identifier=canonical_identifier,
+        )
+        if channel_state is None:
+            return True
+
+        capacities = get_pfs_capacities(channel_state)
+        return any(current < sent for current, sent in zip(capacities, sent_capacities))
+
+    def schedule(
+        self, canonical_identifier: CanonicalIdentifier, update_fee_schedule: bool = False
+    ) -> None:
+        if self.raiden.routing_mode == RoutingMode.PRIVATE:
+            return
+
+        self.pending_updates[canonical_identifier] = (
+            self.pending_updates.get(canonical_identifier, False) or update_fee_schedule
+        )
+
+        if self._must_send_now(canonical_identifier):
+            self.flush(canonical_identifier)
+        elif canonical_identifier not in self.flush_timers:
+            timer = gevent.spawn_later(self.flush_interval, self.flush, canonical_identifier)
+            timer.name = f"PFSUpdateDebouncer.flush channel:{canonical_identifier}"
+            self.flush_timers[canonical_identifier] = timer
+            self.raiden.add_pending_greenlet(timer)
+
+    def flush(self, canonical_identifier: CanonicalIdentifier) -> None:
+        """ Sends the pending update of the channel, if there is one. """
+        timer = self.flush_timers.pop(canonical_identifier, None)
+        if timer is not None and timer is not gevent.getcurrent():
+            timer.kill()
+
+        update_fee_schedule = self.pending_updates.pop(canonical_identifier, None)
+        if update_fee_schedule is None:
+            return
+
+        capacity_update = send_pfs_update(
+            raiden=self.raiden,
+            canonical_identifier=canonical_identifier,
+            update_fee_schedule=update_fee_schedule,
+        )
+        if capacity_update is not None:
+            self.sent_capacities[canonical_identifier] = (
+                capacity_update.updating_capacity,
+                capacity_update.other_capacity,
+            )
+        else:
+            self.sent_capacities.pop(canonical_identifier, None)
+
+    def stop(self) -> None:
+        """ Drops the pending updates. The updates of all channels are sent
+        when the node is started again.
+        """
+        gevent.killall(list(self.flush_timers.values()))
+        self.flush_timers.clear()
+        self.pending_updates.clear()
 
 
 def update_monitoring_service_from_balance_proof(
@@ -72,7 +195,11 @@ def update_monitoring_service_from_balance_proof(
     assert channel_state, msg
 
     assert raiden.user_deposit is not None
-    rei_balance = raiden.user_deposit.effective_balance(raiden.address, "latest")
+    # The balance is refreshed by the node for every confirmed block, this
+    # must not wait on the Ethereum node
+    rei_balance = raiden.user_deposit.cached_effective_balance(raiden.address)
+    if rei_balance is None:
+        rei_balance = raiden.user_deposit.effective_balance(raiden.address, "latest")
     if rei_balance < MONITORING_REWARD:
         rdn_balance = to_rdn(rei_balance)
         rdn_reward = to_rdn(MONITORING_REWARD)
@@ -94,5 +221,5 @@ def update_monitoring_service_from_balance_proof(
         reward_amount=MONITORING_REWARD,
         monitoring_service_contract_address=raiden.default_msc_address,
     )
-    monitoring_message.sign(raiden.signer)
+    raiden.signing_service.sign(monitoring_message)
     raiden.transport.broadcast(constants.MONITORING_BROADCASTING_ROOM, monitoring_message)
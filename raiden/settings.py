@@ -8,6 +8,7 @@
 from raiden.network.pathfinding import PFSConfig
 from raiden.utils.typing import (
     Address,
+    BlockNumber,
     BlockTimeout,
     ChainID,
     DatabasePath,
@@ -52,6 +53,9 @@
 DEFAULT_SETTLE_TIMEOUT = BlockTimeout(500)
 DEFAULT_RETRY_TIMEOUT = NetworkTimeout(0.5)
 DEFAULT_BLOCKCHAIN_QUERY_INTERVAL = 5.0
+DEFAULT_BLOCKCHAIN_PIPELINED_SYNC = True
+DEFAULT_NEW_HEADS_TIMEOUT = 60.0
+DEFAULT_NEW_HEADS_RECONNECT_INTERVAL = 5.0
 DEFAULT_JOINABLE_FUNDS_TARGET = 0.4
 DEFAULT_INITIAL_CHANNEL_TARGET = 3
 DEFAULT_WAIT_FOR_SETTLE = True
@@ -59,12 +63,29 @@
 DEFAULT_WAIT_BEFORE_LOCK_REMOVAL = BlockTimeout(2 * DEFAULT_NUMBER_OF_BLOCK_CONFIRMATIONS)
 DEFAULT_CHANNEL_SYNC_TIMEOUT = 5
 
+# Limits of the block range of the `eth_getLogs` requests and the request
+# durations used to adapt it, see `BlockBatchSizeAdjuster`
+DEFAULT_BLOCK_BATCH_SIZE_MIN = BlockNumber(5)
+DEFAULT_BLOCK_BATCH_SIZE_INITIAL = BlockNumber(1_000)
+DEFAULT_BLOCK_BATCH_SIZE_MAX = BlockNumber(1_000_000)
+DEFAULT_ETH_GET_LOGS_THRESHOLD_FAST = 1.0
+DEFAULT_ETH_GET_LOGS_THRESHOLD_SLOW = 5.0
+DEFAULT_ETH_GET_LOGS_MAX_EVENTS = 1_000
+# The confirmed logs older than this are pruned from the database, about a
+# month of blocks on mainnet
+DEFAULT_BLOCKCHAIN_LOGS_RETENTION_BLOCKS = BlockTimeout(200_000)
+
 DEFAULT_SHUTDOWN_TIMEOUT = 2
 
+# Native threads of the `SigningService`
+SIGNING_SERVICE_THREADS = 2
+
 DEFAULT_PATHFINDING_MAX_PATHS = 3
 DEFAULT_PATHFINDING_MAX_FEE = TokenAmount(5 * 10 ** 16)  # about .01$
 # PFS has 200 000 blocks (~40days) to cash in
 DEFAULT_PATHFINDING_IOU_TIMEOUT = BlockTimeout(2 * 10 ** 5)
+# Seconds by which the PFS updates of a channel are delayed to coalesce them
+DEFAULT_PFS_UPDATE_FLUSH_INTERVAL = 1.0
 
 DEFAULT_MEDIATION_FLAT_FEE = FeeAmount(0)
 DEFAULT_MEDIATION_PROPORTIONAL_FEE = ProportionalFeeAmount(4000)  # 0.4% in parts per million
@@ -74,6 +95,8 @@
 DEFAULT_MEDIATION_FEE_MARGIN: float = 0.03
 PAYMENT_AMOUNT_BASED_FEE_MARGIN: float = 0.0005
 INTERNAL_ROUTING_DEFAULT_FEE_PERC: float = 0.02
+# Number of (token network, target) pairs with cached local routes
+INTERNAL_ROUTING_CACHE_SIZE = 1000
 MAX_MEDIATION_FEE_PERC: float = 0.2
 
 ORACLE_BLOCKNUMBER_DRIFT_TOLERANCE = 3
@@ -136,12 +159,35 @@ class ServiceConfig:
     pathfinding_max_fee: TokenAmount = DEFAULT_PATHFINDING_MAX_FEE
     pathfinding_iou_timeout: BlockTimeout = DEFAULT_PATHFINDING_IOU_TIMEOUT
     monitoring_enabled: bool = False
+    pfs_update_flush_interval: float = DEFAULT_PFS_UPDATE_FLUSH_INTERVAL
+
+
+@dataclass
+class BlockBatchSizeConfig:
+    min: BlockNumber = DEFAULT_BLOCK_BATCH_SIZE_MIN
+    initial: BlockNumber = DEFAULT_BLOCK_BATCH_SIZE_INITIAL
+    max: BlockNumber = DEFAULT_BLOCK_BATCH_SIZE_MAX
+    # Requests faster than `fast_threshold` grow the range, requests slower
+    # than `slow_threshold` or with more than `max_events` shrink it
+    fast_threshold: float = DEFAULT_ETH_GET_LOGS_THRESHOLD_FAST
+    slow_threshold: float = DEFAULT_ETH_GET_LOGS_THRESHOLD_SLOW
+    max_events: int = DEFAULT_ETH_GET_LOGS_MAX_EVENTS
 
 
 @dataclass
 class BlockchainConfig:
     confirmation_blocks: BlockTimeout = DEFAULT_NUMBER_OF_BLOCK_CONFIRMATIONS
     query_interval: float = DEFAULT_BLOCKCHAIN_QUERY_INTERVAL
+    block_batch_size: BlockBatchSizeConfig = BlockBatchSizeConfig()
+    # Number of blocks for which the fetched logs are kept in the database
+    logs_retention_blocks: BlockTimeout = DEFAULT_BLOCKCHAIN_LOGS_RETENTION_BLOCKS
+    # Fetch the logs of the next batch while the current one is dispatched
+    pipelined_sync: bool = DEFAULT_BLOCKCHAIN_PIPELINED_SYNC
+    # WebSocket endpoint of the Ethereum node, new blocks are pushed by it
+    # with `eth_subscribe("newHeads")` instead of polled every `query_interval`
+    new_heads_endpoint: Optional[str] = None
+    new_heads_timeout: float = DEFAULT_NEW_HEADS_TIMEOUT
+    new_heads_reconnect_interval: float = DEFAULT_NEW_HEADS_RECONNECT_INTERVAL
 
 
 @dataclass
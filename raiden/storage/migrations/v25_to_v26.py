@@ -0,0 +1,28 @@
+from raiden.storage.sqlite import SQLiteStorage
+from raiden.storage.utils import (
+    DB_CREATE_BLOCKCHAIN_LOGS,
+    DB_CREATE_BLOCKCHAIN_LOGS_BLOCK_NUMBER_INDEX,
+    DB_CREATE_BLOCKCHAIN_LOGS_RANGES,
+)
+from raiden.utils.typing import Any
+
+SOURCE_VERSION = 25
+TARGET_VERSION = 26
+
+
+def upgrade_v25_to_v26(
+    storage: SQLiteStorage, old_version: int, current_version: int, **kwargs: Any
+) -> int:
+    """ Add the tables of the confirmed blockchain logs.
+
+    The tables start empty, the logs are stored as the blockchain is
+    synchronized and the older blocks are queried from the Ethereum node.
+    """
+    # pylint: disable=unused-argument
+    if old_version == SOURCE_VERSION:
+        cursor = storage.conn.cursor()
+        cursor.execute(DB_CREATE_BLOCKCHAIN_LOGS)
+        cursor.execute(DB_CREATE_BLOCKCHAIN_LOGS_BLOCK_NUMBER_INDEX)
+        cursor.execute(DB_CREATE_BLOCKCHAIN_LOGS_RANGES)
+
+    return TARGET_VERSION
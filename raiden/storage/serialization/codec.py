@@ -0,0 +1,188 @@
+""" Specialized encoder and decoder for the messages sent over the transport.
+
+The schemas created by `marshmallow_dataclass` are generic, dumping and
+loading a message through them costs far more than the conversion of its
+few fields. This codec creates a list of converters per message class once,
+from the same type mapping that is used by the schemas, `TYPE_TO_FIELD`, and
+converts the messages to and from dictionaries directly.
+
+The codec only handles values which it converts exactly like the schemas.
+For unsupported classes, e.g. messages with nested polymorphic fields, and
+for input which is not in the canonical format, e.g. missing or additional
+keys, `None` is returned and the caller must use the schemas. This keeps the
+wire format and the error reporting of the schemas.
+"""
+from binascii import unhexlify
+from dataclasses import fields, is_dataclass
+
+from raiden.messages.abstract import Message
+from raiden.storage.serialization.fields import AddressField, BytesField, IntegerToStringField
+from raiden.storage.serialization.types import TYPE_TO_FIELD
+from raiden.utils.formatting import to_checksum_address
+from raiden.utils.typing import Any, Callable, Dict, List, Optional, Tuple
+
+Encoder = Callable[[Any], Any]
+Decoder = Callable[[Any], Any]
+Converters = List[Tuple[str, Encoder, Decoder]]
+
+
+class UnsupportedValue(Exception):
+    """ Raised for values which must be converted by the schemas. """
+
+
+def _encode_int(value: Any) -> str:
+    # `bool` and `None` are not in the canonical format
+    if type(value) is not int:  # pylint: disable=unidiomatic-typecheck
+        raise UnsupportedValue(value)
+    return str(value)
+
+
+def _decode_int(value: Any) -> int:
+    if type(value) is int:  # pylint: disable=unidiomatic-typecheck
+        return value
+    if type(value) is not str:  # pylint: disable=unidiomatic-typecheck
+        raise UnsupportedValue(value)
+    return int(value)
+
+
+def _encode_bytes(value: Any) -> str:
+    if not isinstance(value, bytes):
+        raise UnsupportedValue(value)
+    return "0x" + value.hex()
+
+
+def _decode_bytes(value: Any) -> bytes:
+    if not isinstance(value, str) or not value.startswith("0x"):
+        raise UnsupportedValue(value)
+    return unhexlify(value[2:])
+
+
+def _encode_address(value: Any) -> str:
+    if not isinstance(value, bytes) or len(value) != 20:
+        raise UnsupportedValue(value)
+    return to_checksum_address(value)
+
+
+def _decode_address(value: Any) -> bytes:
+    if not isinstance(value, str) or len(value) != 42 or not value.startswith("0x"):
+        raise UnsupportedValue(value)
+    return unhexlify(value[2:])
+
+
+def _list_converters(item_encoder: Encoder, item_decoder: Decoder) -> Tuple[Encoder, Decoder]:
+    def encode(value: Any) -> List[Any]:
+        if not isinstance(value, list):
+            raise UnsupportedValue(value)
+        return [item_encoder(item) for item in value]
+
+    def decode(value: Any) -> List[Any]:
+        if not isinstance(value, list):
+            raise UnsupportedValue(value)
+        return [item_decoder(item) for item in value]
+
+    return encode, decode
+
+
+def _dataclass_converters(klass: type) -> Tuple[Encoder, Decoder]:
+    converters = _make_converters(klass)
+    names = {name for name, _, _ in converters}
+
+    def encode(value: Any) -> Dict[str, Any]:
+        if type(value) is not klass:  # pylint: disable=unidiomatic-typecheck
+            raise UnsupportedValue(value)
+        return {name: encoder(getattr(value, name)) for name, encoder, _ in converters}
+
+    def decode(value: Any) -> Any:
+        if not isinstance(value, dict) or value.keys() != names:
+            raise UnsupportedValue(value)
+        return klass(**{name: decoder(value[name]) for name, _, decoder in converters})
+
+    return encode, decode
+
+
+def _field_converters(field_type: Any) -> Tuple[Encoder, Decoder]:
+    marshmallow_field = TYPE_TO_FIELD.get(field_type)
+    if marshmallow_field is AddressField:
+        return _encode_address, _decode_address
+    if marshmallow_field is BytesField:
+        return _encode_bytes, _decode_bytes
+    if marshmallow_field is IntegerToStringField:
+        return _encode_int, _decode_int
+
+    if getattr(field_type, "__origin__", None) is list:
+        return _list_converters(*_field_converters(field_type.__args__[0]))
+
+    if is_dataclass(field_type):
+        return _dataclass_converters(field_type)
+
+    raise UnsupportedValue(f"No converter for {field_type}")
+
+
+def _make_converters(klass: type) -> Converters:
+    """ Converters of the fields of the dataclass `klass`, in the same format
+    as its schema.
+
+    Raises:
+        UnsupportedValue: If any field is not handled by the codec.
+    """
+    converters = list()
+    for field in fields(klass):
+        if not field.init:
+            continue
+
+        if "marshmallow_field" in field.metadata:
+            raise UnsupportedValue(f"{klass.__name__}.{field.name} has a custom field")
+
+        encoder, decoder = _field_converters(field.type)
+        converters.append((field.name, encoder, decoder))
+
+    return converters
+
+
+class MessageCodec:
+    """ Converts messages to and from the dictionaries of the wire format.
+
+    The converters are created on first use of a message class. Every method
+    returns `None` where the schemas must be used instead.
+    """
+
+    _converters: Dict[type, Optional[Tuple[Encoder, Decoder]]] = dict()
+
+    @classmethod
+    def get_converters(cls, klass: type) -> Optional[Tuple[Encoder, Decoder]]:
+        if klass not in cls._converters:
+            try:
+                cls._converters[klass] = _dataclass_converters(klass)
+            except UnsupportedValue:
+                cls._converters[klass] = None
+        return cls._converters[klass]
+
+    @classmethod
+    def encode(cls, message: Message) -> Optional[Dict[str, Any]]:
+        """ The wire format of `message`, with its class name in `type`. """
+        klass = type(message)
+        converters = cls.get_converters(klass)
+        if converters is None:
+            return None
+
+        try:
+            data = converters[0](message)
+        except (UnsupportedValue, ValueError, TypeError):
+            return None
+
+        data["type"] = klass.__name__
+        return data
+
+    @classmethod
+    def decode(cls, klass: type, data: Dict[str, Any]) -> Optional[Message]:
+        """ The message of class `klass` with the fields in `data`, which must
+        not contain the `type`.
+        """
+        converters = cls.get_converters(klass)
+        if converters is None:
+            return None
+
+        try:
+            return converters[1](data)
+        except (UnsupportedValue, ValueError, TypeError):
+            return None
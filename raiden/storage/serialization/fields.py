@@ -7,6 +7,7 @@
 from eth_utils import to_bytes, to_canonical_address, to_hex
 from marshmallow_polyfield import PolyField
 
+from raiden.transfer.graph import ChannelGraph
 from raiden.transfer.identifiers import CanonicalIdentifier, QueueIdentifier
 from raiden.utils.formatting import to_checksum_address
 from raiden.utils.typing import Address, Any, ChainID, ChannelID, Optional, Tuple
@@ -156,3 +157,29 @@ def _deserialize(self, value: str, attr: Any, data: Any, **kwargs: Any) -> netwo
             return networkx.Graph(canonical_addresses)
         except (TypeError, ValueError):
             raise self.make_error("validator_failed", input=value)
+
+
+class ChannelGraphField(marshmallow.fields.Field):
+    """ Converts ChannelGraph objects to a string.
+
+    Uses the same format as `NetworkXGraphField`, so snapshots taken with a
+    `networkx.Graph` can be restored.
+    """
+
+    def _serialize(self, value: ChannelGraph, attr: Any, obj: Any, **kwargs: Any) -> str:
+        return json.dumps(
+            [
+                (to_checksum_address(edge[0]), to_checksum_address(edge[1]))
+                for edge in value.edges()
+            ]
+        )
+
+    def _deserialize(self, value: str, attr: Any, data: Any, **kwargs: Any) -> ChannelGraph:
+        try:
+            raw_data = json.loads(value)
+            canonical_addresses = [
+                (to_canonical_address(edge[0]), to_canonical_address(edge[1])) for edge in raw_data
+            ]
+            return ChannelGraph(canonical_addresses)
+        except (TypeError, ValueError):
+            raise self.make_error("validator_failed", input=value)
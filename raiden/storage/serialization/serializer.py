@@ -14,6 +14,7 @@
 from marshmallow import ValidationError
 
 from raiden.exceptions import SerializationError
+from raiden.storage.serialization.codec import MessageCodec
 from raiden.storage.serialization.types import MESSAGE_NAME_TO_QUALIFIED_NAME, SchemaCache
 from raiden.utils.typing import Any, Dict
 
@@ -109,10 +110,17 @@ class MessageSerializer(SerializationBase):
     JSONSerializer does.
     The type is also saved in the `type` field (instead of `_type`), since we
     can make sure that there are no name clashes for our Message objects.
+
+    The messages are converted by the `MessageCodec` where possible, it is
+    much faster than the schemas and creates the same format.
     """
 
     @staticmethod
     def serialize(obj: Any) -> str:
+        codec_data = MessageCodec.encode(obj)
+        if codec_data is not None:
+            return json.dumps(codec_data)
+
         data = DictSerializer.serialize(obj)
 
         # Only use 'Message' instead of `raiden.messages.Message` as type.
@@ -134,8 +142,13 @@ def deserialize(data: str) -> Any:
             raise SerializationError(f"No 'type' attribute in message") from ex
 
         try:
-            decoded_json["_type"] = MESSAGE_NAME_TO_QUALIFIED_NAME[msg_type]
+            qualified_type = MESSAGE_NAME_TO_QUALIFIED_NAME[msg_type]
         except KeyError as ex:
             raise SerializationError(f"Unknown message type: {msg_type}") from ex
 
+        message = MessageCodec.decode(_import_type(qualified_type), decoded_json)
+        if message is not None:
+            return message
+
+        decoded_json["_type"] = qualified_type
         return DictSerializer.deserialize(decoded_json)
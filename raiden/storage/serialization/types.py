@@ -9,6 +9,7 @@
     AddressField,
     BytesField,
     CallablePolyField,
+    ChannelGraphField,
     IntegerToStringField,
     NetworkXGraphField,
     OptionalIntegerToStringField,
@@ -21,6 +22,7 @@
     TransferTask,
 )
 from raiden.transfer.events import SendMessageEvent
+from raiden.transfer.graph import ChannelGraph
 from raiden.transfer.identifiers import QueueIdentifier
 from raiden.utils.typing import (
     AdditionalHash,
@@ -205,75 +207,78 @@ def message_event_schema_deserialization(
     return None
 
 
-_native_to_marshmallow.update(
-    {
-        # Addresses
-        Address: AddressField,
-        InitiatorAddress: AddressField,
-        MonitoringServiceAddress: AddressField,
-        OneToNAddress: AddressField,
-        TokenNetworkRegistryAddress: AddressField,
-        SecretRegistryAddress: AddressField,
-        TargetAddress: AddressField,
-        TokenAddress: AddressField,
-        TokenNetworkAddress: AddressField,
-        UserDepositAddress: AddressField,
-        # Bytes
-        EncodedData: BytesField,
-        AdditionalHash: BytesField,
-        BalanceHash: BytesField,
-        BlockHash: BytesField,
-        Keccak256: BytesField,
-        Locksroot: BytesField,
-        Secret: BytesField,
-        SecretHash: BytesField,
-        Signature: BytesField,
-        TransactionHash: BytesField,
-        # Ints
-        BlockExpiration: IntegerToStringField,
-        BlockNumber: IntegerToStringField,
-        BlockTimeout: IntegerToStringField,
-        TokenAmount: IntegerToStringField,
-        FeeAmount: IntegerToStringField,
-        ProportionalFeeAmount: IntegerToStringField,
-        LockedAmount: IntegerToStringField,
-        BlockGasLimit: IntegerToStringField,
-        MessageID: IntegerToStringField,
-        Nonce: IntegerToStringField,
-        PaymentAmount: IntegerToStringField,
-        PaymentID: IntegerToStringField,
-        PaymentWithFeeAmount: IntegerToStringField,
-        TransferID: IntegerToStringField,
-        WithdrawAmount: IntegerToStringField,
-        Optional[BlockNumber]: OptionalIntegerToStringField,
-        # Integers which should be converted to strings
-        # This is done for querying purposes as sqlite
-        # integer type is smaller than python's.
-        ChainID: IntegerToStringField,
-        ChannelID: IntegerToStringField,
-        # Polymorphic fields
-        TransferTask: CallablePolyField(
-            serialization_schema_selector=transfer_task_schema_serialization,
-            deserialization_schema_selector=transfer_task_schema_deserialization,
-        ),
-        Union[BalanceProofUnsignedState, BalanceProofSignedState]: CallablePolyField(
-            serialization_schema_selector=balance_proof_schema_serialization,
-            deserialization_schema_selector=balance_proof_schema_deserialization,
-        ),
-        Optional[Union[BalanceProofUnsignedState, BalanceProofSignedState]]: CallablePolyField(
-            serialization_schema_selector=balance_proof_schema_serialization,
-            deserialization_schema_selector=balance_proof_schema_deserialization,
-            allow_none=True,
-        ),
-        SendMessageEvent: CallablePolyField(
-            serialization_schema_selector=message_event_schema_serialization,
-            deserialization_schema_selector=message_event_schema_deserialization,
-            allow_none=True,
-        ),
-        # QueueIdentifier (Special case)
-        QueueIdentifier: QueueIdentifierField,
-        # Other
-        networkx.Graph: NetworkXGraphField,
-        Random: PRNGField,
-    }
-)
+# The marshmallow fields of our types, registered with `marshmallow_dataclass`
+# below and also used by the `MessageCodec`
+TYPE_TO_FIELD: Dict[Any, Any] = {
+    # Addresses
+    Address: AddressField,
+    InitiatorAddress: AddressField,
+    MonitoringServiceAddress: AddressField,
+    OneToNAddress: AddressField,
+    TokenNetworkRegistryAddress: AddressField,
+    SecretRegistryAddress: AddressField,
+    TargetAddress: AddressField,
+    TokenAddress: AddressField,
+    TokenNetworkAddress: AddressField,
+    UserDepositAddress: AddressField,
+    # Bytes
+    EncodedData: BytesField,
+    AdditionalHash: BytesField,
+    BalanceHash: BytesField,
+    BlockHash: BytesField,
+    Keccak256: BytesField,
+    Locksroot: BytesField,
+    Secret: BytesField,
+    SecretHash: BytesField,
+    Signature: BytesField,
+    TransactionHash: BytesField,
+    # Ints
+    BlockExpiration: IntegerToStringField,
+    BlockNumber: IntegerToStringField,
+    BlockTimeout: IntegerToStringField,
+    TokenAmount: IntegerToStringField,
+    FeeAmount: IntegerToStringField,
+    ProportionalFeeAmount: IntegerToStringField,
+    LockedAmount: IntegerToStringField,
+    BlockGasLimit: IntegerToStringField,
+    MessageID: IntegerToStringField,
+    Nonce: IntegerToStringField,
+    PaymentAmount: IntegerToStringField,
+    PaymentID: IntegerToStringField,
+    PaymentWithFeeAmount: IntegerToStringField,
+    TransferID: IntegerToStringField,
+    WithdrawAmount: IntegerToStringField,
+    Optional[BlockNumber]: OptionalIntegerToStringField,
+    # Integers which should be converted to strings
+    # This is done for querying purposes as sqlite
+    # integer type is smaller than python's.
+    ChainID: IntegerToStringField,
+    ChannelID: IntegerToStringField,
+    # Polymorphic fields
+    TransferTask: CallablePolyField(
+        serialization_schema_selector=transfer_task_schema_serialization,
+        deserialization_schema_selector=transfer_task_schema_deserialization,
+    ),
+    Union[BalanceProofUnsignedState, BalanceProofSignedState]: CallablePolyField(
+        serialization_schema_selector=balance_proof_schema_serialization,
+        deserialization_schema_selector=balance_proof_schema_deserialization,
+    ),
+    Optional[Union[BalanceProofUnsignedState, BalanceProofSignedState]]: CallablePolyField(
+        serialization_schema_selector=balance_proof_schema_serialization,
+        deserialization_schema_selector=balance_proof_schema_deserialization,
+        allow_none=True,
+    ),
+    SendMessageEvent: CallablePolyField(
+        serialization_schema_selector=message_event_schema_serialization,
+        deserialization_schema_selector=message_event_schema_deserialization,
+        allow_none=True,
+    ),
+    # QueueIdentifier (Special case)
+    QueueIdentifier: QueueIdentifierField,
+    # Other
+    networkx.Graph: NetworkXGraphField,
+    ChannelGraph: ChannelGraphField,
+    Random: PRNGField,
+}
+
+_native_to_marshmallow.update(TYPE_TO_FIELD)
@@ -1,3 +1,4 @@
+import json
 import sqlite3
 from contextlib import contextmanager
 from dataclasses import dataclass
@@ -7,7 +8,9 @@
 from typing import Generator
 
 import gevent
+from eth_typing import ChecksumAddress
 from eth_utils import to_checksum_address, to_hex
+from hexbytes import HexBytes
 
 import raiden.storage.serialization.fields as fields
 from raiden.constants import RAIDEN_DB_VERSION, SQLITE_MIN_REQUIRED_VERSION
@@ -19,6 +22,8 @@
 from raiden.utils.system import get_system_spec
 from raiden.utils.typing import (
     Any,
+    BlockchainEvent,
+    BlockNumber,
     DatabasePath,
     Dict,
     Generic,
@@ -98,6 +103,23 @@ class SnapshotEncodedRecord(NamedTuple):
     data: str
 
 
+class BlockchainLogEncodedRecord(NamedTuple):
+    contract_address: ChecksumAddress
+    block_number: BlockNumber
+    log_index: int
+    data: str
+
+
+class BlockchainLogsRange(NamedTuple):
+    """ Inclusive range of blocks for which all the logs of the smart contract
+    at `contract_address` are stored.
+    """
+
+    contract_address: ChecksumAddress
+    from_block: BlockNumber
+    to_block: BlockNumber
+
+
 class EventRecord(NamedTuple):
     event_identifier: EventID
     state_change_identifier: StateChangeID
@@ -211,6 +233,25 @@ def _query_to_string(query: FilteredDBQuery) -> Tuple[str, List[str]]:
     return query_where_str, args
 
 
+def encode_blockchain_log(blockchain_log: BlockchainEvent) -> BlockchainLogEncodedRecord:
+    """ Encode a log formatted by web3, the hashes and topics are `HexBytes`. """
+    return BlockchainLogEncodedRecord(
+        contract_address=blockchain_log["address"],
+        block_number=blockchain_log["blockNumber"],
+        log_index=blockchain_log["logIndex"],
+        data=json.dumps(blockchain_log, default=to_hex),
+    )
+
+
+def decode_blockchain_log(data: str) -> BlockchainEvent:
+    """ Restore the log in the format of web3, `decode_event` relies on it. """
+    blockchain_log = json.loads(data)
+    blockchain_log["topics"] = [HexBytes(topic) for topic in blockchain_log["topics"]]
+    blockchain_log["blockHash"] = HexBytes(blockchain_log["blockHash"])
+    blockchain_log["transactionHash"] = HexBytes(blockchain_log["transactionHash"])
+    return blockchain_log
+
+
 class SQLiteStorage:
     def __init__(self, database_path: DatabasePath):
         sqlite3.register_adapter(ULID, adapt_ulid_identifier)
@@ -714,6 +755,97 @@ def update_snapshots(self, snapshots_data: List[Tuple[str, SnapshotID]]) -> None
         cursor.executemany("UPDATE state_snapshot SET data=? WHERE identifier=?", snapshots_data)
         self.maybe_commit()
 
+    def write_blockchain_logs(
+        self, logs: List[BlockchainLogEncodedRecord], ranges: List[BlockchainLogsRange]
+    ) -> None:
+        """ Save the confirmed `logs` and extend the stored ranges of their
+        smart contracts with `ranges`.
+
+        Logs are replaced if they were saved before, this happens when a batch
+        of blocks is fetched again. A range which is not contiguous with the
+        stored range of the smart contract replaces it, if it is newer.
+        """
+        cursor = self.conn.cursor()
+        cursor.executemany(
+            "INSERT OR REPLACE INTO blockchain_logs("
+            "contract_address, block_number, log_index, data"
+            ") VALUES(?, ?, ?, ?)",
+            logs,
+        )
+
+        for new_range in ranges:
+            stored_range = self.get_blockchain_logs_range(new_range.contract_address)
+
+            if stored_range is None:
+                merged_range = new_range
+            elif (
+                stored_range.from_block <= new_range.to_block + 1
+                and new_range.from_block <= stored_range.to_block + 1
+            ):
+                merged_range = BlockchainLogsRange(
+                    contract_address=new_range.contract_address,
+                    from_block=min(stored_range.from_block, new_range.from_block),
+                    to_block=max(stored_range.to_block, new_range.to_block),
+                )
+            elif new_range.to_block > stored_range.to_block:
+                merged_range = new_range
+            else:
+                continue
+
+            cursor.execute(
+                "INSERT OR REPLACE INTO blockchain_logs_ranges("
+                "contract_address, from_block, to_block"
+                ") VALUES(?, ?, ?)",
+                merged_range,
+            )
+
+        self.maybe_commit()
+
+    def get_blockchain_logs_range(
+        self, contract_address: ChecksumAddress
+    ) -> Optional[BlockchainLogsRange]:
+        cursor = self.conn.execute(
+            "SELECT contract_address, from_block, to_block FROM blockchain_logs_ranges "
+            "WHERE contract_address = ?",
+            (contract_address,),
+        )
+        row = cursor.fetchone()
+
+        if row is None:
+            return None
+
+        return BlockchainLogsRange(
+            contract_address=row[0], from_block=BlockNumber(row[1]), to_block=BlockNumber(row[2])
+        )
+
+    def get_blockchain_logs(
+        self, contract_address: ChecksumAddress, from_block: BlockNumber, to_block: BlockNumber
+    ) -> List[str]:
+        """ Return the stored logs of the smart contract at `contract_address`
+        in the inclusive range `[from_block, to_block]`, in the order of the
+        blockchain.
+        """
+        cursor = self.conn.execute(
+            "SELECT data FROM blockchain_logs WHERE contract_address = ? "
+            "AND block_number BETWEEN ? AND ? ORDER BY block_number, log_index",
+            (contract_address, from_block, to_block),
+        )
+        return [row[0] for row in cursor]
+
+    def prune_blockchain_logs(self, before_block: BlockNumber) -> None:
+        """ Delete the logs of the blocks before `before_block` and shrink the
+        stored ranges accordingly, these blocks are queried from the Ethereum
+        node afterwards.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM blockchain_logs WHERE block_number < ?", (before_block,))
+        cursor.execute("DELETE FROM blockchain_logs_ranges WHERE to_block < ?", (before_block,))
+        cursor.execute(
+            "UPDATE blockchain_logs_ranges SET from_block = ? WHERE from_block < ?",
+            (before_block, before_block),
+        )
+        self.maybe_commit()
+
     def maybe_commit(self) -> None:
         if not self.in_transaction:
             self.conn.commit()
@@ -898,6 +1030,26 @@ def get_events(self, limit: int = None, offset: int = None) -> List[Event]:
         events = self.database.get_events(limit, offset)
         return [self.serializer.deserialize(event) for event in events]
 
+    def write_blockchain_logs(
+        self, logs: List[BlockchainEvent], ranges: List[BlockchainLogsRange]
+    ) -> None:
+        encoded_logs = [encode_blockchain_log(blockchain_log) for blockchain_log in logs]
+        self.database.write_blockchain_logs(encoded_logs, ranges)
+
+    def get_blockchain_logs_range(
+        self, contract_address: ChecksumAddress
+    ) -> Optional[BlockchainLogsRange]:
+        return self.database.get_blockchain_logs_range(contract_address)
+
+    def get_blockchain_logs(
+        self, contract_address: ChecksumAddress, from_block: BlockNumber, to_block: BlockNumber
+    ) -> List[BlockchainEvent]:
+        logs = self.database.get_blockchain_logs(contract_address, from_block, to_block)
+        return [decode_blockchain_log(data) for data in logs]
+
+    def prune_blockchain_logs(self, before_block: BlockNumber) -> None:
+        self.database.prune_blockchain_logs(before_block)
+
     def get_state_changes_stream(
         self, retry_timeout: float, limit: int = None, offset: int = 0
     ) -> Iterator[List[StateChange]]:
@@ -92,10 +92,32 @@ def __getattr__(self, item: str) -> Event:
 );
 """
 
+DB_CREATE_BLOCKCHAIN_LOGS = """
+CREATE TABLE IF NOT EXISTS blockchain_logs (
+    contract_address TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    data JSON,
+    PRIMARY KEY(contract_address, block_number, log_index)
+);
+"""
+
+DB_CREATE_BLOCKCHAIN_LOGS_BLOCK_NUMBER_INDEX = """
+CREATE INDEX IF NOT EXISTS blockchain_logs_block_number ON blockchain_logs(block_number);
+"""
+
+DB_CREATE_BLOCKCHAIN_LOGS_RANGES = """
+CREATE TABLE IF NOT EXISTS blockchain_logs_ranges (
+    contract_address TEXT PRIMARY KEY NOT NULL,
+    from_block INTEGER NOT NULL,
+    to_block INTEGER NOT NULL
+);
+"""
+
 DB_SCRIPT_CREATE_TABLES = """
 PRAGMA foreign_keys=off;
 BEGIN TRANSACTION;
-{}{}{}{}{}
+{}{}{}{}{}{}{}{}
 COMMIT;
 PRAGMA foreign_keys=on;
 """.format(
@@ -104,4 +126,7 @@ def __getattr__(self, item: str) -> Event:
     DB_CREATE_SNAPSHOT,
     DB_CREATE_STATE_EVENTS,
     DB_CREATE_RUNS,
+    DB_CREATE_BLOCKCHAIN_LOGS,
+    DB_CREATE_BLOCKCHAIN_LOGS_BLOCK_NUMBER_INDEX,
+    DB_CREATE_BLOCKCHAIN_LOGS_RANGES,
 )
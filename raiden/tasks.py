@@ -21,6 +21,7 @@
 )
 from raiden.network.proxies.proxy_manager import ProxyManager
 from raiden.network.proxies.user_deposit import UserDeposit
+from raiden.network.rpc.subscription import NewHeadsSubscription
 from raiden.settings import MIN_REI_THRESHOLD
 from raiden.utils import gas_reserve
 from raiden.utils.formatting import to_checksum_address
@@ -140,12 +141,18 @@ def check_network_id(network_id: ChainID, web3: Web3) -> None:  # pragma: no uni
 class AlarmTask(Runnable):
     """ Task to notify when a block is mined. """
 
-    def __init__(self, proxy_manager: ProxyManager, sleep_time: float) -> None:
+    def __init__(
+        self,
+        proxy_manager: ProxyManager,
+        sleep_time: float,
+        new_heads_subscription: Optional[NewHeadsSubscription] = None,
+    ) -> None:
         super().__init__()
 
         self.callbacks: List[Callable] = list()
         self.proxy_manager = proxy_manager
         self.rpc_client = proxy_manager.client
+        self.new_heads_subscription = new_heads_subscription
 
         self.known_block_number: Optional[BlockNumber] = None
         self._stop_event: Optional[AsyncResult] = None
@@ -162,6 +169,8 @@ def __repr__(self) -> str:
     def start(self) -> None:
         log.debug("Alarm task started", node=to_checksum_address(self.rpc_client.address))
         self._stop_event = AsyncResult()
+        if self.new_heads_subscription is not None:
+            self.new_heads_subscription.start()
         super().start()
 
     def _run(self, *args: Any, **kwargs: Any) -> None:  # pylint: disable=method-hidden
@@ -170,6 +179,8 @@ def _run(self, *args: Any, **kwargs: Any) -> None:  # pylint: disable=method-hid
             self.loop_until_stop()
         finally:
             self.callbacks = list()
+            if self.new_heads_subscription is not None:
+                self.new_heads_subscription.stop()
 
     def register_callback(self, callback: Callable) -> None:
         """ Register a new callback.
@@ -190,11 +201,55 @@ def remove_callback(self, callback: Callable) -> None:
             self.callbacks.remove(callback)
 
     def loop_until_stop(self) -> None:
-        sleep_time = self.sleep_time
-        while self._stop_event and self._stop_event.wait(sleep_time) is not True:
-            latest_block = self.rpc_client.get_block(block_identifier="latest")
+        while self._stop_event and self._wait_for_new_block():
+            self._maybe_run_callbacks(self._latest_block())
 
-            self._maybe_run_callbacks(latest_block)
+    def _wait_for_new_block(self) -> bool:
+        """ Wait for a new block, returns False once the task is stopped.
+
+        With a `new_heads_subscription` the blocks after the first one are
+        pushed by the Ethereum node. If no block is pushed for the
+        subscription's timeout, or if the subscription is down, the latest
+        block is polled every `sleep_time`.
+        """
+        assert self._stop_event, "The task must be started"
+
+        subscription = self.new_heads_subscription
+        pushed = self.known_block_number is not None
+        if subscription is not None and subscription.subscribed and pushed:
+            gevent.wait(
+                [self._stop_event, subscription.new_head, subscription.disconnected],
+                count=1,
+                timeout=subscription.timeout,
+            )
+        else:
+            self._stop_event.wait(self.sleep_time)
+
+        return not self._stop_event.ready()
+
+    def _latest_block(self) -> Dict[str, Any]:
+        """ The block pushed by the `new_heads_subscription`, or the latest
+        block of the Ethereum node.
+
+        Only the latest pushed block is used, the callbacks are run once for
+        blocks which are pushed in quick succession. The blocks missed this
+        way, or while the subscription was down, are caught up by the
+        callbacks, which process all the blocks up to the latest one.
+        """
+        subscription = self.new_heads_subscription
+        if subscription is not None and subscription.new_head.is_set():
+            subscription.new_head.clear()
+            latest_head = subscription.latest_head
+            assert latest_head, "new_head is only set with the latest_head"
+
+            # The pushed head did not go through the web3 middlewares, the
+            # caches are confirmed by the latest block number
+            self.rpc_client.block_header_cache.observe_latest(
+                latest_head["number"], latest_head["hash"], latest_head["parentHash"]
+            )
+            return latest_head
+
+        return self.rpc_client.get_block(block_identifier="latest")
 
     def _maybe_run_callbacks(self, latest_block: Dict[str, Any]) -> None:
         """ Run the callbacks if there is at least one new block.
@@ -223,12 +278,15 @@ def _maybe_run_callbacks(self, latest_block: Dict[str, Any]) -> None:
                 node=to_checksum_address(self.rpc_client.address),
             )
         elif missed_blocks > 0:
+            rpc_client = self.rpc_client
             log_details = dict(
                 known_block_number=self.known_block_number,
                 latest_block_number=latest_block_number,
                 latest_block_hash=to_hex(latest_block["hash"]),
                 latest_block_gas_limit=latest_block["gasLimit"],
-                node=to_checksum_address(self.rpc_client.address),
+                block_header_cache_rpc_calls_saved=rpc_client.block_header_cache.rpc_calls_saved,
+                eth_call_cache_rpc_calls_saved=rpc_client.eth_call_cache.rpc_calls_saved,
+                node=to_checksum_address(rpc_client.address),
             )
             if missed_blocks > 1:
                 log_details["num_missed_blocks"] = missed_blocks - 1
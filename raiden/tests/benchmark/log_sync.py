@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+"""
+Benchmark of the initial synchronization of the blockchain events against a
+local stub JSON-RPC server, with fixed block batch sizes and with the
+adaptive `BlockBatchSizeAdjuster`.
+
+The server replays a synthetic log history of a token network, sparse except
+for a dense range of blocks. The duration of the `eth_getLogs` responses is
+proportional to the number of blocks and logs in the range, like the linear
+scans of Geth and Parity, responses longer than the client timeout are
+dropped.
+
+With `--prefilter` the `ChannelEventsPrefilter` drops the logs of the
+channels of other nodes before they are decoded, a share of the logs given
+by `--our-channels` is for channels of the node.
+"""
+import json
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import click
+from eth_utils import encode_hex, event_abi_to_log_topic, to_hex
+from requests.exceptions import ReadTimeout
+from web3 import HTTPProvider, Web3
+
+from raiden.blockchain.events import BlockchainEvents, token_network_events
+from raiden.blockchain.filters import ChannelEventsPrefilter
+from raiden.log_config import configure_logging
+from raiden.settings import BlockBatchSizeConfig, contracts_precompiled_path
+from raiden.tests.utils.factories import make_address
+from raiden.utils.formatting import to_checksum_address
+from raiden.utils.typing import (
+    Address,
+    Any,
+    BlockNumber,
+    ChainID,
+    ChannelID,
+    Dict,
+    List,
+    Optional,
+    TokenNetworkAddress,
+)
+from raiden_contracts.constants import CONTRACT_TOKEN_NETWORK, ChannelEvent
+from raiden_contracts.contract_manager import ContractManager
+
+
+class LogHistory:
+    """ `ChannelNewDeposit` logs of the token network at `address`. """
+
+    def __init__(
+        self,
+        address: TokenNetworkAddress,
+        contract_manager: ContractManager,
+        blocks: int,
+        sparse_interval: int,
+        dense_blocks: int,
+    ) -> None:
+        abi = contract_manager.get_contract_abi(CONTRACT_TOKEN_NETWORK)
+        event_abi = next(entry for entry in abi if entry.get("name") == ChannelEvent.DEPOSIT)
+        self.topic = encode_hex(event_abi_to_log_topic(event_abi))
+        self.checksum_address = to_checksum_address(address)
+        self.latest_block = blocks
+
+        # One log per block in the dense range in the middle of the history
+        dense_start = (blocks - dense_blocks) // 2
+        dense = set(range(dense_start, dense_start + dense_blocks))
+        sparse = set(range(sparse_interval, blocks, sparse_interval))
+        self.block_numbers = sorted(dense | sparse)
+
+    def channel_identifiers(self, share: float) -> List[ChannelID]:
+        """ The channel of a log is identified by its block number, this
+        returns the identifiers of `share` of the logs' channels.
+        """
+        if share <= 0:
+            return []
+        interval = max(1, round(1 / share))
+        return [ChannelID(block_number) for block_number in self.block_numbers[::interval]]
+
+    def count(self, from_block: int, to_block: int) -> int:
+        return bisect_right(self.block_numbers, to_block) - bisect_left(
+            self.block_numbers, from_block
+        )
+
+    def logs(self, from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        start = bisect_left(self.block_numbers, from_block)
+        end = bisect_right(self.block_numbers, to_block)
+        return [self.log(block_number) for block_number in self.block_numbers[start:end]]
+
+    def log(self, block_number: int) -> Dict[str, Any]:
+        block_hash = "0x" + block_number.to_bytes(32, "big").hex()
+        return {
+            "address": self.checksum_address,
+            "topics": [
+                self.topic,
+                "0x" + block_number.to_bytes(32, "big").hex(),
+                "0x" + bytes(32).hex(),
+            ],
+            "data": "0x" + (1).to_bytes(32, "big").hex(),
+            "blockNumber": to_hex(block_number),
+            "blockHash": block_hash,
+            "transactionHash": block_hash,
+            "transactionIndex": "0x0",
+            "logIndex": "0x0",
+            "removed": False,
+        }
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StubNode:
+    """ JSON-RPC server with the `eth_getLogs` and `eth_getBlockByNumber`
+    methods used by the `BlockchainEvents`.
+    """
+
+    def __init__(
+        self,
+        history: LogHistory,
+        request_duration: float,
+        block_duration: float,
+        log_duration: float,
+        timeout: float,
+    ) -> None:
+        self.history = history
+        self.request_duration = request_duration
+        self.block_duration = block_duration
+        self.log_duration = log_duration
+        self.timeout = timeout
+        self.get_logs_requests = 0
+        self.timeouts = 0
+
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # pylint: disable=invalid-name
+                content_length = int(str(self.headers["Content-Length"]))
+                request = json.loads(self.rfile.read(content_length))
+                result = node.handle(request["method"], request["params"])
+                if result is None:
+                    return
+
+                body = json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result})
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body.encode())
+
+            def log_message(self, *args: Any) -> None:  # pylint: disable=arguments-differ
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def handle(self, method: str, params: List[Any]) -> Optional[Any]:
+        if method == "eth_getBlockByNumber":
+            block_number = int(params[0], 16)
+            return {
+                "number": to_hex(block_number),
+                "hash": "0x" + block_number.to_bytes(32, "big").hex(),
+                "gasLimit": to_hex(8_000_000),
+            }
+
+        assert method == "eth_getLogs", f"Unexpected method {method}"
+        self.get_logs_requests += 1
+
+        filter_params = params[0]
+        from_block = int(filter_params["fromBlock"], 16)
+        to_block = int(filter_params["toBlock"], 16)
+        number_of_logs = self.history.count(from_block, to_block)
+        duration = (
+            self.request_duration
+            + (to_block - from_block + 1) * self.block_duration
+            + number_of_logs * self.log_duration
+        )
+
+        if duration > self.timeout:
+            # Hold the response until the client gave up
+            self.timeouts += 1
+            time.sleep(self.timeout * 2)
+            return None
+
+        time.sleep(duration)
+        if self.history.checksum_address not in filter_params["address"]:
+            return []
+        return self.history.logs(from_block, to_block)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def synchronize(
+    node: StubNode,
+    contract_manager: ContractManager,
+    address: TokenNetworkAddress,
+    config: BlockBatchSizeConfig,
+    timeout: float,
+    event_prefilter: Optional[ChannelEventsPrefilter],
+) -> int:
+    """ Fetches all the logs of the history, like `_poll_until_target`.
+    Returns the number of fetched events.
+    """
+    web3 = Web3(HTTPProvider(node.url, request_kwargs={"timeout": timeout}))
+    blockchain_events = BlockchainEvents(
+        web3=web3,
+        chain_id=ChainID(1),
+        contract_manager=contract_manager,
+        last_fetched_block=BlockNumber(0),
+        event_filters=[token_network_events(address, contract_manager)],
+        block_batch_size_config=config,
+        event_prefilter=event_prefilter,
+        log_storage=None,
+    )
+
+    target_block_number = BlockNumber(node.history.latest_block)
+    number_of_events = 0
+    while blockchain_events.last_fetched_block < target_block_number:
+        poll_result = blockchain_events.fetch_logs_in_batch(target_block_number)
+        if poll_result is not None:
+            number_of_events += len(poll_result.events)
+
+    return number_of_events
+
+
+@click.command(help=__doc__)
+@click.option("--blocks", default=2_000_000, show_default=True, help="Length of the history.")
+@click.option("--sparse-interval", default=10_000, show_default=True, help="Blocks between logs.")
+@click.option("--dense-blocks", default=5_000, show_default=True, help="Blocks with one log.")
+@click.option("--request-duration", default=0.02, show_default=True, help="Seconds per request.")
+@click.option("--block-duration", default=1e-6, show_default=True, help="Seconds per block.")
+@click.option("--log-duration", default=1e-3, show_default=True, help="Seconds per log.")
+@click.option("--timeout", default=2.0, show_default=True, help="Client timeout in seconds.")
+@click.option("--prefilter/--no-prefilter", default=True, show_default=True)
+@click.option("--our-channels", default=0.1, show_default=True, help="Share of our logs.")
+@click.option(
+    "--fixed",
+    multiple=True,
+    type=int,
+    default=[1_000, 10_000, 100_000],
+    show_default=True,
+    help="Fixed block batch sizes to compare to the adaptive one.",
+)
+def main(
+    blocks: int,
+    sparse_interval: int,
+    dense_blocks: int,
+    request_duration: float,
+    block_duration: float,
+    log_duration: float,
+    timeout: float,
+    prefilter: bool,
+    our_channels: float,
+    fixed: List[int],
+) -> None:
+    configure_logging({"": "CRITICAL"}, disable_debug_logfile=True)
+
+    contract_manager = ContractManager(contracts_precompiled_path())
+    address = TokenNetworkAddress(make_address())
+    history = LogHistory(address, contract_manager, blocks, sparse_interval, dense_blocks)
+    channel_identifiers = history.channel_identifiers(our_channels if prefilter else 1)
+
+    # The thresholds are scaled to the timeout of the stub node
+    configs = [
+        (f"fixed {batch_size}", BlockBatchSizeConfig(batch_size, batch_size, batch_size))
+        for batch_size in map(BlockNumber, fixed)
+    ]
+    adaptive = BlockBatchSizeConfig(
+        fast_threshold=timeout / 10, slow_threshold=timeout / 2, max_events=1_000
+    )
+    configs.append(("adaptive", adaptive))
+
+    print(
+        f"{len(history.block_numbers)} logs in {blocks} blocks, {len(channel_identifiers)} decoded"
+    )
+    print(f"{'block batch size':<18} {'time (s)':>9} {'requests':>9} {'timeouts':>9}")
+    for name, config in configs:
+        node = StubNode(history, request_duration, block_duration, log_duration, timeout)
+        node.start()
+        event_prefilter = None
+        if prefilter:
+            event_prefilter = ChannelEventsPrefilter(
+                our_address=Address(make_address()),
+                channel_identifiers=[
+                    (address, channel_identifier) for channel_identifier in channel_identifiers
+                ],
+                contract_manager=contract_manager,
+            )
+
+        start = time.perf_counter()
+        try:
+            number_of_events = synchronize(
+                node, contract_manager, address, config, timeout, event_prefilter
+            )
+            assert number_of_events == len(channel_identifiers)
+            elapsed = f"{time.perf_counter() - start:>9.2f}"
+        except ReadTimeout:
+            elapsed = f"{'failed':>9}"
+        finally:
+            node.stop()
+
+        print(f"{name:<18} {elapsed} {node.get_logs_requests:>9} {node.timeouts:>9}")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
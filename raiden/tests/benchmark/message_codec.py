@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Benchmark of the conversion of protocol messages to and from the JSON wire
+format, with the marshmallow schemas and with the `MessageCodec` which is
+used by the `MessageSerializer`.
+"""
+import json
+import time
+
+import click
+
+from raiden.messages.abstract import SignedMessage
+from raiden.storage.serialization.codec import MessageCodec
+from raiden.storage.serialization.serializer import DictSerializer, MessageSerializer
+from raiden.storage.serialization.types import MESSAGE_NAME_TO_QUALIFIED_NAME
+from raiden.tests.unit.test_serialization import make_messages
+from raiden.utils.typing import Any, Callable, List, Tuple
+
+
+def schema_serialize(message: SignedMessage) -> str:
+    """ `MessageSerializer.serialize` without the codec """
+    data = DictSerializer.serialize(message)
+    data["type"] = data.pop("_type").split(".")[-1]
+    return json.dumps(data)
+
+
+def schema_deserialize(data: str) -> Any:
+    """ `MessageSerializer.deserialize` without the codec """
+    decoded_json = json.loads(data)
+    decoded_json["_type"] = MESSAGE_NAME_TO_QUALIFIED_NAME[decoded_json.pop("type")]
+    return DictSerializer.deserialize(decoded_json)
+
+
+def time_call(function: Callable[[], object], samples: int) -> float:
+    start = time.perf_counter()
+    for _ in range(samples):
+        function()
+    return (time.perf_counter() - start) / samples
+
+
+def make_measurements(
+    message: SignedMessage,
+) -> List[Tuple[str, Callable[[], object], Callable[[], object]]]:
+    """ The operations to measure, with the schemas and with the codec. """
+    serialized = MessageSerializer.serialize(message)
+    return [
+        (
+            "serialize",
+            lambda: schema_serialize(message),
+            lambda: MessageSerializer.serialize(message),
+        ),
+        (
+            "deserialize",
+            lambda: schema_deserialize(serialized),
+            lambda: MessageSerializer.deserialize(serialized),
+        ),
+    ]
+
+
+@click.command(help=__doc__)
+@click.option("--samples", default=1_000, show_default=True, help="Runs per measurement.")
+def main(samples: int) -> None:
+    print(f"{'message':<22} {'operation':<12} {'schemas (us)':>12} {'codec (us)':>12} {'x':>6}")
+    for message in make_messages():
+        if MessageCodec.encode(message) is None:
+            continue
+
+        name = type(message).__name__
+        measurements = make_measurements(message)
+        for operation, schema_function, codec_function in measurements:
+            schema_duration = time_call(schema_function, samples)
+            codec_duration = time_call(codec_function, samples)
+            print(
+                f"{name:<22} {operation:<12} {schema_duration * 1e6:>12.1f} "
+                f"{codec_duration * 1e6:>12.1f} {schema_duration / codec_duration:>6.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
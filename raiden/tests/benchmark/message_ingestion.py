@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Benchmark of the ingestion of signed messages, from the text received by the
+transport to the state changes created by the `MessageHandler`.
+
+The sender of a message is read by `validate_and_parse_message`, by the
+transport to acknowledge the message with a `Delivered` and by the message
+handlers. Every read used to recover the signer. The number of reads is
+reported together with the number of recoveries that were actually done.
+"""
+import time
+
+import click
+
+from raiden.constants import EMPTY_SIGNATURE
+from raiden.message_handler import MessageHandler
+from raiden.messages import abstract
+from raiden.messages.abstract import SignedMessage, SignedRetrieableMessage
+from raiden.messages.synchronization import Processed
+from raiden.messages.transfers import RevealSecret, SecretRequest
+from raiden.network.transport.matrix.utils import validate_and_parse_message
+from raiden.storage.serialization.serializer import MessageSerializer
+from raiden.tests.utils import factories
+from raiden.transfer.architecture import StateChange
+from raiden.utils.signer import LocalSigner, Signer
+from raiden.utils.typing import (
+    Any,
+    BlockExpiration,
+    Callable,
+    List,
+    Optional,
+    PaymentAmount,
+    Tuple,
+)
+
+
+class StateChangeCollector:  # pylint: disable=too-few-public-methods
+    """ Stands in for the `RaidenService` passed to the `MessageHandler`. """
+
+    def __init__(self) -> None:
+        self.state_changes: List[StateChange] = list()
+
+    def handle_and_track_state_changes(self, state_changes: List[StateChange]) -> None:
+        self.state_changes.extend(state_changes)
+
+
+def make_messages(number_of_messages: int, signer: Signer) -> List[SignedMessage]:
+    message_factories: List[Callable[[], SignedMessage]] = [
+        lambda: factories.create(factories.UnlockProperties()),
+        lambda: factories.create(factories.LockExpiredProperties()),
+        lambda: RevealSecret(
+            message_identifier=factories.make_message_identifier(),
+            secret=factories.make_secret(),
+            signature=EMPTY_SIGNATURE,
+        ),
+        lambda: SecretRequest(
+            message_identifier=factories.make_message_identifier(),
+            payment_identifier=factories.make_payment_id(),
+            secrethash=factories.make_secret_hash(),
+            amount=PaymentAmount(factories.make_token_amount()),
+            expiration=BlockExpiration(factories.make_block_number()),
+            signature=EMPTY_SIGNATURE,
+        ),
+        lambda: Processed(
+            message_identifier=factories.make_message_identifier(), signature=EMPTY_SIGNATURE
+        ),
+    ]
+
+    messages = list()
+    for index in range(number_of_messages):
+        message = message_factories[index % len(message_factories)]()
+        message.sign(signer)
+        messages.append(message)
+    return messages
+
+
+def ingest(data: str, signer: Signer) -> int:
+    """ Same steps as `MatrixTransport._handle_sync_messages` """
+    messages = validate_and_parse_message(data, signer.address)
+
+    for message in messages:
+        # Acknowledgement of the message, see `MatrixTransport._handle_sync_messages`
+        if isinstance(message, (Processed, SignedRetrieableMessage)) and message.sender:
+            assert message.sender
+
+    raiden = StateChangeCollector()
+    MessageHandler().on_messages(raiden, messages)  # type: ignore
+    return len(raiden.state_changes)
+
+
+def count_recoveries(function: Callable[[], Any]) -> Tuple[int, int, float]:
+    """ Runs `function` and returns the number of reads of
+    `SignedMessage.sender`, the number of signer recoveries and the duration.
+    """
+    sender_property: property = SignedMessage.__dict__["sender"]
+    original_recover = abstract.recover
+    counts = {"reads": 0, "recoveries": 0}
+
+    def sender(self: SignedMessage) -> Optional[Any]:
+        counts["reads"] += 1
+        return sender_property.__get__(self, SignedMessage)
+
+    def recover(*args: Any, **kwargs: Any) -> Any:
+        counts["recoveries"] += 1
+        return original_recover(*args, **kwargs)
+
+    SignedMessage.sender = property(sender)  # type: ignore
+    abstract.recover = recover
+    try:
+        start = time.perf_counter()
+        function()
+        duration = time.perf_counter() - start
+    finally:
+        SignedMessage.sender = sender_property  # type: ignore
+        abstract.recover = original_recover
+
+    return counts["reads"], counts["recoveries"], duration
+
+
+@click.command(help=__doc__)
+@click.option("--messages", default=1_000, show_default=True, help="Messages to ingest.")
+def main(messages: int) -> None:
+    signer = LocalSigner(factories.make_privkey_address()[0])
+    data = "\n".join(
+        MessageSerializer.serialize(message) for message in make_messages(messages, signer)
+    )
+
+    reads, recoveries, duration = count_recoveries(lambda: ingest(data, signer))
+    print(f"messages:                 {messages}")
+    print(f"sender reads:             {reads} ({reads / messages:.1f} per message)")
+    print(f"signer recoveries:        {recoveries} ({recoveries / messages:.1f} per message)")
+    print(f"saved recoveries:         {reads - recoveries}")
+    print(f"avg per message (ms):     {duration * 1000 / messages:.3f}")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
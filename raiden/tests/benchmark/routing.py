@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+Benchmark of the local routing in `raiden.routing.get_best_routes` against the
+size of the token network.
+
+A connected random graph is created for each size, the local node has
+`--channels` channels into it and routes to a random target. The search for
+the routes of all neighbours is reported both as one search per neighbour, as
+it used to be done, and as the search shared by all neighbours which is used
+by `get_best_routes`. The cost of `get_best_routes` is reported without and
+with a `LocalRoutingEngine` which already knows the target.
+"""
+import random
+import time
+
+import click
+import networkx
+
+from raiden.routing import LocalRoutingEngine, get_best_routes
+from raiden.tests.utils import factories
+from raiden.transfer import views
+from raiden.transfer.graph import ChannelGraph
+from raiden.transfer.state import ChainState, TokenNetworkGraphState
+from raiden.utils.typing import (
+    Address,
+    Callable,
+    InitiatorAddress,
+    List,
+    Optional,
+    PaymentAmount,
+    TargetAddress,
+    TokenNetworkAddress,
+    Tuple,
+)
+
+
+def make_routing_state(
+    number_of_nodes: int, number_of_channels: int, degree: int, seed: int
+) -> Tuple[ChainState, TokenNetworkAddress, List[Address], List[Address]]:
+    """ Creates a chain state whose token network has a random graph of
+    `number_of_nodes` nodes with an average of `degree` channels per node.
+
+    Returns the chain state, the token network address, the partners of the
+    local node and the other nodes of the graph.
+    """
+    rng = random.Random(seed)
+    test_state = factories.make_chain_state(number_of_channels=number_of_channels)
+
+    token_network_address = test_state.token_network_address
+    token_network = views.get_token_network_by_address(
+        test_state.chain_state, token_network_address
+    )
+    assert token_network, "The token network must exist."
+
+    graph = ChannelGraph()
+    token_network.network_graph = TokenNetworkGraphState(token_network_address, network=graph)
+
+    nodes = [factories.make_address() for _ in range(number_of_nodes)]
+
+    # A random tree keeps the graph connected, the remaining edges are
+    # between random nodes
+    for index in range(1, number_of_nodes):
+        graph.add_edge(nodes[index], nodes[rng.randrange(index)])
+    for _ in range(number_of_nodes * (degree - 2) // 2):
+        graph.add_edge(rng.choice(nodes), rng.choice(nodes))
+
+    partners = [channel.partner_state.address for channel in test_state.channels]
+    for partner in partners:
+        graph.add_edge(test_state.our_address, partner)
+        graph.add_edge(partner, rng.choice(nodes))
+
+    return test_state.chain_state, token_network_address, partners, nodes
+
+
+def time_call(function: Callable[[], object], samples: int) -> float:
+    start = time.perf_counter()
+    for _ in range(samples):
+        function()
+    return (time.perf_counter() - start) / samples
+
+
+@click.command(help=__doc__)
+@click.option(
+    "--nodes",
+    "nodes_list",
+    multiple=True,
+    type=int,
+    default=[1_000, 10_000, 100_000],
+    show_default=True,
+    help="Number of nodes in the token network, can be given multiple times.",
+)
+@click.option("--channels", default=10, show_default=True, help="Channels of the local node.")
+@click.option("--degree", default=4, show_default=True, help="Average channels per node.")
+@click.option("--samples", default=5, show_default=True, help="Runs per measurement.")
+@click.option("--seed", default=0, show_default=True, help="Seed of the random graph.")
+def main(nodes_list: List[int], channels: int, degree: int, samples: int, seed: int) -> None:
+    print(f"{'nodes':>10} {'search':<32} {'avg (ms)':>10}")
+    for number_of_nodes in nodes_list:
+        chain_state, token_network_address, partners, nodes = make_routing_state(
+            number_of_nodes, channels, degree, seed
+        )
+        token_network = views.get_token_network_by_address(chain_state, token_network_address)
+        assert token_network, "The token network must exist."
+
+        graph = token_network.network_graph.network
+        networkx_graph = graph.to_networkx()
+        target = random.Random(seed).choice(nodes)
+
+        routing_engine = LocalRoutingEngine()
+
+        def route(engine: Optional[LocalRoutingEngine] = None) -> object:
+            return get_best_routes(
+                chain_state=chain_state,
+                token_network_address=token_network_address,
+                one_to_n_address=None,
+                from_address=InitiatorAddress(chain_state.our_address),
+                to_address=TargetAddress(target),
+                amount=PaymentAmount(1),
+                previous_address=None,
+                pfs_config=None,
+                privkey=b"",
+                routing_engine=engine,
+            )
+
+        route(routing_engine)
+
+        measurements: List[Tuple[str, Callable[[], object]]] = [
+            (
+                "networkx, per neighbour",
+                lambda: [networkx.shortest_path(networkx_graph, p, target) for p in partners],
+            ),
+            ("per neighbour", lambda: [graph.shortest_path(p, target) for p in partners]),
+            ("shared search", lambda: graph.shortest_paths_to(target, partners)),
+            ("get_best_routes", route),
+            ("get_best_routes, cached", lambda: route(routing_engine)),
+        ]
+        for name, function in measurements:
+            duration = time_call(function, samples)
+            print(f"{number_of_nodes:>10} {name:<32} {duration * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
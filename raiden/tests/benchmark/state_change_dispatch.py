@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""
+Benchmark of the state change dispatch in `raiden.transfer.node` against the
+number of in-flight payments.
+
+State changes which carry a secrethash (secret reveals, unlocks and expired
+locks) are dispatched through `PaymentMappingState.secrethashes_to_task`, so
+their cost must not depend on the number of payments. A `Block` has to reach
+every payment task and is reported for comparison.
+"""
+import pickle
+import time
+from dataclasses import replace
+
+import click
+
+from raiden.tests.utils import factories
+from raiden.transfer import node
+from raiden.transfer.architecture import StateChange
+from raiden.transfer.channel import compute_locksroot
+from raiden.transfer.mediated_transfer.state import TargetTransferState
+from raiden.transfer.mediated_transfer.state_change import ReceiveSecretReveal
+from raiden.transfer.mediated_transfer.tasks import TargetTask
+from raiden.transfer.state import ChainState, HashTimeLockState
+from raiden.transfer.state_change import Block, ContractReceiveSecretReveal
+from raiden.utils.secrethash import sha256_secrethash
+from raiden.utils.typing import (
+    BlockExpiration,
+    BlockGasLimit,
+    BlockNumber,
+    List,
+    PaymentWithFeeAmount,
+    Secret,
+    SecretRegistryAddress,
+    TokenAmount,
+    Tuple,
+)
+
+LOCK_EXPIRATION = BlockExpiration(10_000)
+
+
+def make_chain_state_with_payments(number_of_payments: int) -> Tuple[ChainState, List[Secret]]:
+    """ Creates a chain state with `number_of_payments` target tasks, all of
+    them receiving a lock of one token through the same channel.
+    """
+    test_state = factories.make_chain_state(
+        number_of_channels=1,
+        properties=[
+            factories.NettingChannelStateProperties(
+                partner_state=factories.NettingChannelEndStateProperties(
+                    address=factories.UNIT_TRANSFER_SENDER, balance=TokenAmount(number_of_payments)
+                )
+            )
+        ],
+    )
+    chain_state = test_state.chain_state
+    channel_state = test_state.channels[0]
+    partner_state = channel_state.partner_state
+
+    template = factories.create(
+        factories.LockedTransferSignedStateProperties(
+            amount=TokenAmount(1),
+            expiration=LOCK_EXPIRATION,
+            canonical_identifier=channel_state.canonical_identifier,
+        )
+    )
+
+    secrets = [factories.make_secret(i) for i in range(number_of_payments)]
+    for secret in secrets:
+        secrethash = sha256_secrethash(secret)
+        lock = HashTimeLockState(
+            amount=PaymentWithFeeAmount(1), expiration=LOCK_EXPIRATION, secrethash=secrethash
+        )
+        partner_state.secrethashes_to_lockedlocks[secrethash] = lock
+        partner_state.pending_locks.locks.append(lock.encoded)
+
+        target_state = TargetTransferState(
+            from_hop=factories.make_hop_from_channel(channel_state),
+            transfer=replace(template, lock=lock),
+        )
+        chain_state.payment_mapping.secrethashes_to_task[secrethash] = TargetTask(
+            canonical_identifier=channel_state.canonical_identifier, target_state=target_state
+        )
+
+    # The channel sanity checks require a balance proof for the pending locks
+    partner_state.balance_proof = factories.create(
+        factories.BalanceProofSignedStateProperties(
+            transferred_amount=TokenAmount(0),
+            locked_amount=TokenAmount(number_of_payments),
+            locksroot=compute_locksroot(partner_state.pending_locks),
+            canonical_identifier=channel_state.canonical_identifier,
+        )
+    )
+
+    return chain_state, secrets
+
+
+def time_dispatch(chain_state: ChainState, state_change: StateChange, samples: int) -> float:
+    """ Average time of `node.state_transition`, excluding the state copy. """
+    data = pickle.dumps(chain_state, pickle.HIGHEST_PROTOCOL)
+    total = 0.0
+    for _ in range(samples):
+        state_copy = pickle.loads(data)
+        start = time.perf_counter()
+        node.state_transition(state_copy, state_change)
+        total += time.perf_counter() - start
+    return total / samples
+
+
+def make_state_changes(chain_state: ChainState, secret: Secret) -> List[StateChange]:
+    block_number = BlockNumber(chain_state.block_number + 1)
+    return [
+        Block(
+            block_number=block_number,
+            gas_limit=BlockGasLimit(1),
+            block_hash=factories.make_block_hash(),
+        ),
+        ContractReceiveSecretReveal(
+            transaction_hash=factories.make_transaction_hash(),
+            secret_registry_address=SecretRegistryAddress(factories.make_address()),
+            secrethash=sha256_secrethash(secret),
+            secret=secret,
+            block_number=block_number,
+            block_hash=factories.make_block_hash(),
+        ),
+        ReceiveSecretReveal(sender=factories.UNIT_TRANSFER_SENDER, secret=secret),
+    ]
+
+
+@click.command(help=__doc__)
+@click.option(
+    "--payments",
+    "payments_list",
+    multiple=True,
+    type=int,
+    default=[10, 100, 1000, 5000],
+    show_default=True,
+    help="Number of in-flight payments, can be given multiple times.",
+)
+@click.option("--samples", default=20, show_default=True, help="Dispatches per measurement.")
+def main(payments_list: List[int], samples: int) -> None:
+    print(f"{'payments':>10} {'state change':<30} {'avg (ms)':>10}")
+    for number_of_payments in payments_list:
+        chain_state, secrets = make_chain_state_with_payments(number_of_payments)
+        for state_change in make_state_changes(chain_state, secrets[0]):
+            duration = time_dispatch(chain_state, state_change, samples)
+            name = state_change.__class__.__name__
+            print(f"{number_of_payments:>10} {name:<30} {duration * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
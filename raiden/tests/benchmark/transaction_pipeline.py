@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+"""
+Benchmark of sending independent transactions one at a time, waiting for
+each receipt, against sending them back to back with a `TransactionPipeline`
+and waiting for all the receipts together.
+
+The transactions are sent to a local stub JSON-RPC server standing in for a
+development chain, which mines a block every `--block-time` seconds with the
+pending transactions of the account, in nonce order. A transaction after a
+nonce gap is not mined until the gap is filled. With `--reject-every` the
+server rejects every n-th raw transaction without using its nonce, like a
+node which is out of funds temporarily, and the rejected transactions are
+sent again.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import click
+import rlp
+from eth_utils import encode_hex, keccak, to_hex
+from hexbytes import HexBytes
+from web3 import HTTPProvider, Web3
+
+from raiden.constants import TRANSACTION_INTRINSIC_GAS
+from raiden.log_config import configure_logging
+from raiden.network.rpc.client import JSONRPCClient
+from raiden.tests.utils.factories import make_address, make_privatekey_bin
+from raiden.utils.typing import Address, Any, Dict, List, Optional, Tuple
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StubDevChain:
+    """ JSON-RPC server with the methods used by the `JSONRPCClient` to send
+    transactions and to wait for their receipts.
+    """
+
+    def __init__(self, block_time: float, request_duration: float, reject_every: int) -> None:
+        self.block_time = block_time
+        self.request_duration = request_duration
+        self.reject_every = reject_every
+
+        self.lock = threading.Lock()
+        self.block_number = 1
+        self.nonce = 0
+        self.pending: Dict[int, str] = dict()
+        self.mined_at: Dict[str, int] = dict()
+        self.raw_transactions = 0
+        self.http_requests = 0
+        self.rpc_calls = 0
+
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # pylint: disable=invalid-name
+                content_length = int(str(self.headers["Content-Length"]))
+                request = json.loads(self.rfile.read(content_length))
+                time.sleep(node.request_duration)
+
+                with node.lock:
+                    node.http_requests += 1
+                    if isinstance(request, list):
+                        response: Any = [node.handle(item) for item in request]
+                    else:
+                        response = node.handle(request)
+
+                body = json.dumps(response)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body.encode())
+
+            def log_message(self, *args: Any) -> None:  # pylint: disable=arguments-differ
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.stop_event = threading.Event()
+        self.miner = threading.Thread(target=self.mine, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.rpc_calls += 1
+        method, params = request["method"], request["params"]
+
+        error = None
+        result: Optional[Any] = None
+        if method == "eth_sendRawTransaction":
+            result, error = self.send_raw_transaction(params[0])
+        elif method == "eth_getTransactionReceipt":
+            result = self.receipt(params[0])
+        elif method == "eth_blockNumber":
+            result = to_hex(self.block_number)
+        elif method == "eth_getTransactionCount":
+            result = to_hex(self.nonce)
+        elif method == "eth_gasPrice":
+            result = to_hex(10 ** 9)
+        elif method == "net_version":
+            result = "337"
+        else:
+            assert method == "web3_clientVersion", f"Unexpected method {method}"
+            result = "Geth/v1.9.0-stable/linux-amd64/go1.12"
+
+        if error is not None:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": error}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+    def send_raw_transaction(self, raw_transaction: str) -> Tuple[Optional[str], Optional[Dict]]:
+        self.raw_transactions += 1
+        if self.reject_every and self.raw_transactions % self.reject_every == 0:
+            return None, {"code": -32000, "message": "insufficient funds for gas * price + value"}
+
+        raw = bytes(HexBytes(raw_transaction))
+        nonce = int.from_bytes(rlp.decode(raw)[0], "big")
+        if nonce < self.nonce or nonce in self.pending:
+            return None, {"code": -32000, "message": "nonce too low"}
+
+        transaction_hash = encode_hex(keccak(raw))
+        self.pending[nonce] = transaction_hash
+        return transaction_hash, None
+
+    def receipt(self, transaction_hash: str) -> Optional[Dict[str, Any]]:
+        block_number = self.mined_at.get(transaction_hash)
+        if block_number is None:
+            return None
+
+        return {
+            "blockHash": "0x" + block_number.to_bytes(32, "big").hex(),
+            "blockNumber": to_hex(block_number),
+            "contractAddress": None,
+            "cumulativeGasUsed": to_hex(TRANSACTION_INTRINSIC_GAS),
+            "gasUsed": to_hex(TRANSACTION_INTRINSIC_GAS),
+            "logs": [],
+            "logsBloom": "0x" + "00" * 256,
+            "status": "0x1",
+            "transactionHash": transaction_hash,
+            "transactionIndex": "0x0",
+        }
+
+    def mine(self) -> None:
+        while not self.stop_event.wait(self.block_time):
+            with self.lock:
+                self.block_number += 1
+                while self.nonce in self.pending:
+                    self.mined_at[self.pending.pop(self.nonce)] = self.block_number
+                    self.nonce += 1
+
+    def start(self) -> None:
+        self.thread.start()
+        self.miner.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def send_sequentially(client: JSONRPCClient, to: Address, transactions: int) -> None:
+    """ Sends a transaction and waits for its receipt before sending the
+    next one, like the proxies do.
+    """
+    for value in range(transactions):
+        while True:
+            slot = client.get_next_transaction()
+            try:
+                transaction_hash = slot.send_transaction(
+                    to=to, startgas=TRANSACTION_INTRINSIC_GAS, value=value
+                )
+                break
+            except ValueError:
+                slot.release()
+
+        client.poll(transaction_hash)
+
+
+def send_pipelined(client: JSONRPCClient, to: Address, transactions: int) -> None:
+    """ Sends all the transactions back to back and waits for the receipts
+    together.
+    """
+    with client.transaction_pipeline(transactions) as pipeline:
+        for value in range(transactions):
+            while True:
+                try:
+                    pipeline.send_transaction(
+                        to=to, startgas=TRANSACTION_INTRINSIC_GAS, value=value
+                    )
+                    break
+                except ValueError:
+                    pass
+
+        pipeline.wait()
+
+
+@click.command(help=__doc__)
+@click.option("--transactions", default=20, show_default=True, help="Transactions to send.")
+@click.option("--block-time", default=0.5, show_default=True, help="Seconds per block.")
+@click.option("--request-duration", default=0.005, show_default=True, help="Seconds per request.")
+@click.option("--confirmations", default=1, show_default=True, help="Blocks to confirm.")
+@click.option("--reject-every", default=7, show_default=True, help="0 rejects no transaction.")
+def main(
+    transactions: int,
+    block_time: float,
+    request_duration: float,
+    confirmations: int,
+    reject_every: int,
+) -> None:
+    configure_logging({"": "CRITICAL"}, disable_debug_logfile=True)
+
+    modes: List[Tuple[str, Any]] = [
+        ("sequential", send_sequentially),
+        ("pipeline", send_pipelined),
+    ]
+
+    print(f"{transactions} transactions, a block every {block_time}s")
+    print(f"{'mode':<12} {'time (s)':>9} {'blocks':>7} {'sent':>5} {'requests':>9} {'calls':>6}")
+    for name, send in modes:
+        node = StubDevChain(block_time, request_duration, reject_every)
+        node.start()
+
+        try:
+            web3 = Web3(HTTPProvider(node.url))
+            client = JSONRPCClient(
+                web3=web3, privkey=make_privatekey_bin(), block_num_confirmations=confirmations
+            )
+            client.receipt_tracker.poll_interval = block_time / 10
+            first_block = node.block_number
+
+            start = time.perf_counter()
+            send(client, Address(make_address()), transactions)
+            elapsed = time.perf_counter() - start
+
+            # No nonce was skipped or used twice
+            assert node.nonce == transactions and not node.pending
+        finally:
+            node.stop()
+
+        blocks = node.block_number - first_block
+        print(
+            f"{name:<12} {elapsed:>9.2f} {blocks:>7} {node.raw_transactions:>5} "
+            f"{node.http_requests:>9} {node.rpc_calls:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,27 @@
+from raiden.settings import MONITORING_REWARD
+from raiden.utils.keys import privatekey_to_address
+from raiden.utils.typing import TokenAmount, UserDepositAddress
+
+
+def test_user_deposit_effective_balance_cache(
+    proxy_manager, user_deposit_address, private_keys, deploy_client
+):
+    user_deposit = proxy_manager.user_deposit(UserDepositAddress(user_deposit_address))
+    address = privatekey_to_address(private_keys[0])
+
+    # The deposits of the fixture refreshed the cache
+    assert user_deposit.cached_effective_balance(address) == MONITORING_REWARD
+
+    block_number = deploy_client.block_number()
+    assert user_deposit.refresh_effective_balance(address, block_number) == MONITORING_REWARD
+
+    user_deposit.deposit(
+        beneficiary=address,
+        total_deposit=TokenAmount(2 * MONITORING_REWARD),
+        given_block_identifier="latest",
+    )
+    assert user_deposit.cached_effective_balance(address) == 2 * MONITORING_REWARD
+
+    # Refreshing for an older block keeps the newer balance
+    refreshed = user_deposit.refresh_effective_balance(address, block_number)
+    assert refreshed == 2 * MONITORING_REWARD
@@ -569,7 +569,7 @@ def test_monitoring_broadcast_messages(
         lambda *a, **kw: channel_state,
     )
     monkeypatch.setattr(raiden.transfer.channel, "get_balance", lambda *a, **kw: 123)
-    raiden_service.user_deposit.effective_balance.return_value = MONITORING_REWARD
+    raiden_service.user_deposit.cached_effective_balance.return_value = MONITORING_REWARD
 
     update_monitoring_service_from_balance_proof(
         raiden=raiden_service,
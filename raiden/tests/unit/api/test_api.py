@@ -1,8 +1,12 @@
 from typing import cast
 
-from raiden.api.python import transfer_tasks_view
+from raiden.api.python import RaidenAPI, transfer_tasks_view
+from raiden.raiden_service import RaidenService
 from raiden.tests.utils import factories
+from raiden.tests.utils.mocks import MockRaidenService
 from raiden.transfer.architecture import TransferTask
+from raiden.transfer.mediated_transfer import mediator
+from raiden.transfer.mediated_transfer.mediation_fee import MediationFeeCalculatorCache
 from raiden.transfer.mediated_transfer.state import (
     InitiatorPaymentState,
     InitiatorTransferState,
@@ -181,3 +185,17 @@ def test_target_task_view():
     # pylint: disable=no-member
     assert pending_transfer.get("locked_amount") == str(transfer.balance_proof.locked_amount)
     assert pending_transfer.get("payment_identifier") == str(transfer.payment_identifier)
+
+
+def test_get_metrics(monkeypatch):
+    raiden = MockRaidenService()
+    fee_calculator_cache = MediationFeeCalculatorCache()
+    fee_calculator_cache.hits = 3
+    fee_calculator_cache.misses = 1
+    monkeypatch.setattr(mediator, "FEE_CALCULATOR_CACHE", fee_calculator_cache)
+
+    metrics = RaidenAPI(cast(RaidenService, raiden)).get_metrics()
+
+    assert metrics["fee_calculator_cache"] == {"hits": 3, "misses": 1, "hit_rate": 0.75}
+    assert metrics["routing_engine"] == {"hits": 0, "misses": 0}
+    assert metrics["signing_service"]["signed_messages"] == 0
@@ -1,9 +1,17 @@
+import json
+
+import gevent
 import pytest
+import rlp
+from eth_utils import encode_hex, keccak, to_canonical_address
+from gevent.pywsgi import WSGIServer
+from hexbytes import HexBytes
 from requests.exceptions import ConnectionError as RequestsConnectionError
 from web3 import HTTPProvider, Web3
 
-from raiden.network.rpc.client import JSONRPCClient
-from raiden.tests.utils.factories import make_privatekey_bin
+from raiden.network.rpc.client import JSONRPCClient, ReceiptTracker
+from raiden.tests.utils.factories import make_address, make_privatekey_bin
+from raiden.utils.typing import Any, Dict, List, Optional, TransactionHash, Tuple
 
 
 def test_connection_issues() -> None:
@@ -19,3 +27,224 @@ def test_connection_issues() -> None:
 
     with pytest.raises(RequestsConnectionError):
         JSONRPCClient(web3=web3, privkey=make_privatekey_bin())
+
+
+def test_receipt_tracker_batches_the_receipts_and_handles_reorgs() -> None:
+    """ The receipts of all the pending transactions are fetched with one
+    batch request per block, and a transaction dropped by a reorg is waited
+    for until it is mined again.
+    """
+    chain = {"block_number": 10}
+    mined_at: Dict[str, int] = dict()
+    receipt_batches: List[Tuple[int, List[str]]] = list()
+
+    def receipt(transaction_hash: str) -> Optional[Dict[str, Any]]:
+        if transaction_hash not in mined_at:
+            return None
+        return {
+            "blockHash": "0x" + "ab" * 32,
+            "blockNumber": hex(mined_at[transaction_hash]),
+            "contractAddress": None,
+            "cumulativeGasUsed": "0x5208",
+            "gasUsed": "0x5208",
+            "logs": [],
+            "logsBloom": "0x" + "00" * 256,
+            "status": "0x1",
+            "transactionHash": transaction_hash,
+            "transactionIndex": "0x0",
+        }
+
+    def application(environ, start_response):
+        request = json.loads(environ["wsgi.input"].read())
+        if isinstance(request, list):
+            transaction_hashes = [item["params"][0] for item in request]
+            receipt_batches.append((chain["block_number"], transaction_hashes))
+            response: Any = [
+                {"jsonrpc": "2.0", "id": item["id"], "result": receipt(item["params"][0])}
+                for item in request
+            ]
+        else:
+            assert request["method"] == "eth_blockNumber"
+            result = hex(chain["block_number"])
+            response = {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+        start_response("200 OK", [("Content-Type", "application/json")])
+        return [json.dumps(response).encode()]
+
+    def mine(block_number: int, transactions: Dict[str, int] = None) -> None:
+        """ Mines a block, and waits until the tracker checked the receipts. """
+        mined_at.update(transactions or dict())
+        chain["block_number"] = block_number
+        with gevent.Timeout(5):
+            while not any(block == block_number for block, _ in receipt_batches):
+                gevent.sleep(0.01)
+        gevent.sleep(0.05)
+
+    server = WSGIServer(("127.0.0.1", 0), application, log=None)
+    server.start()
+
+    web3 = Web3(HTTPProvider(f"http://127.0.0.1:{server.server_port}"))
+    tracker = ReceiptTracker(web3, confirmations=2, poll_interval=0.01)
+    transaction_hashes = [TransactionHash(bytes([i]) * 32) for i in range(3)]
+    first, second, reorged = [
+        encode_hex(transaction_hash) for transaction_hash in transaction_hashes
+    ]
+    waiters = [gevent.spawn(tracker.wait_for_receipt, h) for h in transaction_hashes]
+
+    try:
+        mine(10)
+        mine(11, {first: 11, reorged: 11})
+        mine(12, {second: 12})
+        del mined_at[reorged]
+        mine(13)
+        assert waiters[0].get(timeout=5)["blockNumber"] == 11
+        assert not waiters[1].ready() and not waiters[2].ready()
+
+        mine(14, {reorged: 14})
+        assert waiters[1].get(timeout=5)["blockNumber"] == 12
+        mine(15)
+        mine(16)
+        assert waiters[2].get(timeout=5)["blockNumber"] == 14
+        assert waiters[2].value["transactionHash"] == HexBytes(reorged)
+    finally:
+        gevent.killall(waiters)
+        server.stop()
+
+    # One batch per new block while transactions are pending
+    assert [block for block, _ in receipt_batches] == list(range(10, 17))
+    assert receipt_batches[0][1] == [first, second, reorged]
+    assert receipt_batches[-1][1] == [reorged]
+    assert not tracker._greenlet  # pylint: disable=protected-access
+
+
+def test_transaction_pipeline_reuses_the_nonces_of_rejected_transactions() -> None:
+    """ The transactions of a pipeline are sent with consecutive nonces, a
+    rejected transaction does not leave a gap, and the unused nonces are
+    given back or filled when the pipeline is closed.
+    """
+    chain: Dict[str, Any] = {"block_number": 1, "nonce": 5}
+    pending: Dict[int, Tuple[str, bytes]] = dict()
+    mined: Dict[int, Tuple[str, bytes]] = dict()
+    mined_at: Dict[str, int] = dict()
+    rejected_nonces = {6}
+
+    def send_raw_transaction(raw_transaction: str) -> Dict[str, Any]:
+        raw = bytes(HexBytes(raw_transaction))
+        fields = rlp.decode(raw)
+        nonce = int.from_bytes(fields[0], "big")
+        if nonce in rejected_nonces:
+            rejected_nonces.remove(nonce)
+            return {"error": {"code": -32000, "message": "insufficient funds"}}
+
+        assert nonce >= chain["nonce"] and nonce not in pending, "nonce reused"
+        transaction_hash = encode_hex(keccak(raw))
+        pending[nonce] = (transaction_hash, fields[3])
+        return {"result": transaction_hash}
+
+    def mine() -> None:
+        chain["block_number"] += 1
+        while chain["nonce"] in pending:
+            transaction_hash, to = pending.pop(chain["nonce"])
+            mined[chain["nonce"]] = (transaction_hash, to)
+            mined_at[transaction_hash] = chain["block_number"]
+            chain["nonce"] += 1
+
+    def receipt(transaction_hash: str) -> Optional[Dict[str, Any]]:
+        if transaction_hash not in mined_at:
+            return None
+        return {
+            "blockHash": "0x" + "ab" * 32,
+            "blockNumber": hex(mined_at[transaction_hash]),
+            "contractAddress": None,
+            "cumulativeGasUsed": "0x5208",
+            "gasUsed": "0x5208",
+            "logs": [],
+            "logsBloom": "0x" + "00" * 256,
+            "status": "0x1",
+            "transactionHash": transaction_hash,
+            "transactionIndex": "0x0",
+        }
+
+    def handle(request: Dict[str, Any]) -> Dict[str, Any]:
+        method, params = request["method"], request["params"]
+        if method == "eth_sendRawTransaction":
+            response = send_raw_transaction(params[0])
+        elif method == "eth_getTransactionReceipt":
+            response = {"result": receipt(params[0])}
+        elif method == "eth_blockNumber":
+            mine()
+            response = {"result": hex(chain["block_number"])}
+        elif method == "eth_getTransactionCount":
+            response = {"result": hex(chain["nonce"])}
+        else:
+            results = {
+                "web3_clientVersion": "Geth/v1.9.0-stable/linux-amd64/go1.12",
+                "net_version": "337",
+                "eth_gasPrice": hex(10 ** 9),
+            }
+            response = {"result": results[method]}
+
+        return {"jsonrpc": "2.0", "id": request["id"], **response}
+
+    def application(environ, start_response):
+        request = json.loads(environ["wsgi.input"].read())
+        if isinstance(request, list):
+            response: Any = [handle(item) for item in request]
+        else:
+            response = handle(request)
+
+        start_response("200 OK", [("Content-Type", "application/json")])
+        return [json.dumps(response).encode()]
+
+    server = WSGIServer(("127.0.0.1", 0), application, log=None)
+    server.start()
+
+    try:
+        web3 = Web3(HTTPProvider(f"http://127.0.0.1:{server.server_port}"))
+        client = JSONRPCClient(web3=web3, privkey=make_privatekey_bin())
+        client.receipt_tracker.poll_interval = 0.01
+        partner = make_address()
+
+        with client.transaction_pipeline(4) as pipeline:
+            pipeline.send_transaction(to=partner, startgas=21_000, value=1)
+            with pytest.raises(ValueError):
+                pipeline.send_transaction(to=partner, startgas=21_000, value=2)
+            pipeline.send_transaction(to=partner, startgas=21_000, value=3)
+            pipeline.send_transaction(to=partner, startgas=21_000, value=4)
+            receipts = pipeline.wait()
+
+        # The transactions are mined together, the rejected one left no gap
+        assert [receipt["transactionHash"] for receipt in receipts] == pipeline.transaction_hashes
+        assert len({receipt["blockNumber"] for receipt in receipts}) == 1
+        assert sorted(mined) == [5, 6, 7]
+
+        # The last nonce of the pipeline was not used and is given back, the
+        # unused nonce before the transaction of another greenlet is filled
+        with client.transaction_pipeline(2) as pipeline:
+            slot = client.get_next_transaction()
+            assert slot.nonce == 10
+            pipeline.send_transaction(to=partner, startgas=21_000)
+        slot.send_transaction(to=partner, startgas=21_000)
+
+        with gevent.Timeout(5):
+            while chain["nonce"] != 11:
+                client.block_number()
+                gevent.sleep(0.01)
+
+        assert [to_canonical_address(mined[nonce][1]) for nonce in (8, 9, 10)] == [
+            partner,
+            client.address,
+            partner,
+        ]
+
+        # A failure to fill the gap does not hide the error of the pipeline's
+        # user
+        rejected_nonces.add(11)
+        with pytest.raises(RuntimeError, match="pipeline user error"):
+            with client.transaction_pipeline(1):
+                slot = client.get_next_transaction()
+                raise RuntimeError("pipeline user error")
+        assert 11 not in rejected_nonces
+        slot.release()
+    finally:
+        server.stop()
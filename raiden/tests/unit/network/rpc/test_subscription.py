@@ -0,0 +1,158 @@
+import base64
+import hashlib
+import json
+import struct
+from types import SimpleNamespace
+
+import gevent
+from eth_utils import to_hex
+from gevent.queue import Queue
+from gevent.server import StreamServer
+
+from raiden.network.rpc.middleware import BlockHeaderCache
+from raiden.network.rpc.subscription import WEBSOCKET_GUID, NewHeadsSubscription
+from raiden.tasks import AlarmTask
+from raiden.tests.utils.factories import make_address
+
+
+def block_hash(block_number):
+    return "0x" + block_number.to_bytes(32, "big").hex()
+
+
+class StubNewHeadsServer:
+    """ WebSocket JSON-RPC server which pushes the blocks put in `heads` to
+    the `newHeads` subscribers. A `None` head closes the connection.
+    """
+
+    def __init__(self):
+        self.heads = Queue()
+        self.latest_block_number = 10
+        self.connections = 0
+        self.server = StreamServer(("127.0.0.1", 0), self.handle)
+
+    @property
+    def endpoint(self):
+        return f"ws://127.0.0.1:{self.server.server_port}"
+
+    def handle(self, sock, address):  # pylint: disable=unused-argument
+        reader = sock.makefile("rb")
+        headers = dict()
+        for line in iter(reader.readline, b"\r\n"):
+            name, _, value = line.decode().partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        digest = hashlib.sha1((headers["sec-websocket-key"] + WEBSOCKET_GUID).encode()).digest()
+        sock.sendall(
+            b"HTTP/1.1 101 Switching Protocols\r\n"
+            b"Upgrade: websocket\r\n"
+            b"Connection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + base64.b64encode(digest) + b"\r\n\r\n"
+        )
+
+        request = json.loads(self.read_frame(reader))
+        assert request["method"] == "eth_subscribe"
+        assert request["params"] == ["newHeads"]
+        self.send_frame(sock, {"jsonrpc": "2.0", "id": request["id"], "result": "0x1"})
+        self.connections += 1
+
+        while True:
+            block_number = self.heads.get()
+            if block_number is None:
+                sock.close()
+                return
+
+            self.latest_block_number = block_number
+            head = {
+                "number": to_hex(block_number),
+                "hash": block_hash(block_number),
+                "parentHash": block_hash(block_number - 1),
+                "gasLimit": to_hex(8_000_000),
+            }
+            message = {
+                "jsonrpc": "2.0",
+                "method": "eth_subscription",
+                "params": {"subscription": "0x1", "result": head},
+            }
+            self.send_frame(sock, message)
+
+    @staticmethod
+    def read_frame(reader):
+        _, second = reader.read(2)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", reader.read(2))[0]
+        mask = reader.read(4)
+        return bytes(byte ^ mask[i % 4] for i, byte in enumerate(reader.read(length)))
+
+    @staticmethod
+    def send_frame(sock, message):
+        payload = json.dumps(message).encode()
+        sock.sendall(bytes([0x81, 126]) + struct.pack("!H", len(payload)) + payload)
+
+
+def wait_until(condition, timeout=5):
+    with gevent.Timeout(timeout):
+        while not condition():
+            gevent.sleep(0.01)
+
+
+def test_new_heads_subscription_pushes_the_blocks_to_the_alarm_task():
+    server = StubNewHeadsServer()
+    server.server.start()
+
+    polled_blocks = list()
+
+    def get_block(block_identifier):
+        assert block_identifier == "latest"
+        polled_blocks.append(server.latest_block_number)
+        number = server.latest_block_number
+        return {"number": number, "hash": number.to_bytes(32, "big"), "gasLimit": 8_000_000}
+
+    rpc_client = SimpleNamespace(
+        address=make_address(),
+        chain_id=1,
+        get_block=get_block,
+        block_header_cache=BlockHeaderCache(reorg_depth=5),
+        eth_call_cache=SimpleNamespace(rpc_calls_saved=0),
+    )
+    subscription = NewHeadsSubscription(server.endpoint, timeout=5, reconnect_interval=0.3)
+    alarm = AlarmTask(
+        proxy_manager=SimpleNamespace(client=rpc_client),
+        sleep_time=0.05,
+        new_heads_subscription=subscription,
+    )
+
+    callback_blocks = list()
+    alarm.register_callback(lambda block: callback_blocks.append(block["number"]))
+    alarm.start()
+
+    try:
+        # The latest block is polled once on start
+        wait_until(lambda: callback_blocks == [10] and subscription.subscribed)
+        polls = len(polled_blocks)
+
+        # The pushed blocks run the callbacks without polling, a gap is caught
+        # up by the callbacks with the latest block
+        for block_number in (11, 12, 15):
+            server.heads.put(block_number)
+            wait_until(lambda: callback_blocks[-1:] == [block_number])
+        assert len(polled_blocks) == polls
+        assert subscription.heads_received == 3
+
+        # The pushed blocks confirm the cached blocks
+        assert rpc_client.block_header_cache.latest_block_number == 15
+
+        # The node is polled while the connection is down, until the
+        # subscription is re-established
+        server.heads.put(None)
+        wait_until(lambda: server.connections == 2 and subscription.subscribed)
+        assert len(polled_blocks) > polls
+
+        server.heads.put(16)
+        wait_until(lambda: callback_blocks[-1:] == [16])
+        assert callback_blocks == [10, 11, 12, 15, 16]
+    finally:
+        alarm.stop()
+        server.server.stop()
+
+    assert not subscription.greenlet
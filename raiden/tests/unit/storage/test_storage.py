@@ -4,7 +4,16 @@
 
 import pytest
 
-from raiden.storage.sqlite import RAIDEN_DB_VERSION, SQLiteStorage
+from raiden.storage.migrations.v25_to_v26 import upgrade_v25_to_v26
+from raiden.storage.sqlite import (
+    RAIDEN_DB_VERSION,
+    BlockchainLogEncodedRecord,
+    BlockchainLogsRange,
+    SQLiteStorage,
+)
+from raiden.tests.utils.factories import make_address
+from raiden.utils.formatting import to_checksum_address
+from raiden.utils.typing import BlockNumber
 from raiden.utils.upgrades import UpgradeManager, UpgradeRecord
 
 
@@ -86,3 +95,73 @@ def failure(storage, **kwargs):  # pylint: disable=unused-argument
 
     storage = SQLiteStorage(Path(FORMAT.format(2)))
     assert storage.get_version() == 1, "The upgrade must have failed"
+
+
+def test_blockchain_logs_ranges():
+    storage = SQLiteStorage(":memory:")
+    contract_address = to_checksum_address(make_address())
+
+    def write_range(from_block, to_block):
+        storage.write_blockchain_logs(
+            logs=[], ranges=[BlockchainLogsRange(contract_address, from_block, to_block)]
+        )
+        stored_range = storage.get_blockchain_logs_range(contract_address)
+        assert stored_range
+        return stored_range.from_block, stored_range.to_block
+
+    assert storage.get_blockchain_logs_range(contract_address) is None
+    assert write_range(10, 20) == (10, 20)
+
+    # Overlapping and contiguous ranges are merged
+    assert write_range(15, 30) == (10, 30)
+    assert write_range(31, 40) == (10, 40)
+    assert write_range(0, 9) == (0, 40)
+
+    # A disjoint range replaces the stored one only if it is newer
+    assert write_range(50, 60) == (50, 60)
+    assert write_range(0, 10) == (50, 60)
+
+    storage.close()
+
+
+def test_prune_blockchain_logs():
+    storage = SQLiteStorage(":memory:")
+    contract_address = to_checksum_address(make_address())
+    old_contract_address = to_checksum_address(make_address())
+    logs = [
+        BlockchainLogEncodedRecord(contract_address, BlockNumber(block_number), 0, "{}")
+        for block_number in (10, 20, 30)
+    ]
+    storage.write_blockchain_logs(
+        logs=logs,
+        ranges=[
+            BlockchainLogsRange(contract_address, BlockNumber(5), BlockNumber(30)),
+            BlockchainLogsRange(old_contract_address, BlockNumber(5), BlockNumber(15)),
+        ],
+    )
+
+    storage.prune_blockchain_logs(BlockNumber(20))
+
+    assert len(storage.get_blockchain_logs(contract_address, BlockNumber(0), BlockNumber(30))) == 2
+    assert storage.get_blockchain_logs_range(contract_address) == BlockchainLogsRange(
+        contract_address, BlockNumber(20), BlockNumber(30)
+    )
+    assert storage.get_blockchain_logs_range(old_contract_address) is None
+
+    storage.close()
+
+
+def test_upgrade_v25_to_v26_adds_the_blockchain_logs_tables():
+    storage = SQLiteStorage(":memory:")
+    storage.conn.execute("DROP TABLE blockchain_logs")
+    storage.conn.execute("DROP TABLE blockchain_logs_ranges")
+
+    assert upgrade_v25_to_v26(storage=storage, old_version=25, current_version=26) == 26
+
+    contract_address = to_checksum_address(make_address())
+    storage.write_blockchain_logs(
+        logs=[], ranges=[BlockchainLogsRange(contract_address, BlockNumber(1), BlockNumber(2))]
+    )
+    assert storage.get_blockchain_logs_range(contract_address)
+
+    storage.close()
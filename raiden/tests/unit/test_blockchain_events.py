@@ -0,0 +1,361 @@
+from types import SimpleNamespace
+
+import gevent
+import pytest
+from eth_utils import event_abi_to_log_topic
+from hexbytes import HexBytes
+from requests.exceptions import ReadTimeout
+
+from raiden.blockchain.events import (
+    BlockBatchSizeAdjuster,
+    BlockchainEvents,
+    SmartContractEvents,
+    get_all_netting_channel_events,
+    get_token_network_events,
+    token_network_events,
+)
+from raiden.blockchain.filters import ChannelEventsPrefilter
+from raiden.constants import Environment
+from raiden.raiden_service import RaidenService
+from raiden.settings import BlockBatchSizeConfig, BlockchainConfig, RaidenConfig
+from raiden.storage.serialization import JSONSerializer
+from raiden.storage.sqlite import SerializedSQLiteStorage
+from raiden.tests.utils.factories import (
+    make_address,
+    make_block_hash,
+    make_channel_identifier,
+    make_token_network_address,
+    make_transaction_hash,
+)
+from raiden.utils.formatting import to_checksum_address
+from raiden.utils.typing import BlockNumber, ChainID
+from raiden_contracts.constants import (
+    CONTRACT_TOKEN_NETWORK,
+    CONTRACT_TOKEN_NETWORK_REGISTRY,
+    EVENT_TOKEN_NETWORK_CREATED,
+    ChannelEvent,
+)
+
+CONFIG = BlockBatchSizeConfig(
+    min=BlockNumber(10),
+    initial=BlockNumber(100),
+    max=BlockNumber(1_000),
+    fast_threshold=1.0,
+    slow_threshold=5.0,
+    max_events=100,
+)
+
+
+def test_block_batch_size_adjuster():
+    adjuster = BlockBatchSizeAdjuster(CONFIG)
+    assert adjuster.batch_size == 100
+
+    # Fast requests with few events grow the range, up to the maximum
+    for _ in range(5):
+        adjuster.update(
+            to_block=BlockNumber(1), request_duration=0.1, number_of_events=10, range_limited=True
+        )
+    assert adjuster.batch_size == 1_000
+    assert adjuster.last_request_duration == 0.1
+
+    # Requests in between the thresholds keep the range
+    adjuster.update(
+        to_block=BlockNumber(1), request_duration=2.0, number_of_events=10, range_limited=True
+    )
+    adjuster.update(
+        to_block=BlockNumber(1), request_duration=0.1, number_of_events=60, range_limited=True
+    )
+    assert adjuster.batch_size == 1_000
+
+    # Slow requests and requests with too many events shrink the range
+    adjuster.update(
+        to_block=BlockNumber(1), request_duration=6.0, number_of_events=10, range_limited=True
+    )
+    assert adjuster.batch_size == 500
+    adjuster.update(
+        to_block=BlockNumber(1), request_duration=0.1, number_of_events=101, range_limited=True
+    )
+    assert adjuster.batch_size == 250
+
+    # Ranges limited by the target block do not grow the range
+    adjuster.update(
+        to_block=BlockNumber(1), request_duration=0.1, number_of_events=0, range_limited=False
+    )
+    assert adjuster.batch_size == 250
+
+    # Timeouts shrink the range faster, down to the minimum
+    assert adjuster.timed_out(to_block=BlockNumber(100), request_duration=10.0)
+    assert adjuster.batch_size == 31
+    assert adjuster.timed_out(to_block=BlockNumber(100), request_duration=10.0)
+    assert adjuster.batch_size == 10
+    assert not adjuster.timed_out(to_block=BlockNumber(100), request_duration=10.0)
+    assert adjuster.last_request_duration == 10.0
+
+    # The range grows only after the blocks which timed out have been fetched
+    adjuster.update(
+        to_block=BlockNumber(100), request_duration=0.1, number_of_events=0, range_limited=True
+    )
+    assert adjuster.batch_size == 10
+    adjuster.update(
+        to_block=BlockNumber(101), request_duration=0.1, number_of_events=0, range_limited=True
+    )
+    assert adjuster.batch_size == 20
+
+
+class FakeWeb3:
+    """ Times out `eth_getLogs` requests for more than `max_range` blocks. """
+
+    def __init__(self, max_range):
+        self.max_range = max_range
+        self.requested_ranges = list()
+        self.logs = list()
+        self.manager = SimpleNamespace(request_blocking=self.request_blocking)
+        self.eth = SimpleNamespace(getBlock=self.get_block)
+
+    def request_blocking(self, method, params):
+        assert method == "eth_getLogs"
+        from_block, to_block = params[0]["fromBlock"], params[0]["toBlock"]
+        self.requested_ranges.append((from_block, to_block))
+        if to_block - from_block > self.max_range:
+            raise ReadTimeout()
+        return [log for log in self.logs if from_block <= log["blockNumber"] <= to_block]
+
+    @staticmethod
+    def get_block(block_number):
+        return {"number": block_number, "hash": make_block_hash(), "gasLimit": 1}
+
+
+def make_blockchain_events(web3, event_filter=None, log_storage=None):
+    if event_filter is None:
+        address = make_address()
+        event_filter = SmartContractEvents(
+            contract_address=address,
+            abi=[],
+            checksummed_contract_address=to_checksum_address(address),
+        )
+    return BlockchainEvents(
+        web3=web3,
+        chain_id=ChainID(1),
+        contract_manager=None,
+        last_fetched_block=BlockNumber(0),
+        event_filters=[event_filter],
+        block_batch_size_config=CONFIG,
+        event_prefilter=None,
+        log_storage=log_storage,
+    )
+
+
+def test_fetch_logs_in_batch_retries_timeouts_with_smaller_ranges():
+    web3 = FakeWeb3(max_range=30)
+    blockchain_events = make_blockchain_events(web3)
+
+    target_block_number = BlockNumber(200)
+    polled_blocks = list()
+    while blockchain_events.last_fetched_block < target_block_number:
+        poll_result = blockchain_events.fetch_logs_in_batch(target_block_number)
+        if poll_result is not None:
+            polled_blocks.append(poll_result.polled_block_number)
+
+    # The range is decreased after the timeout, and increased again only
+    # after the blocks of the request which timed out have been fetched
+    assert web3.requested_ranges[:3] == [(1, 101), (1, 13), (14, 26)]
+    assert polled_blocks == [13, 26, 39, 52, 65, 78, 91, 104, 129, 140, 151, 162, 173, 184, 200]
+
+    # The requests fail for ranges bigger than the minimum
+    web3.max_range = 5
+    with pytest.raises(ReadTimeout):
+        while True:
+            blockchain_events.fetch_logs_in_batch(BlockNumber(300))
+    assert blockchain_events.block_batch_size_adjuster.batch_size == 10
+
+
+class PollingRaiden:  # pylint: disable=too-few-public-methods
+    """ Stands in for the `RaidenService` of `_poll_until_target`. """
+
+    def __init__(self, blockchain_events, pipelined_sync):
+        self.blockchain_events = blockchain_events
+        self.config = RaidenConfig(
+            chain_id=ChainID(1),
+            environment_type=Environment.DEVELOPMENT,
+            blockchain=BlockchainConfig(block_batch_size=CONFIG, pipelined_sync=pipelined_sync),
+        )
+        self.dispatched = list()
+        self.fail_at = None
+
+    def _log_sync_progress(self, to_block):
+        pass
+
+    def _dispatch_poll_result(self, poll_result):
+        # The number of requests sent before the batch is dispatched
+        requests = len(self.blockchain_events.web3.requested_ranges)
+        self.dispatched.append((poll_result.polled_block_number, requests))
+        gevent.sleep(0.01)
+        if poll_result.polled_block_number == self.fail_at:
+            raise ValueError("dispatch failed")
+
+
+@pytest.mark.parametrize("pipelined_sync", [False, True])
+def test_poll_until_target_prefetches_the_next_batch(pipelined_sync):
+    raiden = PollingRaiden(make_blockchain_events(FakeWeb3(max_range=1_000)), pipelined_sync)
+    RaidenService._poll_until_target(raiden, BlockNumber(1_000))
+
+    if pipelined_sync:
+        # The next batch was requested before the current one was dispatched
+        assert raiden.dispatched == [(101, 2), (302, 3), (703, 4), (1_000, 4)]
+    else:
+        assert raiden.dispatched == [(101, 1), (302, 2), (703, 3), (1_000, 4)]
+
+
+def test_poll_until_target_refetches_the_prefetched_batch_on_failures():
+    raiden = PollingRaiden(make_blockchain_events(FakeWeb3(max_range=1_000)), True)
+    raiden.fail_at = BlockNumber(101)
+
+    with pytest.raises(ValueError):
+        RaidenService._poll_until_target(raiden, BlockNumber(1_000))
+
+    # The prefetched batch was discarded
+    assert raiden.dispatched == [(101, 2)]
+    assert raiden.blockchain_events.last_fetched_block == 101
+
+    raiden.fail_at = None
+    RaidenService._poll_until_target(raiden, BlockNumber(1_000))
+    assert raiden.blockchain_events.web3.requested_ranges[2] == (102, 502)
+    assert raiden.dispatched[-1][0] == 1_000
+
+
+def test_channel_events_prefilter(contract_manager):
+    our_address = make_address()
+    partner_address = make_address()
+    token_network_address = make_token_network_address()
+    our_channel = make_channel_identifier()
+    other_channel = make_channel_identifier()
+    new_channel = make_channel_identifier()
+
+    def topic(contract_name, event_name):
+        return event_abi_to_log_topic(contract_manager.get_event_abi(contract_name, event_name))
+
+    def make_log(event_name, channel_identifier, *participants):
+        return {
+            "address": to_checksum_address(token_network_address),
+            "topics": [topic(CONTRACT_TOKEN_NETWORK, event_name), channel_identifier]
+            + [bytes(12) + participant for participant in participants],
+        }
+
+    event_prefilter = ChannelEventsPrefilter(
+        our_address=our_address,
+        channel_identifiers=[(token_network_address, our_channel)],
+        contract_manager=contract_manager,
+    )
+
+    token_network_created = {
+        "address": to_checksum_address(make_address()),
+        "topics": [topic(CONTRACT_TOKEN_NETWORK_REGISTRY, EVENT_TOKEN_NETWORK_CREATED)],
+    }
+    kept = [
+        token_network_created,
+        make_log(ChannelEvent.DEPOSIT, our_channel, our_address),
+        make_log(ChannelEvent.OPENED, other_channel, partner_address, make_address()),
+        make_log(ChannelEvent.CLOSED, other_channel, partner_address),
+        make_log(ChannelEvent.OPENED, new_channel, partner_address, our_address),
+        make_log(ChannelEvent.DEPOSIT, new_channel, partner_address),
+        make_log(ChannelEvent.SETTLED, our_channel),
+    ]
+    dropped = [
+        make_log(ChannelEvent.DEPOSIT, other_channel, partner_address),
+        make_log(ChannelEvent.UNLOCKED, other_channel, partner_address, make_address()),
+        make_log(ChannelEvent.SETTLED, other_channel),
+    ]
+
+    logs = kept[:5] + dropped + kept[5:]
+    assert event_prefilter.filter_logs(logs) == kept
+    assert (token_network_address, new_channel) in event_prefilter.channel_identifiers
+
+    assert event_prefilter.received_logs[ChannelEvent.DEPOSIT] == 3
+    assert event_prefilter.dropped_logs == {
+        ChannelEvent.DEPOSIT: 1,
+        ChannelEvent.UNLOCKED: 1,
+        ChannelEvent.SETTLED: 1,
+    }
+
+
+def test_blockchain_events_are_served_from_the_log_storage(contract_manager):
+    token_network_address = make_token_network_address()
+    channel_identifier = make_channel_identifier()
+    topic = event_abi_to_log_topic(
+        contract_manager.get_event_abi(CONTRACT_TOKEN_NETWORK, ChannelEvent.DEPOSIT)
+    )
+
+    def make_log(block_number, channel):
+        return {
+            "address": to_checksum_address(token_network_address),
+            "topics": [
+                HexBytes(topic),
+                HexBytes(channel.to_bytes(32, "big")),
+                HexBytes(bytes(12) + make_address()),
+            ],
+            "data": "0x" + (1).to_bytes(32, "big").hex(),
+            "blockNumber": block_number,
+            "blockHash": HexBytes(make_block_hash()),
+            "transactionHash": HexBytes(make_transaction_hash()),
+            "transactionIndex": 0,
+            "logIndex": 0,
+            "removed": False,
+        }
+
+    requested_ranges = list()
+
+    def get_filter_events(contract_address, topics, from_block, to_block):
+        # pylint: disable=unused-argument
+        requested_ranges.append((from_block, to_block))
+        return []
+
+    proxy_manager = SimpleNamespace(client=SimpleNamespace(get_filter_events=get_filter_events))
+    storage = SerializedSQLiteStorage(":memory:", serializer=JSONSerializer())
+
+    # The logs are stored as the blockchain events are synchronized
+    web3 = FakeWeb3(max_range=1_000)
+    web3.logs = [make_log(10, channel_identifier), make_log(20, make_channel_identifier())]
+    blockchain_events = make_blockchain_events(
+        web3, token_network_events(token_network_address, contract_manager), storage
+    )
+    blockchain_events.fetch_logs_in_batch(BlockNumber(30))
+    stored_range = storage.get_blockchain_logs_range(to_checksum_address(token_network_address))
+    assert stored_range.from_block == 1 and stored_range.to_block == 30
+
+    def get_events(from_block, to_block):
+        return get_token_network_events(
+            proxy_manager=proxy_manager,
+            token_network_address=token_network_address,
+            contract_manager=contract_manager,
+            from_block=from_block,
+            to_block=to_block,
+            log_storage=storage,
+        )
+
+    # The stored range is served without requests
+    events = get_events(1, 30)
+    assert [event["block_number"] for event in events] == [10, 20]
+    assert events[0]["args"]["channel_identifier"] == channel_identifier
+    assert requested_ranges == []
+
+    # The blocks before the stored range, and the blocks after the last
+    # confirmed block which has been synchronized, are queried
+    assert len(get_events(0, "latest")) == 2
+    assert requested_ranges == [(0, 0), (31, "latest")]
+
+    requested_ranges.clear()
+    assert get_events(40, 50) == []
+    assert requested_ranges == [(40, 50)]
+
+    channel_events = get_all_netting_channel_events(
+        proxy_manager=proxy_manager,
+        token_network_address=token_network_address,
+        netting_channel_identifier=channel_identifier,
+        contract_manager=contract_manager,
+        from_block=1,
+        to_block=30,
+        log_storage=storage,
+    )
+    assert [event["block_number"] for event in channel_events] == [10]
+
+    storage.close()
@@ -8,21 +8,27 @@
 import requests
 import responses
 from eth_utils import decode_hex, encode_hex, to_canonical_address, to_normalized_address
+from gevent.threadpool import ThreadPool
 from matrix_client.errors import MatrixRequestError
 from matrix_client.user import User
 
 import raiden.network.transport.matrix.client
 import raiden.network.transport.matrix.utils
+from raiden.constants import EMPTY_SIGNATURE
 from raiden.exceptions import TransportError
+from raiden.messages.synchronization import Processed
 from raiden.network.transport.matrix.utils import (
+    MATRIX_PARALLEL_RECOVERY_MIN_BATCH,
     login,
     make_client,
     make_message_batches,
     make_room_alias,
     my_place_or_yours,
     sort_servers_closest,
+    validate_and_parse_message,
     validate_userid_signature,
 )
+from raiden.storage.serialization.serializer import MessageSerializer
 from raiden.tests.utils.factories import make_signer
 from raiden.tests.utils.transport import ignore_messages
 from raiden.utils.signer import recover
@@ -244,3 +250,27 @@ def test_make_message_batches(message_list, expected_batch_count, should_raise,
 
         assert len(batches) == expected_batch_count
         assert sum(len(batch.split("\n")) for batch in batches) == len(message_list)
+
+
+def test_validate_and_parse_message_with_recovery_pool():
+    signer = make_signer()
+    other_signer = make_signer()
+
+    messages = list()
+    for message_identifier in range(MATRIX_PARALLEL_RECOVERY_MIN_BATCH * 3):
+        message = Processed(message_identifier=message_identifier, signature=EMPTY_SIGNATURE)
+        # Every third message is not signed by the peer and must be dropped
+        message.sign(other_signer if message_identifier % 3 == 1 else signer)
+        messages.append(message)
+    data = "\n".join(MessageSerializer.serialize(message) for message in messages)
+
+    expected = [message for message in messages if message.message_identifier % 3 != 1]
+    assert validate_and_parse_message(data, signer.address) == expected
+
+    recovery_pool = ThreadPool(2)
+    try:
+        parsed = validate_and_parse_message(data, signer.address, recovery_pool=recovery_pool)
+    finally:
+        recovery_pool.kill()
+
+    assert parsed == expected, "the order of the messages must be preserved"
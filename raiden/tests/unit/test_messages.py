@@ -26,6 +26,29 @@ def test_signature():
     assert ping.sender == ADDRESS
 
 
+def test_sender_is_recovered_once(monkeypatch):
+    recovered = []
+
+    def counting_recover(data, signature):
+        recovered.append(data)
+        return recover(data=data, signature=signature)
+
+    monkeypatch.setattr("raiden.messages.abstract.recover", counting_recover)
+
+    ping = Ping(nonce=0, current_protocol_version=0, signature=EMPTY_SIGNATURE)
+    ping.sign(signer)
+    assert ping.sender == ADDRESS
+    assert ping.sender == ADDRESS
+    assert len(recovered) == 1
+
+    # Changing a signed field invalidates the cached sender
+    ping.nonce = 1
+    assert ping.sender != ADDRESS
+    ping.sign(signer)
+    assert ping.sender == ADDRESS
+    assert len(recovered) == 3
+
+
 def test_request_monitoring() -> None:
     properties = factories.BalanceProofSignedStateProperties(pkey=PARTNER_PRIVKEY)
     balance_proof = factories.create(properties)
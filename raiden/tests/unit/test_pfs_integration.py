@@ -25,6 +25,7 @@
 from raiden.routing import get_best_routes
 from raiden.tests.utils import factories
 from raiden.tests.utils.mocks import mocked_failed_response, mocked_json_response
+from raiden.transfer.graph import ChannelGraph
 from raiden.transfer.state import NettingChannelState, NetworkState, TokenNetworkState
 from raiden.utils import typing
 from raiden.utils.formatting import to_checksum_address
@@ -676,6 +677,29 @@ def test_routing_in_direct_channel(happy_path_fixture, our_address, one_to_n_add
         assert pfs_request.called
 
 
+def test_routing_with_pfs_skips_local_routes(happy_path_fixture, our_address, one_to_n_address):
+    addresses, chain_state, _, _, token_network_state = happy_path_fixture
+    _, _, _, address4 = addresses
+
+    with patch("raiden.routing.get_best_routes_pfs") as pfs_request:
+        pfs_request.return_value = None, [], "feedback_token"
+        with patch.object(ChannelGraph, "shortest_paths_to") as local_routes:
+            get_best_routes(
+                chain_state=chain_state,
+                token_network_address=token_network_state.address,
+                one_to_n_address=one_to_n_address,
+                from_address=our_address,
+                to_address=address4,
+                amount=PaymentAmount(50),
+                previous_address=None,
+                pfs_config=PFS_CONFIG,
+                privkey=PRIVKEY,
+            )
+
+        assert pfs_request.called
+        assert not local_routes.called
+
+
 @pytest.fixture
 def query_paths_args(
     chain_id, token_network_state, one_to_n_address, our_address
@@ -1,8 +1,15 @@
+import json
+
 import pytest
+from gevent.pywsgi import WSGIServer
+from web3 import HTTPProvider, Web3
 
 from raiden.constants import EthClient
+from raiden.network.rpc.client import batch_request
+from raiden.network.rpc.middleware import BlockHeaderCache, EthCallCache
 from raiden.network.rpc.smartcontract_proxy import ClientErrorInspectResult, inspect_client_error
 from raiden.network.rpc.transactions import check_transaction_threw
+from raiden.tests.utils.factories import make_block_hash
 
 
 def test_inspect_client_error():
@@ -21,3 +28,170 @@ def test_check_transaction_threw_old_status():
     """Test that an assertion is thrown if transaction receipt is pre-Byzantium"""
     with pytest.raises(AssertionError):
         check_transaction_threw({"this": "is", "a": "receipt", "without": "status"})
+
+
+def test_block_header_cache():
+    chain = {number: make_block_hash() for number in range(20)}
+    requests = list()
+
+    def make_request(method, params):
+        requests.append((method, params[0]))
+        if method == "eth_getBlockByHash":
+            number = next(
+                number for number, block_hash in chain.items() if block_hash == params[0]
+            )
+        else:
+            number = max(chain) if params[0] == "latest" else params[0]
+        block = {"number": number, "hash": chain[number], "parentHash": chain.get(number - 1)}
+        return {"jsonrpc": "2.0", "id": 1, "result": block}
+
+    cache = BlockHeaderCache(reorg_depth=5)
+    get_block = cache(make_request, web3=None)
+
+    def get_hash(method, block_identifier):
+        return get_block(method, [block_identifier, False])["result"]["hash"]
+
+    assert get_hash("eth_getBlockByNumber", "latest") == chain[19]
+    assert get_hash("eth_getBlockByNumber", 12) == chain[12]
+    assert len(requests) == 2
+
+    # Confirmed heights are served by number, all blocks are served by hash
+    assert get_hash("eth_getBlockByNumber", 12) == chain[12]
+    assert get_hash("eth_getBlockByHash", chain[19]) == chain[19]
+    assert len(requests) == 2
+    assert cache.rpc_calls_saved == 2
+
+    # Unconfirmed heights and the latest block are always fetched
+    get_hash("eth_getBlockByNumber", 15)
+    get_hash("eth_getBlockByNumber", "latest")
+    assert len(requests) == 4
+
+    # A reorg drops the unconfirmed heights, and they are fetched again once
+    # confirmed
+    chain[15] = make_block_hash()
+    for number in range(16, 25):
+        chain[number] = make_block_hash()
+        get_hash("eth_getBlockByNumber", "latest")
+    assert cache.invalidations == 1
+
+    assert get_hash("eth_getBlockByNumber", 15) == chain[15]
+    assert requests[-1] == ("eth_getBlockByNumber", 15)
+    assert get_hash("eth_getBlockByNumber", 12) == chain[12]
+    assert requests[-1] == ("eth_getBlockByNumber", 15)
+
+
+def test_block_header_cache_observes_the_pushed_heads():
+    chain = {number: make_block_hash() for number in range(20)}
+    requests = list()
+
+    def make_request(method, params):
+        requests.append((method, params[0]))
+        number = params[0]
+        block = {"number": number, "hash": chain[number], "parentHash": chain.get(number - 1)}
+        return {"jsonrpc": "2.0", "id": 1, "result": block}
+
+    cache = BlockHeaderCache(reorg_depth=5)
+    get_block = cache(make_request, web3=None)
+
+    # The pushed heads are not cached, they confirm the cached blocks
+    cache.observe_latest(10, chain[10], chain[9])
+    assert cache.get_by_number(10) is None
+    assert get_block("eth_getBlockByNumber", [5, False])["result"]["hash"] == chain[5]
+    get_block("eth_getBlockByNumber", [9, False])
+    assert len(requests) == 2
+
+    for number in range(11, 15):
+        cache.observe_latest(number, chain[number], chain[number - 1])
+    assert cache.latest_block_number == 14
+    assert get_block("eth_getBlockByNumber", [9, False])["result"]["hash"] == chain[9]
+    assert len(requests) == 2
+
+    # A pushed head which does not match the cached blocks drops the
+    # unconfirmed heights
+    get_block("eth_getBlockByNumber", [12, False])
+    chain[12] = make_block_hash()
+    cache.observe_latest(12, chain[12], chain[11])
+    assert cache.invalidations == 1
+    cache.observe_latest(17, chain[17], chain[16])
+    assert get_block("eth_getBlockByNumber", [12, False])["result"]["hash"] == chain[12]
+
+
+def test_eth_call_cache():
+    block_header_cache = BlockHeaderCache(reorg_depth=5)
+    block_header_cache.latest_block_number = 20
+    requests = list()
+
+    def make_request(method, params):
+        requests.append((method, params))
+        if method == "eth_call" and params[0]["data"] == "0xfail":
+            return {"jsonrpc": "2.0", "id": 1, "error": {"code": -32000, "message": "reverted"}}
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x" + "00" * 32}
+
+    cache = EthCallCache(block_header_cache)
+    eth_call = cache(make_request, web3=None)
+    transaction = {"to": "0x" + "11" * 20, "data": "0x12345678"}
+
+    # The calls at confirmed blocks are sent once
+    assert eth_call("eth_call", [transaction, 15]) == eth_call("eth_call", [transaction, 15])
+    eth_call("eth_call", [dict(transaction, data="0x87654321"), 15])
+    assert len(requests) == 2
+    assert cache.hits["0x12345678"] == 1
+    assert cache.misses["0x12345678"] == 1
+    assert cache.rpc_calls_saved == 1
+
+    # The calls at unconfirmed blocks, at `latest` and the errors are not
+    # cached
+    for block_identifier in (16, "latest"):
+        eth_call("eth_call", [transaction, block_identifier])
+        eth_call("eth_call", [transaction, block_identifier])
+    eth_call("eth_call", [dict(transaction, data="0xfail"), 15])
+    eth_call("eth_call", [dict(transaction, data="0xfail"), 15])
+    assert len(requests) == 8
+
+    # Other requests are not affected
+    eth_call("eth_blockNumber", [])
+    assert requests[-1] == ("eth_blockNumber", [])
+    assert cache.rpc_calls_saved == 1
+
+
+def test_batch_request():
+    """ The requests are sent with a single HTTP request, and the responses are
+    returned in the order of the requests.
+    """
+    batches = list()
+
+    def application(environ, start_response):
+        batch = json.loads(environ["wsgi.input"].read())
+        batches.append(batch)
+
+        responses = list()
+        for request in reversed(batch):
+            response = {"jsonrpc": "2.0", "id": request["id"]}
+            if request["method"] == "net_version":
+                response["result"] = "627"
+            else:
+                response["error"] = {"code": -32601, "message": "Method not found"}
+            responses.append(response)
+
+        start_response("200 OK", [("Content-Type", "application/json")])
+        return [json.dumps(responses).encode()]
+
+    server = WSGIServer(("127.0.0.1", 0), application, log=None)
+    server.start()
+    try:
+        web3 = Web3(HTTPProvider(f"http://127.0.0.1:{server.server_port}"))
+        responses = batch_request(
+            web3, [("net_version", []), ("eth_unknown", [1]), ("net_version", [])]
+        )
+    finally:
+        server.stop()
+
+    assert len(batches) == 1
+    assert [request["method"] for request in batches[0]] == [
+        "net_version",
+        "eth_unknown",
+        "net_version",
+    ]
+    assert responses[0]["result"] == "627"
+    assert responses[1]["error"]["code"] == -32601
+    assert responses[2]["result"] == "627"
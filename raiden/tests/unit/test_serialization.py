@@ -1,5 +1,6 @@
 import json
 import random
+from copy import deepcopy
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -14,9 +15,12 @@
 from raiden.messages.transfers import RevealSecret, SecretRequest
 from raiden.messages.withdraw import WithdrawConfirmation, WithdrawExpired, WithdrawRequest
 from raiden.storage.serialization import JSONSerializer
-from raiden.storage.serialization.serializer import MessageSerializer
+from raiden.storage.serialization.cache import class_type
+from raiden.storage.serialization.codec import MessageCodec
+from raiden.storage.serialization.serializer import DictSerializer, MessageSerializer
 from raiden.tests.utils import factories
 from raiden.transfer import state, state_change
+from raiden.transfer.graph import ChannelGraph
 
 
 @dataclass
@@ -24,6 +28,11 @@ class ClassWithGraphObject:
     graph: Graph
 
 
+@dataclass
+class ClassWithChannelGraphObject:
+    graph: ChannelGraph
+
+
 @dataclass
 class ClassWithInt:
     value: int
@@ -89,6 +98,30 @@ def test_serialization_networkx_graph():
     assert instance.graph.edges == restored_instance.graph.edges
 
 
+def test_serialization_channel_graph():
+    p1 = to_canonical_address("0x5522070585a1a275631ba69c444ac0451AA9Fe4C")
+    p2 = to_canonical_address("0x5522070585a1a275631ba69c444ac0451AA9Fe4D")
+    p3 = to_canonical_address("0x5522070585a1a275631ba69c444ac0451AA9Fe4E")
+    p4 = to_canonical_address("0x5522070585a1a275631ba69c444ac0451AA9Fe4F")
+
+    e = [(p1, p2), (p2, p3), (p3, p4)]
+    instance = ClassWithChannelGraphObject(ChannelGraph(e))
+
+    data = JSONSerializer.serialize(instance)
+    restored_instance = JSONSerializer.deserialize(data)
+
+    assert instance.graph == restored_instance.graph
+
+    # Snapshots written with a networkx graph must be restorable
+    networkx_data = JSONSerializer.serialize(ClassWithGraphObject(Graph(e)))
+    networkx_data = networkx_data.replace(
+        ClassWithGraphObject.__name__, ClassWithChannelGraphObject.__name__
+    )
+    restored_instance = JSONSerializer.deserialize(networkx_data)
+
+    assert instance.graph == restored_instance.graph
+
+
 def test_actioninitchain_restore():
     """ ActionInitChain *must* restore the previous pseudo random generator
     state.
@@ -143,7 +176,7 @@ def test_chainstate_restore():
     assert original_obj == decoded_obj
 
 
-def test_encoding_and_decoding():
+def make_messages():
     message_factories = (
         factories.LockedTransferProperties(),
         factories.RefundTransferProperties(),
@@ -256,7 +289,73 @@ def test_encoding_and_decoding():
         )
     )
 
-    for message in messages:
+    return messages
+
+
+def test_encoding_and_decoding():
+    for message in make_messages():
         serialized = MessageSerializer.serialize(message)
         deserialized = MessageSerializer.deserialize(serialized)
         assert deserialized == message
+
+
+def test_message_codec_matches_schemas():
+    """ The codec must create the same format as the schemas and both must
+    read the format of the other.
+    """
+    encoded_types = set()
+    for message in make_messages():
+        codec_data = MessageCodec.encode(message)
+        if codec_data is None:
+            continue
+        encoded_types.add(codec_data["type"])
+
+        schema_data = DictSerializer.serialize(message)
+        schema_data["type"] = schema_data.pop("_type").split(".")[-1]
+        assert codec_data == schema_data
+
+        klass = type(message)
+        codec_data.pop("type")
+        from_codec = MessageCodec.decode(klass, deepcopy(codec_data))
+        codec_data["_type"] = class_type(message)
+        from_schema = DictSerializer.deserialize(codec_data)
+        assert from_codec == from_schema == message
+        assert MessageCodec.encode(from_schema) == MessageCodec.encode(from_codec)
+
+    assert encoded_types == {
+        "Delivered",
+        "LockedTransfer",
+        "LockExpired",
+        "PFSCapacityUpdate",
+        "Processed",
+        "RefundTransfer",
+        "RevealSecret",
+        "SecretRequest",
+        "Unlock",
+        "WithdrawConfirmation",
+        "WithdrawExpired",
+        "WithdrawRequest",
+    }
+
+
+def test_message_codec_leaves_non_canonical_input_to_schemas():
+    message = Processed(
+        message_identifier=factories.make_message_identifier(),
+        signature=factories.make_signature(),
+    )
+    data = MessageCodec.encode(message)
+    data.pop("type")
+
+    non_canonical = dict(data, message_identifier=int(data["message_identifier"]))
+    non_canonical["signature"] = non_canonical["signature"][2:]
+    assert MessageCodec.decode(Processed, non_canonical) is None
+    non_canonical["type"] = "Processed"
+    assert MessageSerializer.deserialize(json.dumps(non_canonical)) == message
+
+    with_additional_key = dict(data, type="Processed", additional_key="1")
+    with pytest.raises(SerializationError):
+        MessageSerializer.deserialize(json.dumps(with_additional_key))
+
+    invalid_hex = dict(data, type="Processed", signature="0xzz")
+    with pytest.raises(SerializationError):
+        MessageSerializer.deserialize(json.dumps(invalid_hex))
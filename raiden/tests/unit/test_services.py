@@ -0,0 +1,94 @@
+from unittest.mock import Mock
+
+import gevent
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from raiden import services
+from raiden.constants import RoutingMode
+from raiden.messages.path_finding_service import PFSCapacityUpdate
+from raiden.raiden_service import RaidenService
+from raiden.services import PFSUpdateDebouncer
+from raiden.tests.utils import factories
+from raiden.tests.utils.mocks import MockRaidenService
+from raiden.transfer import views
+from raiden.utils.typing import BlockNumber
+
+
+class PendingGreenlets:  # pylint: disable=too-few-public-methods
+    """ Stands in for the `RaidenService` of the debouncer. """
+
+    routing_mode = RoutingMode.PFS
+
+    def __init__(self):
+        self.greenlets = list()
+
+    def add_pending_greenlet(self, greenlet):
+        self.greenlets.append(greenlet)
+
+
+def test_pfs_update_debouncer(monkeypatch):
+    channel_state = factories.create(factories.NettingChannelStateProperties())
+    canonical_identifier = channel_state.canonical_identifier
+
+    sent_updates = list()
+
+    def send_pfs_update(raiden, canonical_identifier, update_fee_schedule=False):
+        # pylint: disable=unused-argument
+        capacity_update = PFSCapacityUpdate.from_channel_state(channel_state)
+        sent_updates.append((capacity_update.updating_capacity, update_fee_schedule))
+        return capacity_update
+
+    monkeypatch.setattr(services, "send_pfs_update", send_pfs_update)
+    monkeypatch.setattr(views, "state_from_raiden", lambda raiden: None)
+    monkeypatch.setattr(
+        views, "get_channelstate_by_canonical_identifier", lambda **kwargs: channel_state
+    )
+
+    debouncer = PFSUpdateDebouncer(PendingGreenlets(), flush_interval=0.05)
+
+    # The first update of a channel is sent immediately
+    debouncer.schedule(canonical_identifier)
+    assert sent_updates == [(100, False)]
+
+    # Increases are coalesced, the latest capacity is sent
+    channel_state.our_state.contract_balance = 150
+    debouncer.schedule(canonical_identifier)
+    channel_state.our_state.contract_balance = 200
+    debouncer.schedule(canonical_identifier, update_fee_schedule=True)
+    assert len(sent_updates) == 1
+
+    gevent.sleep(0.1)
+    assert sent_updates == [(100, False), (200, True)]
+    assert not debouncer.flush_timers
+
+    # A decrease is sent immediately, together with the pending updates
+    channel_state.our_state.contract_balance = 250
+    debouncer.schedule(canonical_identifier, update_fee_schedule=True)
+    channel_state.our_state.contract_balance = 50
+    debouncer.schedule(canonical_identifier)
+    assert sent_updates[-1] == (50, True)
+    assert not debouncer.flush_timers
+
+    # Pending updates are dropped on stop
+    channel_state.our_state.contract_balance = 300
+    debouncer.schedule(canonical_identifier)
+    debouncer.stop()
+    gevent.sleep(0.1)
+    assert sent_updates[-1] == (50, True)
+    assert len(sent_updates) == 3
+
+
+def test_refresh_user_deposit_balance_survives_rpc_errors():
+    raiden = MockRaidenService()
+    raiden.config.services.monitoring_enabled = True
+    raiden.user_deposit = Mock()
+    raiden.user_deposit.refresh_effective_balance.side_effect = [
+        RequestsConnectionError("connection refused"),
+        ValueError({"code": -32000, "message": "header not found"}),
+        100,
+    ]
+
+    for block_number in range(3):
+        RaidenService._refresh_user_deposit_balance(raiden, BlockNumber(block_number))
+
+    assert raiden.user_deposit.refresh_effective_balance.call_count == 3
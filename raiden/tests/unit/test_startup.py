@@ -11,6 +11,7 @@
 from raiden.settings import RaidenConfig, ServiceConfig
 from raiden.tests.utils.factories import make_address
 from raiden.tests.utils.mocks import MockProxyManager, MockWeb3
+from raiden.ui import checks
 from raiden.ui.checks import check_ethereum_network_id
 from raiden.ui.startup import (
     load_deployed_contracts_data,
@@ -62,6 +63,26 @@ def test_setup_does_not_raise_with_matching_ids(netid):
     check_ethereum_network_id(netid, MockWeb3(netid))
 
 
+def test_check_ethereum_client_and_network_id_falls_back_without_batches(monkeypatch):
+    """ The checks are done one by one if the node does not support batches. """
+
+    def batch_request(web3, requests):  # pylint: disable=unused-argument
+        raise ValueError({"code": -32600, "message": "batch requests are not supported"})
+
+    monkeypatch.setattr(checks, "batch_request", batch_request)
+    web3 = MockWeb3(68)
+    web3.version.node = "Geth/v1.9.0-stable-52f24617/linux-amd64/go1.12.7"
+
+    checks.check_ethereum_client_and_network_id(web3, ChainID(68))
+
+    with pytest.raises(RaidenError):
+        checks.check_ethereum_client_and_network_id(web3, ChainID(61))
+
+    web3.version.node = "Geth/v1.7.3-unstable-e9295163/linux-amd64/go1.9.1"
+    with pytest.raises(RaidenError):
+        checks.check_ethereum_client_and_network_id(web3, ChainID(68))
+
+
 def raiden_contracts_in_data(contracts: Dict[str, Any]) -> bool:
     return CONTRACT_SECRET_REGISTRY in contracts and CONTRACT_TOKEN_NETWORK_REGISTRY in contracts
 
@@ -5,7 +5,7 @@
 import pytest
 
 from raiden.constants import LOCKSROOT_OF_NO_LOCKS
-from raiden.routing import get_best_routes
+from raiden.routing import LocalRoutingEngine, get_best_routes
 from raiden.settings import INTERNAL_ROUTING_DEFAULT_FEE_PERC
 from raiden.tests.utils import factories
 from raiden.tests.utils.transfer import make_receive_transfer_mediated
@@ -13,6 +13,7 @@
 from raiden.transfer.channel import compute_locksroot
 from raiden.transfer.mediated_transfer.state_change import ActionInitMediator, ActionInitTarget
 from raiden.transfer.state import (
+    ChannelState,
     HashTimeLockState,
     NetworkState,
     PendingLocksState,
@@ -30,6 +31,7 @@
     ContractReceiveRouteNew,
 )
 from raiden.utils.signing import sha3
+from raiden.utils.typing import TokenAmount
 
 
 @pytest.fixture
@@ -176,6 +178,80 @@ def test_channel_settle_must_properly_cleanup(channel_properties):
     assert channel_state.identifier not in ids_to_channels
 
 
+def test_channel_status_index_follows_transitions(channel_properties):
+    pseudo_random_generator = random.Random()
+    block_number = 10
+    block_hash = factories.make_block_hash()
+
+    token_network_address = factories.make_address()
+    token_network_state = TokenNetworkState(
+        address=token_network_address,
+        token_address=factories.make_address(),
+        network_graph=TokenNetworkGraphState(token_network_address),
+    )
+    assert token_network.get_channel_status_index(token_network_state) == {}
+
+    properties, _ = channel_properties
+    channel_state = factories.create(properties)
+    channel_identifier = channel_state.identifier
+
+    def dispatch(state_change):
+        token_network.state_transition(
+            token_network_state=token_network_state,
+            state_change=state_change,
+            block_number=block_number,
+            block_hash=block_hash,
+            pseudo_random_generator=pseudo_random_generator,
+        )
+        return {
+            status: channel_identifiers
+            for status, channel_identifiers in token_network.get_channel_status_index(
+                token_network_state
+            ).items()
+            if channel_identifiers
+        }
+
+    index = dispatch(
+        ContractReceiveChannelNew(
+            transaction_hash=factories.make_transaction_hash(),
+            channel_state=channel_state,
+            block_number=block_number,
+            block_hash=block_hash,
+        )
+    )
+    assert index == {ChannelState.STATE_OPENED: {channel_identifier}}
+
+    index = dispatch(
+        ContractReceiveChannelClosed(
+            transaction_hash=factories.make_transaction_hash(),
+            transaction_from=channel_state.partner_state.address,
+            canonical_identifier=channel_state.canonical_identifier,
+            block_number=block_number,
+            block_hash=block_hash,
+        )
+    )
+    assert index == {ChannelState.STATE_CLOSED: {channel_identifier}}
+
+    # The index is not serialized, it must be the same after it is rebuilt
+    restored_state = copy.deepcopy(token_network_state)
+    restored_state.channelstatuses_to_channelidentifiers = None
+    assert token_network.get_channel_status_index(restored_state) == {
+        ChannelState.STATE_CLOSED: {channel_identifier}
+    }
+
+    index = dispatch(
+        ContractReceiveChannelSettled(
+            transaction_hash=factories.make_transaction_hash(),
+            canonical_identifier=channel_state.canonical_identifier,
+            block_number=block_number + channel_state.settle_timeout + 1,
+            block_hash=factories.make_block_hash(),
+            our_onchain_locksroot=LOCKSROOT_OF_NO_LOCKS,
+            partner_onchain_locksroot=LOCKSROOT_OF_NO_LOCKS,
+        )
+    )
+    assert index == {}
+
+
 def test_channel_data_removed_after_unlock(
     chain_state, token_network_state, our_address, channel_properties
 ):
@@ -574,8 +650,8 @@ def test_routing_updates(token_network_state, our_address, channel_properties):
     graph_state = channel_new_iteration1.new_state.network_graph
     assert channel_state.identifier in graph_state.channel_identifier_to_participants
     assert len(graph_state.channel_identifier_to_participants) == 1
-    assert graph_state.network[our_address][address1] is not None
-    assert len(graph_state.network.edges()) == 1
+    assert graph_state.network.has_edge(our_address, address1)
+    assert graph_state.network.number_of_edges() == 1
 
     # create a new channel without being participant, check graph update
     new_channel_identifier = factories.make_channel_identifier()
@@ -603,9 +679,9 @@ def test_routing_updates(token_network_state, our_address, channel_properties):
     assert channel_state.identifier in graph_state.channel_identifier_to_participants
     assert new_channel_identifier in graph_state.channel_identifier_to_participants
     assert len(graph_state.channel_identifier_to_participants) == 2
-    assert graph_state.network[our_address][address1] is not None
-    assert graph_state.network[address2][address3] is not None
-    assert len(graph_state.network.edges()) == 2
+    assert graph_state.network.has_edge(our_address, address1)
+    assert graph_state.network.has_edge(address2, address3)
+    assert graph_state.network.number_of_edges() == 2
 
     # close the channel the node is a participant of, check edge is removed from graph
     closed_block_number = open_block_number + 20
@@ -649,8 +725,8 @@ def test_routing_updates(token_network_state, our_address, channel_properties):
     assert channel_state.identifier not in graph_state.channel_identifier_to_participants
     assert new_channel_identifier in graph_state.channel_identifier_to_participants
     assert len(graph_state.channel_identifier_to_participants) == 1
-    assert graph_state.network[address2][address3] is not None
-    assert len(graph_state.network.edges()) == 1
+    assert graph_state.network.has_edge(address2, address3)
+    assert graph_state.network.number_of_edges() == 1
 
     # close the channel the node is not a participant of, check edge is removed from graph
     channel_close_state_change3 = ContractReceiveRouteClosed(
@@ -697,7 +773,7 @@ def test_routing_updates(token_network_state, our_address, channel_properties):
     assert channel_state.identifier not in graph_state.channel_identifier_to_participants
     assert new_channel_identifier not in graph_state.channel_identifier_to_participants
     assert len(graph_state.channel_identifier_to_participants) == 0
-    assert len(graph_state.network.edges()) == 0
+    assert graph_state.network.number_of_edges() == 0
 
 
 def test_routing_issue2663(chain_state, token_network_state, one_to_n_address, our_address):
@@ -764,7 +840,7 @@ def test_routing_issue2663(chain_state, token_network_state, one_to_n_address, o
 
     graph_state = channel_new_iteration2.new_state.network_graph
     assert len(graph_state.channel_identifier_to_participants) == 2
-    assert len(graph_state.network.edges()) == 2
+    assert graph_state.network.number_of_edges() == 2
 
     # create new channels without being participant
     channel_new_state_change3 = ContractReceiveRouteNew(
@@ -788,7 +864,7 @@ def test_routing_issue2663(chain_state, token_network_state, one_to_n_address, o
 
     graph_state = channel_new_iteration3.new_state.network_graph
     assert len(graph_state.channel_identifier_to_participants) == 3
-    assert len(graph_state.network.edges()) == 3
+    assert graph_state.network.number_of_edges() == 3
 
     channel_new_state_change4 = ContractReceiveRouteNew(
         transaction_hash=factories.make_transaction_hash(),
@@ -810,7 +886,7 @@ def test_routing_issue2663(chain_state, token_network_state, one_to_n_address, o
 
     graph_state = channel_new_iteration4.new_state.network_graph
     assert len(graph_state.channel_identifier_to_participants) == 4
-    assert len(graph_state.network.edges()) == 4
+    assert graph_state.network.number_of_edges() == 4
 
     channel_new_state_change5 = ContractReceiveRouteNew(
         transaction_hash=factories.make_transaction_hash(),
@@ -832,7 +908,7 @@ def test_routing_issue2663(chain_state, token_network_state, one_to_n_address, o
 
     graph_state = channel_new_iteration5.new_state.network_graph
     assert len(graph_state.channel_identifier_to_participants) == 5
-    assert len(graph_state.network.edges()) == 5
+    assert graph_state.network.number_of_edges() == 5
 
     # test routing with all nodes available
     chain_state.nodeaddresses_to_networkstates = {
@@ -1170,7 +1246,7 @@ def test_internal_routing_mediation_fees(
 
     graph_state = route_new_iteration.new_state.network_graph
     assert len(graph_state.channel_identifier_to_participants) == 2
-    assert len(graph_state.network.edges()) == 2
+    assert graph_state.network.number_of_edges() == 2
 
     # test routing with all nodes available
     chain_state.nodeaddresses_to_networkstates = {
@@ -1206,3 +1282,147 @@ def test_internal_routing_mediation_fees(
     )
     assert routes, error_msg
     assert routes[0].estimated_fee == round(INTERNAL_ROUTING_DEFAULT_FEE_PERC * 50), error_msg
+
+
+def test_local_routing_engine(chain_state, token_network_state, one_to_n_address, our_address):
+    address1 = factories.make_address()
+    address2 = factories.make_address()
+    address3 = factories.make_address()
+
+    token_network_state, _ = factories.create_network(
+        token_network_state=token_network_state,
+        our_address=our_address,
+        routes=[
+            factories.RouteProperties(
+                address1=our_address, address2=address1, capacity1to2=TokenAmount(50)
+            ),
+            factories.RouteProperties(address1=address1, address2=address2, capacity1to2=0),
+        ],
+        block_number=10,
+    )
+    chain_state.nodeaddresses_to_networkstates = factories.make_node_availability_map(
+        [address1, address2, address3]
+    )
+    routing_engine = LocalRoutingEngine()
+
+    def best_routes(to_address, amount):
+        return get_best_routes(
+            chain_state=chain_state,
+            token_network_address=token_network_state.address,
+            one_to_n_address=one_to_n_address,
+            from_address=our_address,
+            to_address=to_address,
+            amount=amount,
+            previous_address=None,
+            pfs_config=None,
+            privkey=b"",
+            routing_engine=routing_engine,
+        )
+
+    _, routes, _ = best_routes(address2, 50)
+    assert [route.route for route in routes] == [[our_address, address1, address2]]
+    assert (routing_engine.hits, routing_engine.misses) == (0, 1)
+
+    _, routes, _ = best_routes(address2, 50)
+    assert [route.route for route in routes] == [[our_address, address1, address2]]
+    assert (routing_engine.hits, routing_engine.misses) == (1, 1)
+
+    # The capacity of our channel is checked on every query
+    error_msg, routes, _ = best_routes(address2, 60)
+    assert not routes
+    assert "1 don't have enough capacity" in error_msg
+    _, routes, _ = best_routes(address2, 10)
+    assert routes
+    assert (routing_engine.hits, routing_engine.misses) == (3, 1)
+
+    # Changes of the topology are picked up
+    _, routes, _ = best_routes(address3, 10)
+    assert not routes
+    assert (routing_engine.hits, routing_engine.misses) == (3, 2)
+
+    route_canonical_identifier = factories.make_canonical_identifier(
+        token_network_address=token_network_state.address
+    )
+    token_network.state_transition(
+        token_network_state=token_network_state,
+        state_change=ContractReceiveRouteNew(
+            transaction_hash=factories.make_transaction_hash(),
+            canonical_identifier=route_canonical_identifier,
+            participant1=address2,
+            participant2=address3,
+            block_number=11,
+            block_hash=factories.make_block_hash(),
+        ),
+        block_number=11,
+        block_hash=factories.make_block_hash(),
+        pseudo_random_generator=random.Random(),
+    )
+    _, routes, _ = best_routes(address3, 10)
+    assert [route.route for route in routes] == [[our_address, address1, address2, address3]]
+    assert (routing_engine.hits, routing_engine.misses) == (3, 3)
+
+    # The new channel does not affect the cached route to address2
+    _, routes, _ = best_routes(address2, 10)
+    assert [route.route for route in routes] == [[our_address, address1, address2]]
+    assert (routing_engine.hits, routing_engine.misses) == (4, 3)
+
+    # A closed channel invalidates the routes which use it
+    token_network.state_transition(
+        token_network_state=token_network_state,
+        state_change=ContractReceiveRouteClosed(
+            transaction_hash=factories.make_transaction_hash(),
+            canonical_identifier=route_canonical_identifier,
+            block_number=12,
+            block_hash=factories.make_block_hash(),
+        ),
+        block_number=12,
+        block_hash=factories.make_block_hash(),
+        pseudo_random_generator=random.Random(),
+    )
+    _, routes, _ = best_routes(address2, 10)
+    assert (routing_engine.hits, routing_engine.misses) == (5, 3)
+    _, routes, _ = best_routes(address3, 10)
+    assert not routes
+    assert (routing_engine.hits, routing_engine.misses) == (5, 4)
+
+
+def test_local_routing_engine_does_not_route_back_through_us(
+    chain_state, token_network_state, one_to_n_address, our_address
+):
+    address1 = factories.make_address()
+    address2 = factories.make_address()
+    target = factories.make_address()
+
+    # The shortest path from address1 to the target goes through us and the
+    # channel with address2, whose capacity would not be checked
+    token_network_state, _ = factories.create_network(
+        token_network_state=token_network_state,
+        our_address=our_address,
+        routes=[
+            factories.RouteProperties(
+                address1=our_address, address2=address1, capacity1to2=TokenAmount(50)
+            ),
+            factories.RouteProperties(address1=our_address, address2=address2, capacity1to2=0),
+            factories.RouteProperties(address1=address2, address2=target, capacity1to2=0),
+        ],
+        block_number=10,
+    )
+    chain_state.nodeaddresses_to_networkstates = factories.make_node_availability_map(
+        [address1, address2, target]
+    )
+
+    error_msg, routes, _ = get_best_routes(
+        chain_state=chain_state,
+        token_network_address=token_network_state.address,
+        one_to_n_address=one_to_n_address,
+        from_address=our_address,
+        to_address=target,
+        amount=10,
+        previous_address=None,
+        pfs_config=None,
+        privkey=b"",
+        routing_engine=LocalRoutingEngine(),
+    )
+    assert not routes
+    assert "1 don't have a route" in error_msg
+    assert "1 don't have enough capacity" in error_msg
@@ -1,10 +1,14 @@
+import pickle
+import random
+from copy import deepcopy
 from fractions import Fraction
-from typing import Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import pytest
 from hypothesis import HealthCheck, assume, example, given, settings
-from hypothesis.strategies import integers
+from hypothesis.strategies import booleans, integers, none, one_of
 
+from raiden.exceptions import UndefinedMediationFee
 from raiden.tests.unit.transfer.test_channel import make_hash_time_lock_state
 from raiden.tests.utils import factories
 from raiden.tests.utils.factories import (
@@ -15,15 +19,18 @@
     get_amount_with_fees,
     get_initial_amount_for_amount_after_fees,
 )
+from raiden.transfer.channel import get_balance
 from raiden.transfer.mediated_transfer.initiator import calculate_safe_amount_with_fee
 from raiden.transfer.mediated_transfer.mediation_fee import (
     NUM_DISCRETISATION_POINTS,
     FeeScheduleState,
     Interpolate,
+    MediationFeeCalculator,
+    MediationFeeCalculatorCache,
     calculate_imbalance_fees,
     linspace,
 )
-from raiden.transfer.mediated_transfer.mediator import get_amount_without_fees
+from raiden.transfer.mediated_transfer.mediator import find_intersection, get_amount_without_fees
 from raiden.transfer.state import NettingChannelState
 from raiden.utils.mediation_fees import ppm_fee_per_channel
 from raiden.utils.typing import (
@@ -641,3 +648,215 @@ def test_mfee4():
                 deposit - amount_with_margin + med_fee, deposit + amount_with_margin - med_fee
             )
         )
+
+
+def get_amount_without_fees_with_fractions(
+    amount_with_fees: PaymentWithFeeAmount,
+    channel_in: NettingChannelState,
+    channel_out: NettingChannelState,
+) -> Optional[PaymentWithFeeAmount]:
+    """ `get_amount_without_fees` implemented with `Fraction`s, used as reference """
+    balance_in = get_balance(channel_in.our_state, channel_in.partner_state)
+    balance_out = get_balance(channel_out.our_state, channel_out.partner_state)
+    receivable = TokenAmount(
+        channel_in.our_total_deposit + channel_in.partner_total_deposit - balance_in
+    )
+    try:
+        fee_func = FeeScheduleState.mediation_fee_func(
+            schedule_in=channel_in.fee_schedule,
+            schedule_out=channel_out.fee_schedule,
+            balance_in=balance_in,
+            balance_out=balance_out,
+            receivable=receivable,
+            amount_with_fees=amount_with_fees,
+            cap_fees=channel_in.fee_schedule.cap_fees,
+        )
+        amount_without_fees = find_intersection(
+            fee_func, lambda i: amount_with_fees - fee_func.x_list[i]
+        )
+    except UndefinedMediationFee:
+        return None
+
+    if amount_without_fees is None or amount_without_fees <= 0:
+        return None
+
+    return PaymentWithFeeAmount(int(round(amount_without_fees)))
+
+
+def make_imbalance_penalty(seed: int, capacity: int) -> List[Tuple[TokenAmount, FeeAmount]]:
+    """ Penalty function with irregular intervals, which is not convex """
+    rng = random.Random(seed)
+    x_values = sorted(set([0, capacity] + [rng.randint(0, capacity) for _ in range(5)]))
+    return [(TokenAmount(x), FeeAmount(rng.randint(0, max(capacity // 10, 1)))) for x in x_values]
+
+
+@example(
+    flat_fee=0,
+    prop_fee=0,
+    imbalance_fee=1277,
+    penalty_seed=None,
+    cap_fees=True,
+    amount=1,
+    balance1=33,
+    balance2=481,
+)
+@example(
+    flat_fee=0,
+    prop_fee=0,
+    imbalance_fee=0,
+    penalty_seed=0,
+    cap_fees=False,
+    amount=336,
+    balance1=366,
+    balance2=367,
+)
+@given(
+    flat_fee=integers(min_value=0, max_value=100),
+    prop_fee=integers(min_value=0, max_value=10_000),
+    imbalance_fee=integers(min_value=0, max_value=50_000),
+    penalty_seed=one_of(none(), integers()),
+    cap_fees=booleans(),
+    amount=integers(min_value=1, max_value=1_000),
+    balance1=integers(min_value=0, max_value=1_000),
+    balance2=integers(min_value=0, max_value=1_000),
+)
+@settings(max_examples=500)
+def test_mediation_fee_calculator_matches_fractions(
+    flat_fee, prop_fee, imbalance_fee, penalty_seed, cap_fees, amount, balance1, balance2
+):
+    """ The integer arithmetic must give exactly the same amounts as the
+    `Fraction` based implementation, including the rounding.
+    """
+    total_balance = TokenAmount(1_000)
+    if penalty_seed is None:
+        imbalance_penalty = calculate_imbalance_fees(
+            channel_capacity=total_balance,
+            proportional_imbalance_fee=ProportionalFeeAmount(imbalance_fee),
+        )
+    else:
+        imbalance_penalty = make_imbalance_penalty(penalty_seed, total_balance)
+
+    fee_schedule = FeeScheduleState(
+        cap_fees=cap_fees,
+        flat=FeeAmount(flat_fee),
+        proportional=ppm_fee_per_channel(ProportionalFeeAmount(prop_fee)),
+        imbalance_penalty=imbalance_penalty,
+    )
+    channel_in = factories.create(
+        NettingChannelStateProperties(
+            our_state=NettingChannelEndStateProperties(balance=total_balance - balance1),
+            partner_state=NettingChannelEndStateProperties(balance=balance1),
+            fee_schedule=fee_schedule,
+        )
+    )
+    channel_out = factories.create(
+        NettingChannelStateProperties(
+            our_state=NettingChannelEndStateProperties(balance=balance2),
+            partner_state=NettingChannelEndStateProperties(balance=total_balance - balance2),
+            fee_schedule=fee_schedule,
+        )
+    )
+
+    amount_with_fees = PaymentWithFeeAmount(amount)
+    assert get_amount_without_fees(
+        amount_with_fees=amount_with_fees, channel_in=channel_in, channel_out=channel_out
+    ) == get_amount_without_fees_with_fractions(
+        amount_with_fees=amount_with_fees, channel_in=channel_in, channel_out=channel_out
+    )
+
+
+def test_mediation_fee_calculator_batch():
+    imbalance_penalty = calculate_imbalance_fees(
+        channel_capacity=TokenAmount(1_000),
+        proportional_imbalance_fee=ProportionalFeeAmount(20_000),
+    )
+    fee_schedule = FeeScheduleState(
+        flat=FeeAmount(2),
+        proportional=ProportionalFeeAmount(3_000),
+        imbalance_penalty=imbalance_penalty,
+    )
+    calculator = MediationFeeCalculator(
+        schedule_in=fee_schedule,
+        schedule_out=fee_schedule,
+        balance_in=Balance(300),
+        balance_out=Balance(600),
+        receivable=TokenAmount(700),
+        cap_fees=True,
+    )
+
+    amounts = [PaymentWithFeeAmount(amount) for amount in range(1, 1_000, 7)]
+    batch = calculator.amounts_without_fees(amounts)
+    assert batch == [calculator.amount_without_fees(amount) for amount in amounts]
+    assert any(amount is None for amount in batch), "the large amounts lack capacity"
+    assert any(amount is not None for amount in batch)
+
+    with pytest.raises(UndefinedMediationFee):
+        MediationFeeCalculator(
+            schedule_in=fee_schedule,
+            schedule_out=fee_schedule,
+            balance_in=Balance(300),
+            balance_out=Balance(0),
+            receivable=TokenAmount(700),
+            cap_fees=True,
+        )
+
+
+def test_mediation_fee_calculator_cache():
+    cache = MediationFeeCalculatorCache(size=2)
+    fee_schedule = FeeScheduleState(
+        flat=FeeAmount(2),
+        proportional=ProportionalFeeAmount(3_000),
+        imbalance_penalty=calculate_imbalance_fees(
+            channel_capacity=TokenAmount(1_000),
+            proportional_imbalance_fee=ProportionalFeeAmount(20_000),
+        ),
+    )
+    arguments: Dict[str, Any] = dict(
+        schedule_in=fee_schedule,
+        schedule_out=fee_schedule,
+        balance_in=Balance(300),
+        balance_out=Balance(600),
+        receivable=TokenAmount(700),
+        cap_fees=True,
+    )
+
+    calculator = cache.get(**arguments)
+    assert cache.get(**arguments) is calculator
+    assert (cache.hits, cache.misses, cache.hit_rate) == (1, 1, 0.5)
+
+    # A copy of the state, e.g. after a dispatch, uses the same entry
+    assert cache.get(**dict(arguments, schedule_in=deepcopy(fee_schedule))) is calculator
+
+    # Balance and fee schedule changes result in new entries
+    assert cache.get(**dict(arguments, balance_out=Balance(599))) is not calculator
+    changed_schedule = FeeScheduleState(
+        flat=FeeAmount(3),
+        proportional=fee_schedule.proportional,
+        imbalance_penalty=fee_schedule.imbalance_penalty,
+    )
+    assert cache.get(**dict(arguments, schedule_out=changed_schedule)) is not calculator
+    assert (cache.hits, cache.misses) == (2, 3)
+    assert len(cache.cache) == 2
+
+
+def test_imbalance_penalty_curves_are_shared():
+    arguments: Dict[str, Any] = dict(
+        channel_capacity=TokenAmount(1_000),
+        proportional_imbalance_fee=ProportionalFeeAmount(20_000),
+    )
+    imbalance_penalty = calculate_imbalance_fees(**arguments)
+    other_imbalance_penalty = calculate_imbalance_fees(**arguments)
+    assert imbalance_penalty == other_imbalance_penalty
+    assert imbalance_penalty is not other_imbalance_penalty, "callers may modify the list"
+
+    fee_schedule = FeeScheduleState(imbalance_penalty=imbalance_penalty)
+    other_fee_schedule = FeeScheduleState(imbalance_penalty=other_imbalance_penalty)
+    assert fee_schedule._penalty_func is other_fee_schedule._penalty_func
+
+    # Copies of the state rebuild the penalty function from the shared cache
+    for fee_schedule_copy in (deepcopy(fee_schedule), pickle.loads(pickle.dumps(fee_schedule))):
+        assert fee_schedule_copy == fee_schedule
+        assert fee_schedule_copy._penalty_func is fee_schedule._penalty_func
+        assert fee_schedule_copy.fee(Balance(100), Fraction(50)) == fee_schedule.fee(
+            Balance(100), Fraction(50)
+        )
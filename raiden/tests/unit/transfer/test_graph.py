@@ -0,0 +1,116 @@
+import pickle
+import random
+
+import networkx
+import pytest
+
+from raiden.tests.utils import factories
+from raiden.transfer.graph import ChannelGraph
+
+
+def test_channel_graph_edges():
+    a, b, c = (factories.make_address() for _ in range(3))
+
+    graph = ChannelGraph([(a, b), (b, c)])
+    assert len(graph) == 3
+    assert graph.number_of_edges() == 2
+    assert graph.has_edge(a, b)
+    assert graph.has_edge(b, a)
+    assert not graph.has_edge(a, c)
+    assert sorted(graph.neighbors(b)) == sorted([a, c])
+
+    # Adding an existing channel is a no-op
+    graph.add_edge(b, a)
+    assert graph.number_of_edges() == 2
+    assert len(list(graph.edges())) == 2
+
+    graph.remove_edge(b, a)
+    assert graph.number_of_edges() == 1
+    assert not graph.has_edge(a, b)
+    assert graph.neighbors(a) == []
+    assert a in graph, "nodes are not removed with their last channel"
+
+    with pytest.raises(KeyError):
+        graph.remove_edge(a, b)
+
+    with pytest.raises(KeyError):
+        graph.neighbors(factories.make_address())
+
+
+def test_channel_graph_equality_and_copy():
+    a, b, c = (factories.make_address() for _ in range(3))
+
+    graph = ChannelGraph([(a, b), (b, c)])
+    assert graph == ChannelGraph([(c, b), (b, a)])
+    assert graph != ChannelGraph([(a, b)])
+
+    copy = pickle.loads(pickle.dumps(graph))
+    assert copy == graph
+
+    copy.add_edge(a, c)
+    assert not graph.has_edge(a, c)
+
+
+def test_channel_graph_shortest_path():
+    a, b, c, d, e = (factories.make_address() for _ in range(5))
+
+    graph = ChannelGraph([(a, b), (b, c), (c, d), (a, d)])
+    graph.add_node(e)
+
+    assert graph.shortest_path(a, a) == [a]
+    assert graph.shortest_path(a, b) == [a, b]
+    assert graph.shortest_path(a, c) in ([a, b, c], [a, d, c])
+    assert graph.shortest_path(a, e) is None
+    assert graph.shortest_path(a, factories.make_address()) is None
+
+    assert graph.bfs_distances(a) == {a: 0, b: 1, d: 1, c: 2}
+    assert graph.bfs_distances(factories.make_address()) == {}
+
+
+def test_channel_graph_shortest_paths_to():
+    a, b, c, d, e = (factories.make_address() for _ in range(5))
+
+    graph = ChannelGraph([(a, b), (b, c), (c, d)])
+    graph.add_node(e)
+
+    paths = graph.shortest_paths_to(d, [a, b, d, e, factories.make_address()])
+    assert paths == {a: [a, b, c, d], b: [b, c, d], d: [d]}
+
+    for source, path in paths.items():
+        assert len(path) == len(graph.shortest_path(source, d))
+
+    assert graph.shortest_paths_to(factories.make_address(), [a]) == {}
+
+    # The excluded nodes are not used, even if this makes the path longer
+    graph.add_edge(a, e)
+    graph.add_edge(e, d)
+    assert graph.shortest_paths_to(d, [a, b], excluded=[e]) == {a: [a, b, c, d], b: [b, c, d]}
+    assert graph.shortest_paths_to(d, [a, b], excluded=[c]) == {a: [a, e, d], b: [b, a, e, d]}
+    assert graph.shortest_paths_to(d, [a, b], excluded=[a, c]) == {}
+    assert graph.shortest_paths_to(d, [a], excluded=[d]) == {}
+
+
+def test_channel_graph_shortest_paths_match_networkx():
+    rng = random.Random(42)
+    nodes = [factories.make_address() for _ in range(200)]
+    edges = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(300)]
+
+    graph = ChannelGraph(edges)
+    networkx_graph = graph.to_networkx()
+
+    for target in rng.sample(nodes, 10):
+        sources = rng.sample(nodes, 20)
+        paths = graph.shortest_paths_to(target, sources)
+
+        for source in sources:
+            path = paths.get(source)
+            if source not in networkx_graph or target not in networkx_graph:
+                assert path is None
+            elif not networkx.has_path(networkx_graph, source, target):
+                assert path is None
+            else:
+                assert path[0] == source and path[-1] == target
+                assert all(graph.has_edge(a, b) for a, b in zip(path, path[1:]))
+                assert len(path) - 1 == networkx.shortest_path_length(
+                    networkx_graph, source, target
+                )
@@ -19,6 +19,7 @@
 from raiden.transfer.channel import get_status
 from raiden.transfer.events import (
     ContractSendChannelBatchUnlock,
+    ContractSendChannelClose,
     ContractSendChannelUpdateTransfer,
     ContractSendSecretReveal,
 )
@@ -45,6 +46,7 @@
     subdispatch_initiatortask,
     subdispatch_targettask,
     subdispatch_to_paymenttask,
+    update_queues,
 )
 from raiden.transfer.state import (
     BalanceProofSignedState,
@@ -62,6 +64,7 @@
     ActionChannelClose,
     Block,
     ContractReceiveChannelBatchUnlock,
+    ContractReceiveChannelClosed,
     ContractReceiveChannelSettled,
     ContractReceiveNewTokenNetwork,
     ContractReceiveNewTokenNetworkRegistry,
@@ -475,3 +478,62 @@ def test_inplace_delete_message_queue(chain_state):
     assert queue_identifier in chain_state.queueids_to_queues, "queue mapping not mutable"
     handle_receive_processed(chain_state=chain_state, state_change=processed_state_change)
     assert queue_identifier not in chain_state.queueids_to_queues, "queue did not clear"
+
+
+def test_update_queues_uses_pending_transactions_index(chain_state):
+    close_canonical_identifier = factories.make_canonical_identifier()
+    other_canonical_identifier = factories.make_canonical_identifier()
+    close_transaction = ContractSendChannelClose(
+        canonical_identifier=close_canonical_identifier,
+        balance_proof=None,
+        triggered_by_block_hash=make_block_hash(),
+    )
+    other_close_transaction = ContractSendChannelClose(
+        canonical_identifier=other_canonical_identifier,
+        balance_proof=None,
+        triggered_by_block_hash=make_block_hash(),
+    )
+    secret_reveal = ContractSendSecretReveal(
+        expiration=chain_state.block_number + 1,
+        secret=UNIT_SECRET,
+        triggered_by_block_hash=make_block_hash(),
+    )
+    update_queues(
+        TransitionResult(chain_state, [close_transaction, other_close_transaction, secret_reveal]),
+        Block(block_number=chain_state.block_number, gas_limit=1, block_hash=make_block_hash()),
+    )
+    assert chain_state.pending_transactions == [
+        close_transaction,
+        other_close_transaction,
+        secret_reveal,
+    ]
+
+    channel_closed = ContractReceiveChannelClosed(
+        transaction_hash=factories.make_transaction_hash(),
+        transaction_from=factories.make_address(),
+        canonical_identifier=close_canonical_identifier,
+        block_number=chain_state.block_number,
+        block_hash=make_block_hash(),
+    )
+    update_queues(TransitionResult(chain_state, []), channel_closed)
+    assert chain_state.pending_transactions == [other_close_transaction, secret_reveal]
+
+    # The expiration is checked for every on-chain event, even when the
+    # event is not related to the transaction
+    chain_state.block_number += 2
+    update_queues(TransitionResult(chain_state, []), channel_closed)
+    assert chain_state.pending_transactions == [other_close_transaction]
+
+    # The index is derived data and must be rebuilt after a restore
+    restored_state = copy.deepcopy(chain_state)
+    restored_state.pending_transactions_index = None
+    channel_closed = ContractReceiveChannelClosed(
+        transaction_hash=factories.make_transaction_hash(),
+        transaction_from=factories.make_address(),
+        canonical_identifier=other_canonical_identifier,
+        block_number=chain_state.block_number,
+        block_hash=make_block_hash(),
+    )
+    update_queues(TransitionResult(restored_state, []), channel_closed)
+    assert restored_state.pending_transactions == []
+    assert not restored_state.pending_transactions_index
@@ -0,0 +1,111 @@
+import pytest
+from gevent.monkey import get_original
+
+from raiden.constants import EMPTY_SIGNATURE
+from raiden.messages.synchronization import Delivered, Processed
+from raiden.tests.utils.factories import make_privkey_address, make_signer
+from raiden.utils.signer import LocalSigner
+from raiden.utils.signing_service import SigningService
+from raiden.utils.typing import MessageID
+
+
+def make_delivered_messages(number_of_messages):
+    return [
+        Delivered(delivered_message_identifier=MessageID(identifier), signature=EMPTY_SIGNATURE)
+        for identifier in range(number_of_messages)
+    ]
+
+
+@pytest.mark.parametrize("started", [False, True])
+def test_signing_service_signs_like_the_signer(started):
+    signer = make_signer()
+    signing_service = SigningService(signer, threads=2)
+    if started:
+        signing_service.start()
+
+    try:
+        messages = make_delivered_messages(7)
+        signed = [signing_service.submit(message).get() for message in messages]
+
+        single = Processed(message_identifier=MessageID(7), signature=EMPTY_SIGNATURE)
+        signing_service.sign(single)
+    finally:
+        signing_service.stop()
+
+    expected = make_delivered_messages(7) + [
+        Processed(message_identifier=MessageID(7), signature=EMPTY_SIGNATURE)
+    ]
+    for message in expected:
+        message.sign(signer)
+
+    assert signed == messages
+    assert [m.signature for m in messages + [single]] == [m.signature for m in expected]
+    assert all(m.sender == signer.address for m in messages)
+
+    metrics = signing_service.metrics()
+    assert metrics["signed_messages"] == 8
+    assert metrics["throughput"] > 0
+
+
+def test_signing_service_submit_does_not_wait_for_the_signature():
+    # The worker thread blocks on a native event, a gevent one cannot be set
+    # from the hub while the thread waits on it
+    can_sign = get_original("threading", "Event")()
+
+    class BlockingSigner(LocalSigner):
+        def sign(self, data, v=27):
+            can_sign.wait()
+            return super().sign(data, v)
+
+    signing_service = SigningService(BlockingSigner(make_privkey_address()[0]), threads=2)
+
+    message = Processed(message_identifier=MessageID(1), signature=EMPTY_SIGNATURE)
+
+    signing_service.start()
+    try:
+        result = signing_service.submit(message)
+        assert not result.ready()
+
+        can_sign.set()
+        assert result.get(timeout=5) is message
+    finally:
+        signing_service.stop()
+
+    assert message.sender == signing_service.signer.address
+
+
+def test_signing_service_signs_inline():
+    signing_service = SigningService(make_signer(), threads=2)
+    signing_service.start()
+
+    try:
+        assert signing_service.pool is not None
+        signing_service.pool.spawn = None
+
+        signing_service.sign(Processed(message_identifier=MessageID(1), signature=EMPTY_SIGNATURE))
+    finally:
+        signing_service.stop()
+
+    assert signing_service.signed_messages == 1
+
+
+@pytest.mark.parametrize("started", [False, True])
+def test_signing_service_raises_signing_errors(started):
+    class FailingSigner(LocalSigner):
+        def sign(self, data, v=27):
+            raise ValueError("cannot sign")
+
+    signing_service = SigningService(FailingSigner(make_privkey_address()[0]), threads=2)
+    if started:
+        signing_service.start()
+
+    try:
+        message = Processed(message_identifier=MessageID(1), signature=EMPTY_SIGNATURE)
+        with pytest.raises(ValueError):
+            signing_service.sign(message)
+        with pytest.raises(ValueError):
+            signing_service.submit(make_delivered_messages(1)[0]).get()
+    finally:
+        signing_service.stop()
+
+    assert signing_service.signed_messages == 0
@@ -1495,6 +1495,6 @@ def create_network(
         state = iteration.new_state
 
         assert len(state.network_graph.channel_identifier_to_participants) == count
-        assert len(state.network_graph.network.edges()) == count
+        assert state.network_graph.network.number_of_edges() == count
 
     return state, channels
@@ -4,6 +4,7 @@
 from unittest.mock import Mock, PropertyMock
 
 from raiden.constants import Environment, RoutingMode
+from raiden.routing import LocalRoutingEngine
 from raiden.settings import RaidenConfig
 from raiden.storage.serialization import JSONSerializer
 from raiden.storage.sqlite import SerializedSQLiteStorage
@@ -16,6 +17,7 @@
 from raiden.transfer.state_change import ActionInitChain
 from raiden.utils.keys import privatekey_to_address
 from raiden.utils.signer import LocalSigner
+from raiden.utils.signing_service import SigningService
 from raiden.utils.typing import (
     Address,
     BlockNumber,
@@ -138,6 +140,7 @@ class MockTokenNetwork:
     def __init__(self):
         self.channelidentifiers_to_channels: dict = {}
         self.partneraddresses_to_channelidentifiers: dict = {}
+        self.channelstatuses_to_channelidentifiers = None
 
 
 class MockTokenNetworkRegistry:
@@ -161,6 +164,7 @@ def __init__(self, message_handler=None, state_transition=None, private_key=None
         self.rpc_client = MockJSONRPCClient(self.address)
         self.proxy_manager = MockProxyManager(node_address=self.address)
         self.signer = LocalSigner(self.privkey)
+        self.signing_service = SigningService(self.signer)
 
         self.message_handler = message_handler
         self.routing_mode = RoutingMode.PRIVATE
@@ -176,6 +180,8 @@ def __init__(self, message_handler=None, state_transition=None, private_key=None
 
         self.targets_to_identifiers_to_statuses: Dict[Address, dict] = defaultdict(dict)
         self.route_to_feedback_token: dict = {}
+        self.routing_engine = LocalRoutingEngine()
+        self.greenlets: list = []
 
         if state_transition is None:
             state_transition = node.state_transition
@@ -205,8 +211,11 @@ def handle_and_track_state_changes(self, state_changes):
     def handle_state_changes(self, state_changes):
         pass
 
+    def add_pending_greenlet(self, greenlet):
+        self.greenlets.append(greenlet)
+
     def sign(self, message):
-        message.sign(self.signer)
+        self.signing_service.sign(message)
 
     def stop(self):
         self.wal.storage.close()
@@ -0,0 +1,279 @@
+from array import array
+from collections import deque
+
+from raiden.utils.typing import (
+    TYPE_CHECKING,
+    Address,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    # pylint: disable=unused-import
+    import networkx  # noqa: F401
+
+# Type code of the arrays holding node indices
+INDEX_TYPECODE = "l"
+
+
+class ChannelGraph:
+    """ Undirected graph of the channels in a token network.
+
+    Addresses are interned into consecutive integers and the neighbours of a
+    node are stored as an array of those integers. This representation is much
+    cheaper to copy and to serialize than the nested dictionaries of a
+    `networkx.Graph`, and the state is copied on every `StateManager.dispatch`.
+
+    Nodes are never removed, not even after their last channel is closed.
+    This is the same behavior as `networkx.Graph.remove_edge`.
+
+    `version` is incremented on every change of the topology, data derived
+    from the graph can use it to detect that it is stale.
+    """
+
+    def __init__(self, edges: Iterable[Tuple[Address, Address]] = ()) -> None:
+        self.addresses: List[Address] = list()
+        self.address_to_index: Dict[Address, int] = dict()
+        self.adjacency: List[array] = list()
+        self.edge_count = 0
+        self.version = 0
+
+        for participant1, participant2 in edges:
+            self.add_edge(participant1, participant2)
+
+    def __repr__(self) -> str:
+        return f"ChannelGraph(nodes:{len(self.addresses)} edges:{self.edge_count})"
+
+    def __eq__(self, other: Any) -> bool:
+        return (
+            isinstance(other, ChannelGraph)
+            and set(self.addresses) == set(other.addresses)
+            and sorted(sorted(edge) for edge in self.edges())
+            == sorted(sorted(edge) for edge in other.edges())
+        )
+
+    def __ne__(self, other: Any) -> bool:
+        return not self.__eq__(other)
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def __contains__(self, address: Any) -> bool:
+        return address in self.address_to_index
+
+    def _intern(self, address: Address) -> int:
+        index = self.address_to_index.get(address)
+        if index is None:
+            index = len(self.addresses)
+            self.addresses.append(address)
+            self.address_to_index[address] = index
+            self.adjacency.append(array(INDEX_TYPECODE))
+        return index
+
+    def _slot(self, index1: int, index2: int) -> Optional[int]:
+        """ Position of `index2` in the adjacency array of `index1`. """
+        try:
+            return self.adjacency[index1].index(index2)
+        except ValueError:
+            return None
+
+    def add_node(self, address: Address) -> None:
+        self._intern(address)
+
+    def add_edge(self, participant1: Address, participant2: Address) -> None:
+        """ Adds the channel between the participants, adding an existing
+        channel is a no-op.
+        """
+        index1 = self._intern(participant1)
+        index2 = self._intern(participant2)
+
+        if self._slot(index1, index2) is not None:
+            return
+
+        self.adjacency[index1].append(index2)
+        if index1 != index2:
+            self.adjacency[index2].append(index1)
+        self.edge_count += 1
+        self.version += 1
+
+    def remove_edge(self, participant1: Address, participant2: Address) -> None:
+        """ Removes the channel between the participants.
+
+        Raises:
+            KeyError: If there is no such channel.
+        """
+        index1 = self.address_to_index[participant1]
+        index2 = self.address_to_index[participant2]
+
+        slot1 = self._slot(index1, index2)
+        if slot1 is None:
+            raise KeyError(f"There is no edge between {participant1!r} and {participant2!r}")
+
+        self.adjacency[index1].pop(slot1)
+        if index1 != index2:
+            slot2 = self._slot(index2, index1)
+            assert slot2 is not None, "The adjacency arrays must be symmetric"
+            self.adjacency[index2].pop(slot2)
+        self.edge_count -= 1
+        self.version += 1
+
+    def has_path(self, path: List[Address]) -> bool:
+        """ Whether every channel of `path` exists. """
+        return all(self.has_edge(path[pos], path[pos + 1]) for pos in range(len(path) - 1))
+
+    def has_edge(self, participant1: Address, participant2: Address) -> bool:
+        index1 = self.address_to_index.get(participant1)
+        index2 = self.address_to_index.get(participant2)
+        if index1 is None or index2 is None:
+            return False
+        return self._slot(index1, index2) is not None
+
+    def nodes(self) -> List[Address]:
+        return list(self.addresses)
+
+    def edges(self) -> Iterator[Tuple[Address, Address]]:
+        """ Yields every channel once. """
+        addresses = self.addresses
+        for index1, neighbours in enumerate(self.adjacency):
+            for index2 in neighbours:
+                if index1 <= index2:
+                    yield (addresses[index1], addresses[index2])
+
+    def number_of_edges(self) -> int:
+        return self.edge_count
+
+    def neighbors(self, address: Address) -> List[Address]:
+        """ Partners of `address`.
+
+        Raises:
+            KeyError: If `address` is not a node of the graph.
+        """
+        index = self.address_to_index[address]
+        addresses = self.addresses
+        return [addresses[neighbour] for neighbour in self.adjacency[index]]
+
+    def _expand(self, frontier: List[int], parents: Dict[int, int]) -> List[int]:
+        """ Visits the nodes one hop away from `frontier`, recording their
+        parents, and returns them as the next frontier.
+        """
+        adjacency = self.adjacency
+        next_frontier = list()
+        for current in frontier:
+            for neighbour in adjacency[current]:
+                if neighbour not in parents:
+                    parents[neighbour] = current
+                    next_frontier.append(neighbour)
+        return next_frontier
+
+    def bfs_distances(self, source: Address) -> Dict[Address, int]:
+        """ Number of hops from `source` to every reachable node, the source
+        included.
+        """
+        source_index = self.address_to_index.get(source)
+        if source_index is None:
+            return dict()
+
+        distances = array(INDEX_TYPECODE, [-1]) * len(self.addresses)
+        distances[source_index] = 0
+
+        adjacency = self.adjacency
+        queue = deque([source_index])
+        while queue:
+            current = queue.popleft()
+            next_distance = distances[current] + 1
+            for neighbour in adjacency[current]:
+                if distances[neighbour] == -1:
+                    distances[neighbour] = next_distance
+                    queue.append(neighbour)
+
+        addresses = self.addresses
+        return {
+            addresses[index]: distance
+            for index, distance in enumerate(distances)
+            if distance != -1
+        }
+
+    def shortest_path(self, source: Address, target: Address) -> Optional[List[Address]]:
+        """ One of the shortest paths from `source` to `target`, both
+        included. `None` if there is no path or if either is not a node of
+        the graph.
+        """
+        return self.shortest_paths_to(target, [source]).get(source)
+
+    def shortest_paths_to(
+        self, target: Address, sources: Iterable[Address], excluded: Iterable[Address] = ()
+    ) -> Dict[Address, List[Address]]:
+        """ One of the shortest paths from each of the `sources` to `target`,
+        both ends included, which does not go through the `excluded` nodes.
+        Sources without such a path to the target are not in the result.
+
+        This is a bidirectional breadth first search for every source, where
+        the search from `target` is shared by all of them. The smaller
+        frontier is expanded one whole level at a time, so the first node
+        reached by both searches is on a shortest path.
+        """
+        target_index = self.address_to_index.get(target)
+        if target_index is None:
+            return dict()
+
+        # The excluded nodes are marked as visited by both searches, so they
+        # are never expanded
+        excluded_parents = {
+            self.address_to_index[address]: -1
+            for address in excluded
+            if address in self.address_to_index
+        }
+        if target_index in excluded_parents:
+            return dict()
+
+        target_parents = dict(excluded_parents)
+        target_parents[target_index] = target_index
+        target_frontier = [target_index]
+
+        addresses = self.addresses
+        paths: Dict[Address, List[Address]] = dict()
+        for source in sources:
+            source_index = self.address_to_index.get(source)
+            if source_index is None or source_index in excluded_parents:
+                continue
+
+            source_parents = dict(excluded_parents)
+            source_parents[source_index] = source_index
+            source_frontier = [source_index]
+
+            meeting = source_index if source_index in target_parents else None
+            while meeting is None and source_frontier and target_frontier:
+                if len(source_frontier) <= len(target_frontier):
+                    source_frontier = self._expand(source_frontier, source_parents)
+                    meeting = next((n for n in source_frontier if n in target_parents), None)
+                else:
+                    target_frontier = self._expand(target_frontier, target_parents)
+                    meeting = next((n for n in target_frontier if n in source_parents), None)
+
+            if meeting is None:
+                continue
+
+            path = [meeting]
+            while path[-1] != source_index:
+                path.append(source_parents[path[-1]])
+            path.reverse()
+            while path[-1] != target_index:
+                path.append(target_parents[path[-1]])
+
+            paths[source] = [addresses[index] for index in path]
+
+        return paths
+
+    def to_networkx(self) -> "networkx.Graph":
+        """ Converts the graph for tooling, e.g. plotting or analysis. """
+        import networkx
+
+        graph = networkx.Graph()
+        graph.add_nodes_from(self.addresses)
+        graph.add_edges_from(self.edges())
+        return graph
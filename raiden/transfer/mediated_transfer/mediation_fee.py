@@ -2,7 +2,11 @@
 from copy import copy
 from dataclasses import dataclass, field
 from fractions import Fraction
-from typing import List, Optional, Sequence, Tuple, TypeVar, Union
+from functools import lru_cache
+from math import gcd
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from cachetools import LRUCache
 
 from raiden.exceptions import UndefinedMediationFee
 from raiden.transfer.architecture import State
@@ -15,6 +19,14 @@
 )
 
 NUM_DISCRETISATION_POINTS = 21
+FEE_CALCULATOR_CACHE_SIZE = 1024
+PENALTY_CURVE_CACHE_SIZE = 1024
+
+# Points of an imbalance penalty function, hashable to be shared between channels
+PenaltyPoints = Tuple[Tuple[TokenAmount, FeeAmount], ...]
+
+# Exact rational number as (numerator, denominator), the denominator is positive
+Rational = Tuple[int, int]
 
 
 class Interpolate:  # pylint: disable=too-few-public-methods
@@ -45,6 +57,19 @@ def __repr__(self) -> str:
         return f"Interpolate({self.x_list}, {self.y_list})"
 
 
+def penalty_points(imbalance_penalty: Sequence[Sequence[int]]) -> PenaltyPoints:
+    return tuple((TokenAmount(x), FeeAmount(y)) for x, y in imbalance_penalty)
+
+
+@lru_cache(maxsize=PENALTY_CURVE_CACHE_SIZE)
+def _penalty_func(points: PenaltyPoints) -> Interpolate:
+    """ Penalty function for `points`, shared by all schedules with the same
+    imbalance penalty. It must not be modified.
+    """
+    x_list, y_list = tuple(zip(*points))
+    return Interpolate(x_list, y_list)
+
+
 def sign(x: Union[float, Fraction]) -> int:
     """ Sign of input, returns zero on zero input
     """
@@ -186,8 +211,20 @@ def __post_init__(self) -> None:
     def _update_penalty_func(self) -> None:
         if self.imbalance_penalty:
             assert isinstance(self.imbalance_penalty, list)
-            x_list, y_list = tuple(zip(*self.imbalance_penalty))
-            self._penalty_func = Interpolate(x_list, y_list)
+            self._penalty_func = _penalty_func(penalty_points(self.imbalance_penalty))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """ The penalty function is derived from `imbalance_penalty` and shared
+        with other schedules, don't copy it with the state.
+        """
+        state = self.__dict__.copy()
+        state.pop("_penalty_func", None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._penalty_func = None
+        self._update_penalty_func()
 
     def fee(self, balance: Balance, amount: Fraction) -> Fraction:
         return (
@@ -268,6 +305,23 @@ def calculate_imbalance_fees(
     assert channel_capacity >= 0
     assert proportional_imbalance_fee >= 0
 
+    points = _imbalance_curve(channel_capacity, proportional_imbalance_fee)
+    if points is None:
+        return None
+
+    return list(points)
+
+
+@lru_cache(maxsize=PENALTY_CURVE_CACHE_SIZE)
+def _imbalance_curve(
+    channel_capacity: TokenAmount, proportional_imbalance_fee: ProportionalFeeAmount
+) -> Optional[PenaltyPoints]:
+    """ Points of the curve for `calculate_imbalance_fees`.
+
+    Cached because channels of the same token usually share the imbalance
+    fee and often the capacity, e.g. when the fee schedules of all channels
+    are initialized at startup.
+    """
     if proportional_imbalance_fee == 0:
         return None
 
@@ -295,4 +349,325 @@ def f(x: TokenAmount) -> FeeAmount:
     x_values = linspace(TokenAmount(0), channel_capacity, num_base_points)
     y_values = [f(x) for x in x_values]
 
-    return list(zip(x_values, y_values))
+    return tuple(zip(x_values, y_values))
+
+
+class IntegerInterpolate:  # pylint: disable=too-few-public-methods
+    """ Linear interpolation of a function with integer points, evaluated
+    with integer arithmetic.
+
+    The values are multiplied by `scale`, the least common multiple of the
+    interval widths, which makes them integers for integer arguments.
+    """
+
+    def __init__(self, x_list: Sequence[int], y_list: Sequence[int]) -> None:
+        if any(y - x <= 0 for x, y in zip(x_list, x_list[1:])):
+            raise ValueError("x_list must be in strictly ascending order!")
+        self.x_list = list(x_list)
+        self.y_list = list(y_list)
+
+        widths = [x2 - x1 for x1, x2 in zip(self.x_list, self.x_list[1:])]
+        scale = 1
+        for width in widths:
+            scale = scale * width // gcd(scale, width)
+        self.scale = scale
+        self.factors = [scale // width for width in widths]
+
+    def scaled(self, x: int) -> int:
+        """ Returns `scale * f(x)`, raises `ValueError` outside of the domain
+        like `Interpolate`.
+        """
+        x_list = self.x_list
+        if not x_list[0] <= x <= x_list[-1]:
+            raise ValueError("x out of bounds!")
+        if x == x_list[-1]:
+            return self.y_list[-1] * self.scale
+        i = bisect_right(x_list, x) - 1
+        y1 = self.y_list[i]
+        return y1 * self.scale + (self.y_list[i + 1] - y1) * (x - x_list[i]) * self.factors[i]
+
+
+@lru_cache(maxsize=PENALTY_CURVE_CACHE_SIZE)
+def _integer_penalty_func(points: PenaltyPoints) -> IntegerInterpolate:
+    """ Same as `_penalty_func` for integer arithmetic """
+    x_list, y_list = tuple(zip(*points))
+    return IntegerInterpolate(x_list, y_list)
+
+
+def _sub(a: Rational, b: Rational) -> Rational:
+    return a[0] * b[1] - b[0] * a[1], a[1] * b[1]
+
+
+def _add(a: Rational, b: Rational) -> Rational:
+    return a[0] * b[1] + b[0] * a[1], a[1] * b[1]
+
+
+def _mul(a: Rational, b: Rational) -> Rational:
+    return a[0] * b[0], a[1] * b[1]
+
+
+def _div(a: Rational, b: Rational) -> Rational:
+    if b[0] == 0:
+        raise ZeroDivisionError("Rational division by zero")
+    if b[0] < 0:
+        return -a[0] * b[1], a[1] * -b[0]
+    return a[0] * b[1], a[1] * b[0]
+
+
+def _round_half_even(value: Rational) -> int:
+    """ Same as `round(Fraction(*value))` """
+    quotient, remainder = divmod(value[0], value[1])
+    if remainder * 2 > value[1] or (remainder * 2 == value[1] and quotient % 2 == 1):
+        return quotient + 1
+    return quotient
+
+
+def _cap_scaled_fees(
+    x_list: List[Rational], y_list: List[int]
+) -> Tuple[List[Rational], List[int]]:
+    """ Same as `_cap_fees` for `MediationFeeCalculator`. The intersection with
+    the x-axis lies strictly between its neighbours, therefore it is inserted
+    right after them.
+    """
+    for i in range(len(x_list) - 1):
+        y1, y2 = y_list[i : i + 2]
+        if sign(y1) * sign(y2) == -1:
+            x1, x2 = x_list[i : i + 2]
+            new_x = _add(x1, _mul((abs(y1), abs(y2 - y1)), _sub(x2, x1)))
+            x_list.insert(i + 1, new_x)
+            y_list.insert(i + 1, 0)
+
+    # Cap points that are below zero
+    return x_list, [max(y, 0) for y in y_list]
+
+
+class MediationFeeCalculator:
+    """ Calculates `amount_without_fees` for transfers mediated between two
+    channels, with exact integer arithmetic.
+
+    Gives the same results as `FeeScheduleState.mediation_fee_func` followed
+    by `mediator.find_intersection`, without `Fraction`s. The fees are
+    integers multiplied by `scale`, which is chosen so that every fee of the
+    piecewise linear functions is exactly representable. Only the points
+    inserted by fee capping and the final intersection need a denominator of
+    their own.
+
+    The part of the fees which doesn't depend on the transferred amount is
+    computed once, so a batch of amounts for the same channel balances is
+    cheap to evaluate with `amounts_without_fees`.
+
+    Raises:
+        UndefinedMediationFee: If either channel can't transfer a single token,
+            or if the penalty function of the outgoing channel is not
+            defined for its balance.
+    """
+
+    def __init__(
+        self,
+        schedule_in: FeeScheduleState,
+        schedule_out: FeeScheduleState,
+        balance_in: Balance,
+        balance_out: Balance,
+        receivable: TokenAmount,
+        cap_fees: bool,
+    ) -> None:
+        # If either channel can't transfer even a single token, there can be no mediation.
+        if balance_out == 0 or receivable == 0:
+            raise UndefinedMediationFee()
+
+        if schedule_in.imbalance_penalty:
+            penalty_in = _integer_penalty_func(penalty_points(schedule_in.imbalance_penalty))
+        else:
+            penalty_in = IntegerInterpolate([0, balance_in + receivable], [0, 0])
+        if schedule_out.imbalance_penalty:
+            penalty_out = _integer_penalty_func(penalty_points(schedule_out.imbalance_penalty))
+        else:
+            penalty_out = IntegerInterpolate([0, balance_out], [0, 0])
+
+        # The proportional fees are given in parts per million
+        penalty_scale = (
+            penalty_in.scale * penalty_out.scale // gcd(penalty_in.scale, penalty_out.scale)
+        )
+        self.penalty_scale = penalty_scale
+        self.scale = 10 ** 6 * penalty_scale
+
+        self.flat_in = schedule_in.flat
+        self.proportional_in = schedule_in.proportional
+        self.penalty_in = penalty_in
+        self.balance_in = balance_in
+        self.cap_fees = cap_fees
+
+        # Same as `_collect_x_values` with a given `amount_with_fees`, all
+        # values are integers
+        all_x_vals = [x - balance_in for x in penalty_in.x_list] + [
+            balance_out - x for x in penalty_out.x_list
+        ]
+        self.x_list: List[int] = sorted(set(max(min(x, balance_out), 0) for x in all_x_vals))
+
+        # `schedule_out.fee(balance_out, -x)` for every x
+        penalty_factor = self.scale // penalty_out.scale
+        flat = schedule_out.flat * self.scale
+        proportional = schedule_out.proportional * penalty_scale
+        try:
+            penalty_balance = penalty_out.scaled(balance_out)
+            self.fees_out: List[int] = [
+                flat
+                + proportional * x
+                + (penalty_out.scaled(balance_out - x) - penalty_balance) * penalty_factor
+                for x in self.x_list
+            ]
+        except ValueError:
+            raise UndefinedMediationFee()
+
+    def _fee_in(self, amount_with_fees: int) -> int:
+        """ `schedule_in.fee(balance_in, amount_with_fees)` multiplied by `scale` """
+        penalty = self.penalty_in
+        penalty_difference = penalty.scaled(self.balance_in + amount_with_fees) - penalty.scaled(
+            self.balance_in
+        )
+        return (
+            self.flat_in * self.scale
+            + self.proportional_in * self.penalty_scale * abs(amount_with_fees)
+            + penalty_difference * (self.scale // penalty.scale)
+        )
+
+    def _find_intersection(
+        self, x_list: List[Rational], y_list: List[int], amount_with_fees: int
+    ) -> Optional[Rational]:
+        """ Same as `mediator.find_intersection` with the line
+        `amount_with_fees - x`.
+        """
+        scale = self.scale
+
+        def fee(i: int) -> Rational:
+            return y_list[i], scale
+
+        def line(i: int) -> Rational:
+            numerator, denominator = x_list[i]
+            return amount_with_fees * denominator - numerator, denominator
+
+        def is_below_line(i: int) -> bool:
+            line_numerator, line_denominator = line(i)
+            return y_list[i] * line_denominator < line_numerator * scale
+
+        def is_above_line(i: int) -> bool:
+            line_numerator, line_denominator = line(i)
+            return y_list[i] * line_denominator > line_numerator * scale
+
+        i = 0
+        compare = is_below_line if is_below_line(i) else is_above_line
+        while compare(i):
+            i += 1
+            if i == len(x_list):
+                # Not enough capacity to send
+                return None
+
+        # We found the linear section where the solution is. Now interpolate!
+        x1 = x_list[i - 1]
+        x2 = x_list[i]
+        yf1 = fee(i - 1)
+        yf2 = fee(i)
+        yl1 = line(i - 1)
+        yl2 = line(i)
+        return _add(
+            _div(_mul(_sub(yl1, yf1), _sub(x2, x1)), _sub(_sub(yf2, yf1), _sub(yl2, yl1))), x1
+        )
+
+    def amount_without_fees(
+        self, amount_with_fees: PaymentWithFeeAmount
+    ) -> Optional[PaymentWithFeeAmount]:
+        """ Returns the amount after the mediation fees are deducted, `None` if
+        there is no such amount or if it doesn't cover the fees.
+        """
+        try:
+            fee_in = self._fee_in(amount_with_fees)
+        except ValueError:
+            return None
+
+        x_list: List[Rational] = [(x, 1) for x in self.x_list]
+        y_list = [fee_in + fee_out for fee_out in self.fees_out]
+        if self.cap_fees:
+            x_list, y_list = _cap_scaled_fees(x_list, y_list)
+
+        amount_without_fees = self._find_intersection(x_list, y_list, amount_with_fees)
+        if amount_without_fees is None:
+            # Insufficient capacity
+            return None
+        if amount_without_fees[0] <= 0:
+            # The node can't cover its mediations fees from the transferred amount.
+            return None
+
+        return PaymentWithFeeAmount(_round_half_even(amount_without_fees))
+
+    def amounts_without_fees(
+        self, amounts_with_fees: Iterable[PaymentWithFeeAmount]
+    ) -> List[Optional[PaymentWithFeeAmount]]:
+        """ `amount_without_fees` for each of the amounts """
+        return [self.amount_without_fees(amount) for amount in amounts_with_fees]
+
+
+def _fee_schedule_key(schedule: FeeScheduleState) -> Hashable:
+    """ The values of `schedule` which the mediation fees depend on """
+    imbalance_penalty: Optional[PenaltyPoints] = None
+    if schedule.imbalance_penalty:
+        imbalance_penalty = penalty_points(schedule.imbalance_penalty)
+    return schedule.flat, schedule.proportional, imbalance_penalty
+
+
+class MediationFeeCalculatorCache:
+    """ Bounded cache of `MediationFeeCalculator`s.
+
+    Many transfers are mediated between the same pair of channels while
+    their balances don't change. The cache key contains the balances and the
+    fee schedules, so a change of either results in a new entry, and the
+    stale ones are dropped in least recently used order.
+    """
+
+    def __init__(self, size: int = FEE_CALCULATOR_CACHE_SIZE) -> None:
+        self.cache: LRUCache = LRUCache(size)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(
+        self,
+        schedule_in: FeeScheduleState,
+        schedule_out: FeeScheduleState,
+        balance_in: Balance,
+        balance_out: Balance,
+        receivable: TokenAmount,
+        cap_fees: bool,
+    ) -> MediationFeeCalculator:
+        """ Returns the calculator for the given channel state.
+
+        Raises:
+            UndefinedMediationFee: Same as `MediationFeeCalculator`.
+        """
+        key = (
+            _fee_schedule_key(schedule_in),
+            _fee_schedule_key(schedule_out),
+            balance_in,
+            balance_out,
+            receivable,
+            cap_fees,
+        )
+        calculator = self.cache.get(key)
+        if calculator is not None:
+            self.hits += 1
+            return calculator
+
+        self.misses += 1
+        calculator = MediationFeeCalculator(
+            schedule_in=schedule_in,
+            schedule_out=schedule_out,
+            balance_in=balance_in,
+            balance_out=balance_out,
+            receivable=receivable,
+            cap_fees=cap_fees,
+        )
+        self.cache[key] = calculator
+        return calculator
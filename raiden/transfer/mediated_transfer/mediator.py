@@ -20,7 +20,10 @@
     SendRefundTransfer,
     SendSecretReveal,
 )
-from raiden.transfer.mediated_transfer.mediation_fee import FeeScheduleState, Interpolate
+from raiden.transfer.mediated_transfer.mediation_fee import (
+    Interpolate,
+    MediationFeeCalculatorCache,
+)
 from raiden.transfer.mediated_transfer.state import (
     LockedTransferSignedState,
     LockedTransferUnsignedState,
@@ -88,6 +91,10 @@
     "payer_expired",
 )
 
+# The calculators only depend on the cache key, so sharing them across state
+# copies doesn't affect the determinism of the state machine
+FEE_CALCULATOR_CACHE = MediationFeeCalculatorCache()
+
 
 def is_lock_valid(expiration: BlockExpiration, block_number: BlockNumber) -> bool:
     """ True if the lock has not expired. """
@@ -242,29 +249,18 @@ def get_amount_without_fees(
         channel_in.fee_schedule.cap_fees == channel_out.fee_schedule.cap_fees
     ), "Both channels must have the same cap_fees setting for the same mediator."
     try:
-        fee_func = FeeScheduleState.mediation_fee_func(
+        fee_calculator = FEE_CALCULATOR_CACHE.get(
             schedule_in=channel_in.fee_schedule,
             schedule_out=channel_out.fee_schedule,
             balance_in=balance_in,
             balance_out=balance_out,
             receivable=receivable,
-            amount_with_fees=amount_with_fees,
             cap_fees=channel_in.fee_schedule.cap_fees,
         )
-        amount_without_fees = find_intersection(
-            fee_func, lambda i: amount_with_fees - fee_func.x_list[i]
-        )
     except UndefinedMediationFee:
         return None
 
-    if amount_without_fees is None:
-        # Insufficient capacity
-        return None
-    if amount_without_fees <= 0:
-        # The node can't cover its mediations fees from the transferred amount.
-        return None
-
-    return PaymentWithFeeAmount(int(round(amount_without_fees)))
+    return fee_calculator.amount_without_fees(amount_with_fees)
 
 
 def sanity_check(
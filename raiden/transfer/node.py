@@ -1,4 +1,5 @@
 import copy
+from collections import defaultdict
 
 from raiden.transfer import channel, token_network, views
 from raiden.transfer.architecture import (
@@ -73,11 +74,13 @@
     BlockHash,
     BlockNumber,
     ChannelID,
+    Dict,
     List,
     Optional,
     SecretHash,
     TokenNetworkAddress,
     TokenNetworkRegistryAddress,
+    Tuple,
     Union,
 )
 
@@ -138,6 +141,10 @@ def subdispatch_to_all_channels(
                     block_hash=block_hash,
                     pseudo_random_generator=chain_state.pseudo_random_generator,
                 )
+                # A block may start the settlement of the channel
+                token_network.update_channel_status_index(
+                    token_network_state, channel_state.identifier, channel_state
+                )
                 events.extend(result.events)
 
     return TransitionResult(chain_state, events)
@@ -583,9 +590,11 @@ def handle_action_change_node_network_state(
     chain_state.nodeaddresses_to_networkstates[node_address] = network_state
 
     for secrethash, subtask in list(chain_state.payment_mapping.secrethashes_to_task.items()):
-        # This assert would not have been needed if token_network_address, a common attribute
-        # for all TransferTasks was part of the TransferTasks superclass.
-        assert isinstance(subtask, (InitiatorTask, MediatorTask, TargetTask))
+        # Only mediators react to a change of the network state, the other
+        # tasks would be rejected by `subdispatch_mediatortask` anyway.
+        if not isinstance(subtask, MediatorTask):
+            continue
+
         result = subdispatch_mediatortask(
             chain_state=chain_state,
             state_change=state_change,
@@ -1121,17 +1130,123 @@ def is_transaction_pending(
     )
 
 
+# Key for the transactions which are subject to `is_transaction_expired`
+EXPIRABLE_TRANSACTIONS_KEY: Tuple = ("expirable",)
+
+
+def pending_transaction_keys(transaction: ContractSendEvent) -> List[Tuple]:
+    """ Keys under which `transaction` is stored in the pending transactions
+    index.
+
+    A transaction is indexed by its type and the object it operates on, this
+    must mirror the matching done by `is_transaction_effect_satisfied` and
+    `is_transaction_invalidated`.
+    """
+    keys: List[Tuple]
+    if isinstance(transaction, ContractSendSecretReveal):
+        keys = [(ContractSendSecretReveal, transaction.secret)]
+    elif isinstance(transaction, ContractSendChannelBatchUnlock):
+        # The effect of a batch unlock is checked against the channel of the
+        # state change's participants, not against the transaction's channel.
+        keys = [(ContractSendChannelBatchUnlock,)]
+    elif isinstance(
+        transaction,
+        (
+            ContractSendChannelClose,
+            ContractSendChannelSettle,
+            ContractSendChannelUpdateTransfer,
+            ContractSendChannelWithdraw,
+        ),
+    ):
+        keys = [
+            (type(transaction), transaction.token_network_address, transaction.channel_identifier)
+        ]
+    else:
+        keys = [(type(transaction),)]
+
+    if isinstance(transaction, (ContractSendChannelUpdateTransfer, ContractSendSecretReveal)):
+        keys.append(EXPIRABLE_TRANSACTIONS_KEY)
+
+    return keys
+
+
+def state_change_transaction_keys(state_change: ContractReceiveStateChange) -> List[Tuple]:
+    """ Keys of the pending transactions which `state_change` may satisfy or
+    invalidate.
+    """
+    if isinstance(state_change, ContractReceiveUpdateTransfer):
+        channel_key = (state_change.token_network_address, state_change.channel_identifier)
+        return [(ContractSendChannelUpdateTransfer, *channel_key)]
+
+    if isinstance(state_change, ContractReceiveChannelClosed):
+        channel_key = (state_change.token_network_address, state_change.channel_identifier)
+        return [
+            (ContractSendChannelClose, *channel_key),
+            (ContractSendChannelWithdraw, *channel_key),
+        ]
+
+    if isinstance(state_change, ContractReceiveChannelSettled):
+        channel_key = (state_change.token_network_address, state_change.channel_identifier)
+        return [
+            (ContractSendChannelSettle, *channel_key),
+            (ContractSendChannelUpdateTransfer, *channel_key),
+        ]
+
+    if isinstance(state_change, ContractReceiveSecretReveal):
+        return [(ContractSendSecretReveal, state_change.secret)]
+
+    if isinstance(state_change, ContractReceiveChannelBatchUnlock):
+        return [(ContractSendChannelBatchUnlock,)]
+
+    return []
+
+
+def get_pending_transactions_index(
+    chain_state: ChainState
+) -> Dict[Tuple, List[ContractSendEvent]]:
+    if chain_state.pending_transactions_index is None:
+        index: Dict[Tuple, List[ContractSendEvent]] = defaultdict(list)
+        for transaction in chain_state.pending_transactions:
+            for key in pending_transaction_keys(transaction):
+                index[key].append(transaction)
+        chain_state.pending_transactions_index = index
+
+    return chain_state.pending_transactions_index
+
+
 def update_queues(iteration: TransitionResult[ChainState], state_change: StateChange) -> None:
     chain_state = iteration.new_state
     assert chain_state is not None, "chain_state must be set"
 
+    index = get_pending_transactions_index(chain_state)
+
     if isinstance(state_change, ContractReceiveStateChange):
-        pending_transactions = [
-            transaction
-            for transaction in chain_state.pending_transactions
-            if is_transaction_pending(chain_state, transaction, state_change)
-        ]
-        chain_state.pending_transactions = pending_transactions
+        # Only the indexed transactions can be affected by the state change,
+        # every other transaction is still pending.
+        candidate_keys = state_change_transaction_keys(state_change)
+        candidate_keys.append(EXPIRABLE_TRANSACTIONS_KEY)
+
+        done_transactions = {
+            id(transaction): transaction
+            for key in candidate_keys
+            for transaction in index.get(key, [])
+            if not is_transaction_pending(chain_state, transaction, state_change)
+        }
+
+        if done_transactions:
+            chain_state.pending_transactions = [
+                transaction
+                for transaction in chain_state.pending_transactions
+                if id(transaction) not in done_transactions
+            ]
+
+            for transaction in done_transactions.values():
+                for key in pending_transaction_keys(transaction):
+                    remaining = [pending for pending in index[key] if pending is not transaction]
+                    if remaining:
+                        index[key] = remaining
+                    else:
+                        del index[key]
 
     for event in iteration.events:
         if isinstance(event, SendMessageEvent):
@@ -1140,6 +1255,8 @@ def update_queues(iteration: TransitionResult[ChainState], state_change: StateCh
 
         if isinstance(event, ContractSendEvent):
             chain_state.pending_transactions.append(event)
+            for key in pending_transaction_keys(event):
+                index[key].append(event)
 
 
 def state_transition(
@@ -5,7 +5,6 @@
 from enum import Enum
 from random import Random
 
-import networkx
 from eth_utils import to_hex
 
 from raiden.constants import (
@@ -23,6 +22,7 @@
     State,
     TransferTask,
 )
+from raiden.transfer.graph import ChannelGraph
 from raiden.transfer.identifiers import CanonicalIdentifier, QueueIdentifier
 from raiden.transfer.mediated_transfer.mediation_fee import FeeScheduleState
 from raiden.utils.formatting import lpex, to_checksum_address
@@ -47,6 +47,7 @@
     PaymentWithFeeAmount,
     Secret,
     SecretHash,
+    Set,
     T_Address,
     T_BlockHash,
     T_BlockNumber,
@@ -96,7 +97,7 @@ def message_identifier_from_prng(prng: Random) -> MessageID:
     return MessageID(prng.randint(0, UINT64_MAX))
 
 
-def to_comparable_graph(network: networkx.Graph) -> List[List[Any]]:
+def to_comparable_graph(network: ChannelGraph) -> List[List[Any]]:
     return sorted(sorted(edge) for edge in network.edges())
 
 
@@ -129,14 +130,14 @@ class TokenNetworkGraphState(State):
     """
 
     token_network_address: TokenNetworkAddress
-    network: networkx.Graph = field(repr=False, default_factory=networkx.Graph)
+    network: ChannelGraph = field(repr=False, default_factory=ChannelGraph)
     channel_identifier_to_participants: Dict[ChannelID, Tuple[Address, Address]] = field(
         repr=False, default_factory=dict
     )
 
     def __repr__(self) -> str:
         # pylint: disable=no-member
-        return "TokenNetworkGraphState(num_edges:{})".format(len(self.network.edges))
+        return "TokenNetworkGraphState(num_edges:{})".format(self.network.number_of_edges())
 
     def __eq__(self, other: Any) -> bool:
         return (
@@ -459,6 +460,12 @@ class TokenNetworkState(State):
     partneraddresses_to_channelidentifiers: Dict[Address, List[ChannelID]] = field(
         repr=False, default_factory=lambda: defaultdict(list)
     )
+    # Derived from `channelidentifiers_to_channels` and kept up to date by the
+    # channel state transitions, see `token_network.get_channel_status_index`.
+    # It is not serialized and is rebuilt lazily after a restore.
+    channelstatuses_to_channelidentifiers: Optional[Dict[ChannelState, Set[ChannelID]]] = field(
+        init=False, repr=False, compare=False, default=None
+    )
 
     def __post_init__(self) -> None:
         typecheck(self.address, T_Address)
@@ -520,6 +527,12 @@ class ChainState(State):
     )
     payment_mapping: PaymentMappingState = field(repr=False, default_factory=PaymentMappingState)
     pending_transactions: List[ContractSendEvent] = field(repr=False, default_factory=list)
+    # Derived from `pending_transactions` and used to find the transactions
+    # affected by an on-chain event, see `node.update_queues`. It is not
+    # serialized and is rebuilt lazily after a restore.
+    pending_transactions_index: Optional[Dict[Tuple, List[ContractSendEvent]]] = field(
+        init=False, repr=False, compare=False, default=None
+    )
     queueids_to_queues: QueueIdsToQueues = field(repr=False, default_factory=dict)
     tokennetworkaddresses_to_tokennetworkregistryaddresses: Dict[
         TokenNetworkAddress, TokenNetworkRegistryAddress
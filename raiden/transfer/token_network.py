@@ -1,8 +1,9 @@
 import random
+from collections import defaultdict
 
 from raiden.transfer import channel
 from raiden.transfer.architecture import Event, StateChange, TransitionResult
-from raiden.transfer.state import TokenNetworkState
+from raiden.transfer.state import ChannelState, NettingChannelState, TokenNetworkState
 from raiden.transfer.state_change import (
     ActionChannelClose,
     ActionChannelSetRevealTimeout,
@@ -20,7 +21,17 @@
     ReceiveWithdrawExpired,
     ReceiveWithdrawRequest,
 )
-from raiden.utils.typing import MYPY_ANNOTATION, BlockHash, BlockNumber, List, Union
+from raiden.utils.typing import (
+    MYPY_ANNOTATION,
+    BlockHash,
+    BlockNumber,
+    ChannelID,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Union,
+)
 
 # TODO: The proper solution would be to introduce a marker for state changes
 # that contains channel IDs and other specific channel attributes
@@ -39,6 +50,42 @@
 ]
 
 
+def get_channel_status_index(
+    token_network_state: TokenNetworkState
+) -> Dict[ChannelState, Set[ChannelID]]:
+    if token_network_state.channelstatuses_to_channelidentifiers is None:
+        index: Dict[ChannelState, Set[ChannelID]] = defaultdict(set)
+        ids_to_channels = token_network_state.channelidentifiers_to_channels
+        for channel_identifier, channel_state in ids_to_channels.items():
+            index[channel.get_status(channel_state)].add(channel_identifier)
+        token_network_state.channelstatuses_to_channelidentifiers = index
+
+    return token_network_state.channelstatuses_to_channelidentifiers
+
+
+def update_channel_status_index(
+    token_network_state: TokenNetworkState,
+    channel_identifier: ChannelID,
+    channel_state: Optional[NettingChannelState],
+) -> None:
+    """ Moves the channel to the entry of its current status, or removes it if
+    `channel_state` is None.
+
+    Must be called after every transition that may change the status of a
+    channel or delete it.
+    """
+    index = token_network_state.channelstatuses_to_channelidentifiers
+    if index is None:
+        # Nothing to update, the index is built on its first use
+        return
+
+    for channel_identifiers in index.values():
+        channel_identifiers.discard(channel_identifier)
+
+    if channel_state is not None:
+        index[channel.get_status(channel_state)].add(channel_identifier)
+
+
 def subdispatch_to_channel_by_id(
     token_network_state: TokenNetworkState,
     state_change: StateChangeWithChannelID,
@@ -72,6 +119,7 @@ def subdispatch_to_channel_by_id(
         else:
             ids_to_channels[channel_identifier] = result.new_state
 
+        update_channel_status_index(token_network_state, channel_identifier, result.new_state)
         events.extend(result.events)
 
     return TransitionResult(token_network_state, events)
@@ -148,6 +196,7 @@ def handle_channelnew(
         token_network_state.channelidentifiers_to_channels[channel_identifier] = channel_state
         addresses_to_ids = token_network_state.partneraddresses_to_channelidentifiers
         addresses_to_ids[partner_address].append(channel_identifier)
+        update_channel_status_index(token_network_state, channel_identifier, channel_state)
 
     return TransitionResult(token_network_state, events)
 
@@ -274,6 +323,10 @@ def handle_batch_unlock(
 
             del token_network_state.channelidentifiers_to_channels[channel_state.identifier]
 
+        update_channel_status_index(
+            token_network_state, channel_state.identifier, sub_iteration.new_state
+        )
+
     return TransitionResult(token_network_state, events)
 
 
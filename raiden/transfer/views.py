@@ -11,6 +11,7 @@
     TokenNetworkRegistryState,
     TokenNetworkState,
 )
+from raiden.transfer.token_network import get_channel_status_index
 from raiden.utils.typing import (
     TYPE_CHECKING,
     Address,
@@ -46,9 +47,10 @@ def all_neighbour_nodes(chain_state: ChainState) -> Set[Address]:
         for (
             token_network
         ) in token_network_registry.tokennetworkaddresses_to_tokennetworks.values():
-            channel_states = token_network.channelidentifiers_to_channels.values()
-            for channel_state in channel_states:
-                addresses.add(channel_state.partner_state.address)
+            partners_to_ids = token_network.partneraddresses_to_channelidentifiers
+            for partner_address, channel_identifiers in partners_to_ids.items():
+                if channel_identifiers:
+                    addresses.add(partner_address)
 
     return addresses
 
@@ -330,17 +332,40 @@ def get_channelstate_filter(
     return result
 
 
+def get_channelstate_by_status(
+    chain_state: ChainState,
+    token_network_registry_address: TokenNetworkRegistryAddress,
+    token_address: TokenAddress,
+    status: ChannelState,
+) -> List[NettingChannelState]:
+    """ Return the state of the channels with `status`, ordered by their
+    identifiers.
+
+    Uses the status index of the token network instead of checking every
+    channel.
+    """
+    token_network = get_token_network_by_token_address(
+        chain_state, token_network_registry_address, token_address
+    )
+
+    if not token_network:
+        return []
+
+    channel_identifiers = get_channel_status_index(token_network).get(status, set())
+    return [
+        token_network.channelidentifiers_to_channels[channel_identifier]
+        for channel_identifier in sorted(channel_identifiers)
+    ]
+
+
 def get_channelstate_open(
     chain_state: ChainState,
     token_network_registry_address: TokenNetworkRegistryAddress,
     token_address: TokenAddress,
 ) -> List[NettingChannelState]:
     """Return the state of open channels in a token network."""
-    return get_channelstate_filter(
-        chain_state,
-        token_network_registry_address,
-        token_address,
-        lambda channel_state: channel.get_status(channel_state) == ChannelState.STATE_OPENED,
+    return get_channelstate_by_status(
+        chain_state, token_network_registry_address, token_address, ChannelState.STATE_OPENED
     )
 
 
@@ -350,11 +375,8 @@ def get_channelstate_closing(
     token_address: TokenAddress,
 ) -> List[NettingChannelState]:
     """Return the state of closing channels in a token network."""
-    return get_channelstate_filter(
-        chain_state,
-        token_network_registry_address,
-        token_address,
-        lambda channel_state: channel.get_status(channel_state) == ChannelState.STATE_CLOSING,
+    return get_channelstate_by_status(
+        chain_state, token_network_registry_address, token_address, ChannelState.STATE_CLOSING
     )
 
 
@@ -364,11 +386,8 @@ def get_channelstate_closed(
     token_address: TokenAddress,
 ) -> List[NettingChannelState]:
     """Return the state of closed channels in a token network."""
-    return get_channelstate_filter(
-        chain_state,
-        token_network_registry_address,
-        token_address,
-        lambda channel_state: channel.get_status(channel_state) == ChannelState.STATE_CLOSED,
+    return get_channelstate_by_status(
+        chain_state, token_network_registry_address, token_address, ChannelState.STATE_CLOSED
     )
 
 
@@ -378,11 +397,8 @@ def get_channelstate_settling(
     token_address: TokenAddress,
 ) -> List[NettingChannelState]:
     """Return the state of settling channels in a token network."""
-    return get_channelstate_filter(
-        chain_state,
-        token_network_registry_address,
-        token_address,
-        lambda channel_state: channel.get_status(channel_state) == ChannelState.STATE_SETTLING,
+    return get_channelstate_by_status(
+        chain_state, token_network_registry_address, token_address, ChannelState.STATE_SETTLING
     )
 
 
@@ -392,11 +408,8 @@ def get_channelstate_settled(
     token_address: TokenAddress,
 ) -> List[NettingChannelState]:
     """Return the state of settled channels in a token network."""
-    return get_channelstate_filter(
-        chain_state,
-        token_network_registry_address,
-        token_address,
-        lambda channel_state: channel.get_status(channel_state) == ChannelState.STATE_SETTLED,
+    return get_channelstate_by_status(
+        chain_state, token_network_registry_address, token_address, ChannelState.STATE_SETTLED
     )
 
 
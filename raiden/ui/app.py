@@ -39,10 +39,9 @@
     ServiceConfig,
 )
 from raiden.ui.checks import (
-    check_ethereum_client_is_supported,
+    check_ethereum_client_and_network_id,
     check_ethereum_confirmed_block_is_not_pruned,
     check_ethereum_has_accounts,
-    check_ethereum_network_id,
     check_sql_version,
     check_synced,
 )
@@ -192,6 +191,7 @@ def run_app(
     proportional_imbalance_fee: Tuple[Tuple[TokenAddress, ProportionalFeeAmount], ...],
     blockchain_query_interval: float,
     cap_mediation_fees: bool,
+    eth_ws_endpoint: Optional[str] = None,
     **kwargs: Any,  # FIXME: not used here, but still receives stuff in smoketest
 ) -> App:
     # pylint: disable=too-many-locals,too-many-branches,too-many-statements,unused-argument
@@ -207,8 +207,7 @@ def run_app(
 
     check_sql_version()
     check_ethereum_has_accounts(account_manager)
-    check_ethereum_client_is_supported(web3)
-    check_ethereum_network_id(network_id, web3)
+    check_ethereum_client_and_network_id(web3, network_id)
 
     address, privatekey = get_account_and_private_key(account_manager, address, password_file)
 
@@ -230,6 +229,7 @@ def run_app(
     config.web_ui = rpc and web_ui
 
     config.blockchain.query_interval = blockchain_query_interval
+    config.blockchain.new_heads_endpoint = eth_ws_endpoint
 
     config.mediation_fees = fee_config
 
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 
 import structlog
+from requests.exceptions import RequestException
 from web3 import Web3
 
 from raiden.accounts import AccountManager
@@ -15,7 +16,7 @@
 )
 from raiden.exceptions import EthNodeInterfaceError, RaidenError
 from raiden.network.proxies.secret_registry import SecretRegistry
-from raiden.network.rpc.client import JSONRPCClient
+from raiden.network.rpc.client import JSONRPCClient, batch_request
 from raiden.settings import ETHERSCAN_API, ORACLE_BLOCKNUMBER_DRIFT_TOLERANCE
 from raiden.storage.sqlite import assert_sqlite_version
 from raiden.ui.sync import wait_for_sync
@@ -23,11 +24,13 @@
 from raiden.utils.formatting import to_checksum_address
 from raiden.utils.typing import (
     Address,
+    Any,
     ChainID,
     Dict,
     List,
     MonitoringServiceAddress,
     OneToNAddress,
+    Optional,
     SecretRegistryAddress,
     ServiceRegistryAddress,
     TokenNetworkRegistryAddress,
@@ -37,6 +40,12 @@
 
 log = structlog.get_logger(__name__)
 
+WEB3_INTERFACE_NOT_ENABLED = (
+    "The underlying ethereum node does not have the web3 rpc interface "
+    "enabled. Please run it with --rpcapi eth,net,web3 for geth "
+    "and --jsonrpc-apis=eth,net,web3,parity for parity."
+)
+
 
 @dataclass(frozen=True)
 class DeploymentAddresses:
@@ -58,12 +67,12 @@ def check_ethereum_client_is_supported(web3: Web3) -> None:
     try:
         node_version = web3.version.node  # pylint: disable=no-member
     except ValueError:
-        raise EthNodeInterfaceError(
-            "The underlying ethereum node does not have the web3 rpc interface "
-            "enabled. Please run it with --rpcapi eth,net,web3 for geth "
-            "and --jsonrpc-apis=eth,net,web3,parity for parity."
-        )
+        raise EthNodeInterfaceError(WEB3_INTERFACE_NOT_ENABLED)
 
+    _check_ethereum_client_version(node_version)
+
+
+def _check_ethereum_client_version(node_version: str) -> None:
     supported, our_client, our_version = is_supported_client(node_version)
     if not supported:
         raise RaidenError(
@@ -142,7 +151,10 @@ def check_ethereum_network_id(given_network_id: ChainID, web3: Web3) -> None:
     to the configuration and then returns it and whether it is a known network
     """
     node_network_id = ChainID(int(web3.version.network))  # pylint: disable=no-member
+    _check_network_id(given_network_id, node_network_id)
+
 
+def _check_network_id(given_network_id: ChainID, node_network_id: ChainID) -> None:
     if node_network_id != given_network_id:
         given_name = ID_TO_NETWORKNAME.get(given_network_id)
         network_name = ID_TO_NETWORKNAME.get(node_network_id)
@@ -161,6 +173,30 @@ def check_ethereum_network_id(given_network_id: ChainID, web3: Web3) -> None:
         )
 
 
+def check_ethereum_client_and_network_id(web3: Web3, given_network_id: ChainID) -> None:
+    """ Does `check_ethereum_client_is_supported` and `check_ethereum_network_id`
+    with a single batch request for the client version and the network id.
+
+    The batch bypasses the web3 middlewares and is not supported by every
+    node, if it fails the checks are done one by one through web3.
+    """
+    responses: Optional[List[Dict[str, Any]]]
+    try:
+        responses = batch_request(web3, [("web3_clientVersion", []), ("net_version", [])])
+    except (ValueError, RequestException) as e:
+        log.debug("Batch request failed, checking the Ethereum client one by one", error=str(e))
+        responses = None
+
+    if responses is None or any("error" in response for response in responses):
+        check_ethereum_client_is_supported(web3)
+        check_ethereum_network_id(given_network_id, web3)
+        return
+
+    client_version, net_version = responses
+    _check_ethereum_client_version(client_version["result"])
+    _check_network_id(given_network_id, ChainID(int(net_version["result"])))
+
+
 def check_raiden_environment(network_id: ChainID, environment_type: Environment) -> None:
     warn = (  # mainnet --development is only for tests
         network_id == 1 and environment_type == Environment.DEVELOPMENT
@@ -301,6 +301,16 @@ def options(func: Callable) -> Callable:
                 type=str,
                 show_default=True,
             ),
+            option(
+                "--eth-ws-endpoint",
+                help=(
+                    '"ws://host:port" address of the ethereum WebSocket JSON-RPC server.\n'
+                    "If given, new blocks are pushed by the ethereum node instead of "
+                    "polled every --blockchain-query-interval seconds"
+                ),
+                default=None,
+                type=str,
+            ),
         ),
         option_group(
             "Raiden Services Options",
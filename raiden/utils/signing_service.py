@@ -0,0 +1,102 @@
+import time
+
+import structlog
+from gevent.event import AsyncResult
+from gevent.monkey import get_original
+from gevent.threadpool import ThreadPool
+
+from raiden.messages.abstract import SignedMessage
+from raiden.settings import SIGNING_SERVICE_THREADS
+from raiden.utils.signer import Signer
+from raiden.utils.typing import Any, Dict, Optional
+
+log = structlog.get_logger(__name__)
+
+# The metrics are updated from the worker threads, a gevent lock must not be
+# used there
+NativeLock = get_original("threading", "Lock")
+
+
+class SigningService:
+    """ Signs outgoing messages, in a pool of native threads if they are
+    submitted.
+
+    The ECDSA signature releases the GIL, so the hub keeps running while a
+    submitted message is signed. `submit` returns a future, an `AsyncResult`
+    whose value is the signed message. Only callers which can wait outside of
+    the state change dispatch submit their messages, `sign` signs inline.
+    `signer` is the backend which computes the signatures, `RaidenService`
+    uses its `LocalSigner`.
+
+    Before `start` and after `stop` the submitted messages are signed inline,
+    the returned futures are already resolved.
+    """
+
+    def __init__(self, signer: Signer, threads: int = SIGNING_SERVICE_THREADS) -> None:
+        self.signer = signer
+        self.threads = threads
+        self.pool: Optional[ThreadPool] = None
+
+        self._metrics_lock = NativeLock()
+        self.signed_messages = 0
+        self.signing_time = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} signer:{self.signer!r} " f"signed:{self.signed_messages}>"
+        )
+
+    @property
+    def throughput(self) -> float:
+        """ Signed messages per second of signing time """
+        if self.signing_time == 0:
+            return 0.0
+        return self.signed_messages / self.signing_time
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            return {
+                "signed_messages": self.signed_messages,
+                "signing_time": self.signing_time,
+                "throughput": self.throughput,
+            }
+
+    def start(self) -> None:
+        if self.pool is None:
+            self.pool = ThreadPool(self.threads)
+
+    def stop(self) -> None:
+        if self.pool is not None:
+            self.pool.kill()
+            self.pool = None
+
+        log.debug("Signing service stopped", **self.metrics())
+
+    def _sign_message(self, message: SignedMessage) -> SignedMessage:
+        start = time.perf_counter()
+        message.sign(self.signer)
+        duration = time.perf_counter() - start
+
+        with self._metrics_lock:
+            self.signed_messages += 1
+            self.signing_time += duration
+
+        return message
+
+    def sign(self, message: SignedMessage) -> None:
+        """ Signs `message` in place. """
+        self._sign_message(message)
+
+    def submit(self, message: SignedMessage) -> AsyncResult:
+        """ Signs `message` in place in the pool, the result is set to the
+        message once it is signed.
+        """
+        if self.pool is not None:
+            return self.pool.spawn(self._sign_message, message)
+
+        result = AsyncResult()
+        try:
+            result.set(self._sign_message(message))
+        except Exception as e:  # pylint: disable=broad-except
+            result.set_exception(e)
+        return result
@@ -8,6 +8,7 @@
 import structlog
 
 from raiden.constants import RAIDEN_DB_VERSION
+from raiden.storage.migrations.v25_to_v26 import upgrade_v25_to_v26
 from raiden.storage.sqlite import SQLiteStorage
 from raiden.storage.versions import VERSION_RE, filter_db_names, latest_db_file
 from raiden.utils.typing import Any, Callable, DatabasePath, List, NamedTuple
@@ -18,7 +19,7 @@ class UpgradeRecord(NamedTuple):
     function: Callable
 
 
-UPGRADES_LIST: List[UpgradeRecord] = []
+UPGRADES_LIST: List[UpgradeRecord] = [UpgradeRecord(from_version=25, function=upgrade_v25_to_v26)]
 
 
 log = structlog.get_logger(__name__)